@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CommonConfig(AppConfig):
+    name = 'apps.common'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .profiling import install_profiling_signal
+        install_profiling_signal()
@@ -0,0 +1,300 @@
+"""
+Domain events: one feed of entity changes for caches and derived data.
+
+Saves and deletes of tracked models publish an EntityChanged. Events are held
+until the transaction commits, coalesced to one per entity, then sent through
+entities_changed once per model. With EVENT_STREAM set they are also appended
+to that Redis stream for consumers in other processes.
+"""
+import json
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+import redis
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal
+
+from .redis import get_raw_redis_client
+
+logger = logging.getLogger(__name__)
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+# Sent after a transaction commits, once per model that changed in it.
+# ``sender`` is the model class, receivers get ``events`` (a list of
+# EntityChanged, one per entity).
+entities_changed = Signal()
+
+
+@dataclass(frozen=True)
+class EntityChanged:
+    """
+    A change to one row. data carries the fields subscribers need without a
+    query, e.g. the seller_id of a product.
+    """
+    entity: str
+    id: int
+    action: str
+    data: dict = field(default_factory=dict)
+
+    def merge(self, later: 'EntityChanged') -> Optional['EntityChanged']:
+        """
+        Folds a later change to the same entity into this one, None when a
+        row created in the transaction was also deleted in it.
+        """
+        if self.action == CREATED and later.action == DELETED:
+            return None
+        action = CREATED if self.action == CREATED else later.action
+        return EntityChanged(self.entity, self.id, action, {**self.data, **later.data})
+
+    def to_fields(self) -> dict:
+        return {
+            'entity': self.entity,
+            'id': str(self.id),
+            'action': self.action,
+            'data': json.dumps(self.data),
+        }
+
+    @classmethod
+    def from_fields(cls, fields: dict) -> 'EntityChanged':
+        fields = {
+            (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+            for key, value in fields.items()
+        }
+        return cls(fields['entity'], int(fields['id']), fields['action'], json.loads(fields['data']))
+
+
+class EventBatch:
+    """
+    The events published in one atomic block, sent when the transaction commits.
+    """
+
+    def __init__(self) -> None:
+        self.events: dict[tuple[str, int], Optional[EntityChanged]] = {}
+        self.sent = False
+
+    def add(self, event: EntityChanged) -> None:
+        key = (event.entity, event.id)
+        previous = self.events.get(key)
+        self.events[key] = previous.merge(event) if previous else event
+
+    def send(self) -> None:
+        self.sent = True
+        dispatch_events([event for event in self.events.values() if event is not None])
+
+
+# Batches being filled, per thread and database alias, keyed by the savepoints
+# of their atomic block. Each batch registers one on_commit callback, and that
+# callback is the only strong reference to it: a rollback discards the callback
+# and with it the batch, which drops out of this registry, and so does a batch
+# once it has been sent.
+_batches = threading.local()
+
+
+def _get_batches(using: str) -> weakref.WeakValueDictionary:
+    registry = _batches.__dict__.setdefault('by_alias', {})
+    return registry.setdefault(using, weakref.WeakValueDictionary())
+
+
+def _get_block_key(using: str) -> tuple:
+    # The savepoints on_commit records for a callback, atomic(savepoint=False)
+    # blocks push None and share their parent's batch
+    return tuple(sid for sid in connections[using].savepoint_ids if sid is not None)
+
+
+def publish(event: EntityChanged, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Queues an event for when the current transaction commits, or sends it now
+    outside of one.
+
+    Events are coalesced per atomic block: a nested block (a savepoint) gets a
+    batch of its own, so rolling it back drops its events, and an entity
+    changed both inside and outside of it is sent twice. A block registers its
+    on_commit callback with its first event, so captureOnCommitCallbacks only
+    sees batches started inside it.
+    """
+    if transaction.get_autocommit(using):
+        dispatch_events([event])
+        return
+
+    batches = _get_batches(using)
+    key = _get_block_key(using)
+    batch = batches.get(key)
+    if batch is None or batch.sent:
+        batch = batches[key] = EventBatch()
+        transaction.on_commit(batch.send, using=using)
+    batch.add(event)
+
+
+def publish_changes(model, ids: Iterable[int], action: str = UPDATED, using: str = DEFAULT_DB_ALIAS, **data) -> None:
+    """
+    Publishes the same change for many rows, for writes that skip model signals
+    (bulk_create, bulk_update, QuerySet.update).
+    """
+    for entity_id in ids:
+        publish(EntityChanged(model._meta.label, entity_id, action, data), using=using)
+
+
+def dispatch_events(events: list[EntityChanged]) -> None:
+    """
+    Sends committed events to subscribers grouped by model, then to the stream.
+
+    A failing subscriber is logged and does not stop the others: the data is
+    already committed and there is nobody left to report the error to.
+    """
+    by_entity = defaultdict(list)
+    for event in events:
+        by_entity[event.entity].append(event)
+
+    for entity, entity_events in by_entity.items():
+        responses = entities_changed.send_robust(sender=apps.get_model(entity), events=entity_events)
+        for receiver, response in responses:
+            if isinstance(response, Exception):
+                logger.error('Event subscriber %s failed on %s', receiver.__name__, entity, exc_info=response)
+
+    if events and get_event_stream():
+        append_to_stream(events)
+
+
+def track_changes(model, fields: Iterable[str] = ()) -> None:
+    """
+    Publishes an EntityChanged for every save and delete of model, carrying the
+    given fields of the instance in its data.
+    """
+    fields = list(fields)
+    label = model._meta.label
+
+    def make_event(instance, action: str) -> EntityChanged:
+        return EntityChanged(label, instance.pk, action, {name: getattr(instance, name) for name in fields})
+
+    def on_save(sender, instance, created, raw=False, using=DEFAULT_DB_ALIAS, **kwargs) -> None:
+        if not raw:
+            publish(make_event(instance, CREATED if created else UPDATED), using=using)
+
+    def on_delete(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs) -> None:
+        publish(make_event(instance, DELETED), using=using)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"events:{label}:save")
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"events:{label}:delete")
+
+
+def get_event_stream() -> str:
+    """
+    Get the Redis stream events are mirrored to, empty when disabled.
+    """
+    return getattr(settings, 'EVENT_STREAM', '')
+
+
+def append_to_stream(events: list[EntityChanged]) -> None:
+    """
+    Appends events to the stream in one round trip, trimmed to about
+    EVENT_STREAM_MAXLEN entries. Best effort: an unreachable Redis is logged.
+    """
+    stream = get_event_stream()
+    maxlen = getattr(settings, 'EVENT_STREAM_MAXLEN', 100000)
+    try:
+        pipe = get_raw_redis_client().pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(stream, event.to_fields(), maxlen=maxlen, approximate=True)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning('Appending %s events to stream %s failed: %s', len(events), stream, e)
+
+
+def create_consumer_group(group: str) -> None:
+    """
+    Creates a consumer group on the stream, starting from the oldest retained
+    event, unless it already exists.
+    """
+    try:
+        get_raw_redis_client().xgroup_create(get_event_stream(), group, id='0', mkstream=True)
+    except redis.ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+def get_dead_letter_stream() -> str:
+    """
+    Get the stream events are moved to once they keep failing.
+    """
+    return getattr(settings, 'EVENT_STREAM_DEAD_LETTER', '') or f"{get_event_stream()}:dead"
+
+
+def dead_letter_exhausted(client, group: str, consumer: str, messages: list) -> list:
+    """
+    Moves redelivered entries that reached EVENT_STREAM_MAX_DELIVERIES to the
+    dead letter stream and acknowledges them. Returns the remaining ones.
+
+    Without this a handler that always fails on an entry, or an entry that
+    cannot be decoded, would be handed back forever and block the consumer.
+    """
+    stream = get_event_stream()
+    max_deliveries = getattr(settings, 'EVENT_STREAM_MAX_DELIVERIES', 5)
+    pending = client.xpending_range(
+        stream, group, min=messages[0][0], max=messages[-1][0], count=len(messages), consumername=consumer
+    )
+    deliveries = {entry['message_id']: entry['times_delivered'] for entry in pending}
+
+    exhausted = [
+        (message_id, fields) for message_id, fields in messages
+        if deliveries.get(message_id, 0) > max_deliveries
+    ]
+    if not exhausted:
+        return messages
+
+    dead_letter_stream = get_dead_letter_stream()
+    pipe = client.pipeline()
+    for message_id, fields in exhausted:
+        pipe.xadd(dead_letter_stream, {**fields, 'group': group, 'source_id': message_id})
+    pipe.xack(stream, group, *[message_id for message_id, _ in exhausted])
+    pipe.execute()
+    logger.error(
+        'Moved %s events of group %s to %s after %s deliveries',
+        len(exhausted), group, dead_letter_stream, max_deliveries,
+    )
+
+    exhausted_ids = {message_id for message_id, _ in exhausted}
+    return [message for message in messages if message[0] not in exhausted_ids]
+
+
+def consume_stream(
+    group: str,
+    consumer: str,
+    handler: Callable[[list[EntityChanged]], None],
+    count: int = 100,
+    block_ms: Optional[int] = None,
+) -> int:
+    """
+    Hands the next batch of stream events to handler as a consumer of group,
+    acknowledging them once it returns. Returns the number handled.
+
+    Entries this consumer read but never acknowledged (it crashed mid-batch,
+    or the handler raised) are redelivered before new ones, so delivery is at
+    least once, until they were delivered EVENT_STREAM_MAX_DELIVERIES times
+    and go to the dead letter stream. The group must exist, see
+    create_consumer_group.
+    """
+    stream = get_event_stream()
+    client = get_raw_redis_client()
+    entries = client.xreadgroup(group, consumer, {stream: '0'}, count=count)
+    messages = entries[0][1] if entries else []
+    if messages:
+        messages = dead_letter_exhausted(client, group, consumer, messages)
+    else:
+        entries = client.xreadgroup(group, consumer, {stream: '>'}, count=count, block=block_ms)
+        messages = entries[0][1] if entries else []
+    if not messages:
+        return 0
+
+    handler([EntityChanged.from_fields(fields) for _, fields in messages])
+    client.xack(stream, group, *[message_id for message_id, _ in messages])
+    return len(messages)
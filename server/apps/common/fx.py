@@ -0,0 +1,72 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Optional
+
+from apps.common.models import FxRate
+from apps.common.registry import VersionedRegistry
+
+FX_VERSION_NAME = 'fx-rates'
+
+
+class FxRateNotFound(LookupError):
+    pass
+
+
+class FxRateTable(VersionedRegistry[dict[tuple[str, str], Decimal]]):
+    """
+    In-process matrix of exchange rates, reloaded when the shared FX version changes.
+
+    Inverse rates are derived for pairs stored in one direction only. The version
+    is checked every FX_RATES_CHECK_SECONDS, so lookups are dictionary hits.
+    """
+    version_name = FX_VERSION_NAME
+    metric_name = 'fx_rates'
+    check_seconds_setting = 'FX_RATES_CHECK_SECONDS'
+
+    def load(self) -> dict[tuple[str, str], Decimal]:
+        rates = {}
+        stored = FxRate.objects.values_list('base_currency', 'quote_currency', 'rate')
+        for base, quote, rate in stored:
+            rates[(base, quote)] = rate
+            if rate:
+                rates.setdefault((quote, base), 1 / rate)
+        return rates
+
+    def get_rate(self, from_currency: str, to_currency: str) -> Decimal:
+        if from_currency == to_currency:
+            return Decimal('1')
+
+        try:
+            return self.get_data()[(from_currency, to_currency)]
+        except KeyError:
+            raise FxRateNotFound(f"No exchange rate from {from_currency} to {to_currency}.")
+
+
+fx_rates = FxRateTable()
+
+
+def bump_fx_version() -> None:
+    """
+    Invalidates the FX rate table in every process.
+    """
+    fx_rates.bump_version()
+
+
+def convert_amounts(
+    amounts: Iterable[Optional[int]],
+    from_currency: str,
+    to_currency: str,
+) -> list[Optional[int]]:
+    """
+    Converts minor-unit amounts between currencies with a single rate lookup.
+
+    Results are rounded half up to whole minor units, None passes through.
+    """
+    amounts = list(amounts)
+    if from_currency == to_currency:
+        return amounts
+
+    rate = fx_rates.get_rate(from_currency, to_currency)
+    return [
+        None if amount is None else int((amount * rate).to_integral_value(rounding=ROUND_HALF_UP))
+        for amount in amounts
+    ]
@@ -0,0 +1,349 @@
+import http.client
+import ipaddress
+import math
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from itertools import repeat
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+BASE83_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+CONTENT_TYPES = {
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+class ImageError(Exception):
+    pass
+
+
+def resolve_public_address(host: str, port: int) -> str:
+    """
+    Resolves host to an address to connect to, refusing hosts that resolve to
+    loopback, private, link-local or other non-public addresses.
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError) as e:
+        raise ImageError(f"Cannot resolve {host}: {e}")
+
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ImageError(f"Refusing to fetch from non-public address {address}")
+    return infos[0][4][0]
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    # Connects to the address that was checked instead of resolving host again
+    def __init__(self, host: str, address: str, **kwargs) -> None:
+        super().__init__(host, **kwargs)
+        self.address = address
+
+    def connect(self) -> None:
+        self.sock = socket.create_connection((self.address, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, host: str, address: str, **kwargs) -> None:
+        super().__init__(host, **kwargs)
+        self.address = address
+
+    def connect(self) -> None:
+        sock = socket.create_connection((self.address, self.port), self.timeout)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+def _request(url: str, timeout: int) -> tuple[http.client.HTTPResponse, http.client.HTTPConnection]:
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ImageError(f"Unsupported image URL: {url}")
+
+    secure = parsed.scheme == 'https'
+    port = parsed.port or (443 if secure else 80)
+    address = resolve_public_address(parsed.hostname, port)
+    connection_class = _PinnedHTTPSConnection if secure else _PinnedHTTPConnection
+    connection = connection_class(parsed.hostname, address, port=port, timeout=timeout)
+
+    path = parsed.path or '/'
+    if parsed.query:
+        path = f"{path}?{parsed.query}"
+    try:
+        connection.request('GET', path, headers={'Accept': 'image/*'})
+        return connection.getresponse(), connection
+    except BaseException:
+        connection.close()
+        raise
+
+
+def fetch_image(url: str) -> bytes:
+    """
+    Downloads an image over http(s), refusing anything over IMAGE_MAX_BYTES.
+
+    URLs come from sellers, so every hop (up to IMAGE_FETCH_MAX_REDIRECTS
+    redirects) must resolve to a public address and is fetched from the address
+    that was checked. Responses that are not images are refused unread. Every
+    failure is raised as ImageError.
+    """
+    max_bytes = getattr(settings, 'IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+    timeout = getattr(settings, 'IMAGE_FETCH_TIMEOUT_SECONDS', 10)
+    max_redirects = getattr(settings, 'IMAGE_FETCH_MAX_REDIRECTS', 3)
+
+    try:
+        for _ in range(max_redirects + 1):
+            response, connection = _request(url, timeout)
+            try:
+                if response.status in REDIRECT_STATUSES and response.getheader('Location'):
+                    url = urljoin(url, response.getheader('Location'))
+                    continue
+                if response.status != 200:
+                    raise ImageError(f"Fetching {url} returned HTTP {response.status}")
+
+                content_type = (response.getheader('Content-Type') or '').split(';')[0].strip().lower()
+                if not content_type.startswith('image/'):
+                    raise ImageError(f"{url} is not an image ({content_type or 'no content type'})")
+                length = response.getheader('Content-Length') or ''
+                if length.isdigit() and int(length) > max_bytes:
+                    raise ImageError(f"Image at {url} is larger than {max_bytes} bytes")
+
+                data = response.read(max_bytes + 1)
+            finally:
+                connection.close()
+
+            if len(data) > max_bytes:
+                raise ImageError(f"Image at {url} is larger than {max_bytes} bytes")
+            return data
+    except (http.client.HTTPException, OSError, ValueError) as e:
+        raise ImageError(f"Fetching {url} failed: {e}")
+
+    raise ImageError(f"Too many redirects fetching {url}")
+
+
+def open_image(data: bytes) -> Image.Image:
+    """
+    Opens and fully decodes image bytes with EXIF orientation applied.
+    """
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageError(f"Invalid image: {e}")
+    return ImageOps.exif_transpose(image)
+
+
+def _encode83(value: int, length: int) -> str:
+    return ''.join(BASE83_CHARS[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1))
+
+
+def _srgb_to_linear(value: int) -> float:
+    value = value / 255
+    return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value: float) -> int:
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value: float, exponent: float) -> float:
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def encode_blurhash(image: Image.Image, x_components: int = 4, y_components: int = 3) -> str:
+    """
+    Encodes a BlurHash placeholder for the image.
+
+    The image is shrunk to 32px first, which does not change the result visibly
+    and keeps the DCT cheap.
+    """
+    image = image.convert('RGB')
+    image.thumbnail((32, 32))
+    width, height = image.size
+    pixels = [tuple(_srgb_to_linear(channel) for channel in pixel) for pixel in image.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                cos_y = math.cos(math.pi * j * y / height)
+                for x in range(width):
+                    basis = normalisation * math.cos(math.pi * i * x / width) * cos_y
+                    pixel = pixels[y * width + x]
+                    r += basis * pixel[0]
+                    g += basis * pixel[1]
+                    b += basis * pixel[2]
+            scale = 1 / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    blurhash = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(channel) for factor in ac for channel in factor)
+        quantised_max = max(0, min(82, int(math.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        blurhash += _encode83(quantised_max, 1)
+    else:
+        max_value = 1
+        blurhash += _encode83(0, 1)
+
+    blurhash += _encode83(
+        (_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4
+    )
+
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, int(math.floor(_sign_pow(channel / max_value, 0.5) * 9 + 9.5))))
+            for channel in factor
+        )
+        blurhash += _encode83(r * 19 * 19 + g * 19 + b, 2)
+
+    return blurhash
+
+
+def render_variant(data: bytes, width: int, image_format: str) -> tuple[bytes, int, int]:
+    """
+    Resizes image bytes to width and encodes them as image_format.
+
+    Each call opens its own copy of the image, so renders can run in parallel threads.
+    """
+    image = open_image(data)
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.Resampling.LANCZOS)
+    if image_format == 'jpeg' and resized.mode not in ('RGB', 'L'):
+        resized = resized.convert('RGB')
+
+    output = BytesIO()
+    quality = getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)
+    resized.save(output, format=image_format.upper(), quality=quality, optimize=True)
+    return output.getvalue(), width, height
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    # Threads rather than processes: Celery's prefork children are daemonic and
+    # may not start processes of their own, and Pillow releases the GIL while
+    # resampling and encoding
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-render')
+    return _pool
+
+
+def _forget_pool() -> None:
+    # A forked child inherits the pool object but none of its threads,
+    # work submitted to it would never run
+    global _pool
+    _pool = None
+
+
+os.register_at_fork(after_in_child=_forget_pool)
+
+
+def get_variant_widths(original_width: int) -> list[int]:
+    """
+    Get the configured widths smaller than the original, plus the original width.
+    """
+    widths = sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', [320, 640, 1024, 1600]))
+    return [width for width in widths if width < original_width] + [original_width]
+
+
+def generate_variants(data: bytes, original_width: int, workers: Optional[int] = None) -> list[dict]:
+    """
+    Renders every width and format variant of an image.
+
+    With workers > 0 (IMAGE_RENDER_THREADS by default) the variants render in
+    a shared thread pool. Returns variant dicts with the
+    encoded bytes under 'content'.
+    """
+    formats = getattr(settings, 'IMAGE_VARIANT_FORMATS', ['webp', 'jpeg'])
+    jobs = [(width, image_format) for width in get_variant_widths(original_width) for image_format in formats]
+    widths = [width for width, _ in jobs]
+    image_formats = [image_format for _, image_format in jobs]
+
+    if workers is None:
+        workers = getattr(settings, 'IMAGE_RENDER_THREADS', 0)
+    if workers > 0 and len(jobs) > 1:
+        results = list(_get_pool(workers).map(render_variant, repeat(data), widths, image_formats))
+    else:
+        results = [render_variant(data, width, image_format) for width, image_format in jobs]
+
+    return [
+        {'width': width, 'height': height, 'format': image_format, 'content': content}
+        for (content, width, height), image_format in zip(results, image_formats)
+    ]
+
+
+def process_image(data: bytes, path_prefix: str) -> dict:
+    """
+    Stores the variants of an image under path_prefix and returns its metadata.
+
+    The metadata holds dimensions, a blurhash and the storage path of each
+    variant. It is what build_responsive_image turns into srcset attributes.
+    """
+    image = open_image(data)
+    width, height = image.size
+    blurhash = encode_blurhash(image)
+
+    variants = []
+    for variant in generate_variants(data, width):
+        name = f"{path_prefix}/{variant['width']}w.{variant['format']}"
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        path = default_storage.save(name, ContentFile(variant['content']))
+        variants.append({
+            'width': variant['width'],
+            'height': variant['height'],
+            'format': variant['format'],
+            'path': path,
+            'size': len(variant['content']),
+        })
+
+    return {'width': width, 'height': height, 'blurhash': blurhash, 'variants': variants}
+
+
+def build_responsive_image(metadata: dict) -> dict:
+    """
+    Turns stored image metadata into src, srcset and per-format sources.
+    """
+    by_format = {}
+    for variant in sorted(metadata.get('variants', []), key=lambda variant: variant['width']):
+        by_format.setdefault(variant['format'], []).append(variant)
+
+    def srcset(variants: list[dict]) -> str:
+        return ', '.join(f"{default_storage.url(variant['path'])} {variant['width']}w" for variant in variants)
+
+    # The last configured format is the universally supported fallback
+    formats = getattr(settings, 'IMAGE_VARIANT_FORMATS', ['webp', 'jpeg'])
+    fallback = next((by_format[image_format] for image_format in reversed(formats) if image_format in by_format), [])
+
+    return {
+        'width': metadata.get('width'),
+        'height': metadata.get('height'),
+        'blurhash': metadata.get('blurhash'),
+        'src': default_storage.url(fallback[-1]['path']) if fallback else None,
+        'srcset': srcset(fallback),
+        'sources': [
+            {'type': CONTENT_TYPES.get(image_format, f"image/{image_format}"), 'srcset': srcset(variants)}
+            for image_format, variants in by_format.items()
+            if variants is not fallback
+        ],
+    }
@@ -0,0 +1,68 @@
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+# Characters that may still extend a number decoded at the end of the buffer
+NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*')
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Yields the items of a top-level JSON array without loading the whole file.
+
+    Raises ValueError if the document is not a well-formed JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    # 'start' -> expecting '[', 'first' -> value or ']', 'value' -> value, 'separator' -> ',' or ']'
+    state = 'start'
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+
+        if position >= len(buffer):
+            if eof:
+                raise ValueError('Unexpected end of JSON array')
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        char = buffer[position]
+
+        if state == 'start':
+            if char != '[':
+                raise ValueError('Expected a JSON array')
+            position += 1
+            state = 'first'
+        elif state == 'separator' or (state == 'first' and char == ']'):
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' at offset {position}")
+            position += 1
+            state = 'value'
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                value, end = None, None
+
+            # A value that runs to the end of the buffer may be truncated, read more first
+            truncated = end is None or (not eof and NUMBER_TAIL.fullmatch(buffer, end))
+            if truncated:
+                if eof:
+                    raise ValueError(f"Invalid JSON value at offset {position}")
+                chunk = fp.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            yield value
+            position = end
+            state = 'separator'
@@ -0,0 +1,63 @@
+import logging
+import socket
+import time
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils.module_loading import import_string
+
+from apps.common.events import consume_stream, create_consumer_group, get_event_stream
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Feed domain events from EVENT_STREAM to a handler as a member of a consumer group'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'handler',
+            help='Dotted path of a callable taking a list of EntityChanged'
+        )
+        parser.add_argument(
+            '--group',
+            required=True,
+            help='Consumer group, each group sees every event once'
+        )
+        parser.add_argument(
+            '--consumer',
+            default=socket.gethostname(),
+            help='Name of this consumer within the group'
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=100,
+            help='Maximum events per batch'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Handle one batch, without waiting, then exit'
+        )
+
+    def handle(self, *args, **opts) -> None:
+        if not get_event_stream():
+            raise CommandError('EVENT_STREAM is not set')
+        try:
+            handler = import_string(opts['handler'])
+        except ImportError as e:
+            raise CommandError(str(e))
+
+        create_consumer_group(opts['group'])
+        if opts['once']:
+            handled = consume_stream(opts['group'], opts['consumer'], handler, opts['count'])
+            self.stdout.write(f"Handled {handled} events")
+            return
+
+        while True:
+            try:
+                consume_stream(opts['group'], opts['consumer'], handler, opts['count'], block_ms=5000)
+            except Exception:
+                # The batch stays pending and is retried, then dead lettered
+                logger.exception('Handling events for group %s failed', opts['group'])
+                time.sleep(1)
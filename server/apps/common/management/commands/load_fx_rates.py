@@ -0,0 +1,66 @@
+import json
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from apps.common.fx import bump_fx_version
+from apps.common.model_utils import Currency
+from apps.common.models import FxRate
+
+
+class Command(BaseCommand):
+    help = 'Load exchange rates from fx_rates.json'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--path',
+            default=None,
+            help='Path to fx_rates.json'
+        )
+
+    def _parse_rates(self, data: dict) -> list[FxRate]:
+        base = data.get('base')
+        if base not in Currency.values:
+            raise CommandError(f"Unknown base currency: {base}")
+
+        rates = []
+        for quote, value in (data.get('rates') or {}).items():
+            if quote not in Currency.values:
+                raise CommandError(f"Unknown quote currency: {quote}")
+            try:
+                rate = Decimal(str(value))
+            except InvalidOperation:
+                raise CommandError(f"Invalid rate for {base}/{quote}: {value}")
+            if rate <= 0:
+                raise CommandError(f"Rate for {base}/{quote} must be positive")
+            rates.append(FxRate(base_currency=base, quote_currency=quote, rate=rate))
+        return rates
+
+    def handle(self, *args, **opts) -> None:
+        default_path = Path(__file__).resolve().parents[2] / "fx_rates.json"
+        path_arg = opts.get('path')
+        path = Path(path_arg) if path_arg else default_path
+
+        if not path.exists():
+            raise CommandError(f"File at {path} does not exist")
+
+        with open(path, 'r') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise CommandError(f"Invalid JSON in {path}: {e}")
+
+        rates = self._parse_rates(data)
+
+        with transaction.atomic():
+            FxRate.objects.bulk_create(
+                rates,
+                update_conflicts=True,
+                unique_fields=['base_currency', 'quote_currency'],
+                update_fields=['rate', 'updated_at'],
+            )
+            transaction.on_commit(bump_fx_version)
+
+        self.stdout.write(self.style.SUCCESS(f"Loaded {len(rates)} exchange rates"))
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from config.celery import app
+
+
+class Command(BaseCommand):
+    help = 'Run a Celery worker for one queue with its CELERY_WORKER_PROFILES settings'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'queue',
+            help='Queue to consume'
+        )
+        parser.add_argument(
+            '--loglevel',
+            default='INFO',
+            help='Worker log level'
+        )
+
+    def get_worker_argv(self, queue: str, loglevel: str) -> list[str]:
+        profiles = getattr(settings, 'CELERY_WORKER_PROFILES', {})
+        if queue not in profiles:
+            raise CommandError(f"Unknown queue: {queue}. Choose from: {', '.join(profiles)}")
+
+        profile = profiles[queue]
+        return [
+            'worker',
+            f"--queues={queue}",
+            f"--hostname={queue}@%h",
+            f"--autoscale={profile['autoscale']}",
+            f"--prefetch-multiplier={profile['prefetch_multiplier']}",
+            # Hand tasks only to idle processes, so one slow task does not hold up the ones queued behind it
+            '-O', 'fair',
+            f"--loglevel={loglevel}",
+        ]
+
+    def handle(self, *args, **opts) -> None:
+        app.worker_main(self.get_worker_argv(opts['queue'], opts['loglevel']))
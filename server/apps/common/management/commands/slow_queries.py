@@ -0,0 +1,91 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+
+from apps.common.models import SlowQuery
+from apps.common.slow_queries import purge_slow_queries
+
+
+class Command(BaseCommand):
+    help = 'List sampled slow queries by fingerprint, or show one with its plan'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'fingerprint',
+            nargs='?',
+            help='Fingerprint hash to show the latest sample and plan of'
+        )
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Only consider samples from the last N hours'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of fingerprints to list'
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=None,
+            help='Delete samples older than N days instead of listing'
+        )
+
+    def handle(self, *args, **opts) -> None:
+        if opts['purge_days'] is not None:
+            deleted = purge_slow_queries(opts['purge_days'])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} slow query samples"))
+            return
+
+        if opts['fingerprint']:
+            self._show(opts['fingerprint'])
+            return
+
+        since = timezone.now() - timedelta(hours=opts['hours'])
+        rows = (
+            SlowQuery.objects.filter(created_at__gte=since)
+            .values('fingerprint_hash')
+            .annotate(samples=Count('id'), max_ms=Max('duration_ms'), avg_ms=Avg('duration_ms'))
+            .order_by('-max_ms')[:opts['limit']]
+        )
+        latest = {
+            sample.fingerprint_hash: sample
+            for sample in SlowQuery.objects.filter(
+                fingerprint_hash__in=[row['fingerprint_hash'] for row in rows]
+            ).order_by('created_at')
+        }
+
+        if not rows:
+            self.stdout.write(f"No slow queries in the last {opts['hours']} hours")
+            return
+
+        self.stdout.write(f"{'fingerprint':<18}{'samples':>8}{'max ms':>10}{'avg ms':>10}  view / origin")
+        for row in rows:
+            sample = latest[row['fingerprint_hash']]
+            self.stdout.write(
+                f"{row['fingerprint_hash']:<18}{row['samples']:>8}{row['max_ms']:>10.1f}{row['avg_ms']:>10.1f}"
+                f"  {sample.view or '-'} {sample.frame}"
+            )
+            self.stdout.write(f"    {sample.fingerprint[:200]}")
+
+    def _show(self, fingerprint_hash: str) -> None:
+        sample = SlowQuery.objects.filter(fingerprint_hash=fingerprint_hash).first()
+        if sample is None:
+            raise CommandError(f"No slow query samples for {fingerprint_hash}")
+
+        self.stdout.write(f"{sample.duration_ms:.1f} ms at {sample.created_at.isoformat()} in {sample.view or '-'}")
+        self.stdout.write(f"Origin: {sample.frame or '-'}")
+        self.stdout.write(f"SQL: {sample.sql}")
+        self.stdout.write(f"Params: {json.dumps(sample.params)}")
+        if sample.plan is not None:
+            self.stdout.write(f"Plan:\n{json.dumps(sample.plan, indent=2)}")
+        elif sample.plan_error:
+            self.stdout.write(f"Plan unavailable: {sample.plan_error}")
+        else:
+            self.stdout.write('Plan unavailable: EXPLAIN is only captured on PostgreSQL')
@@ -0,0 +1,156 @@
+"""
+Prometheus metrics for requests, caches and Celery.
+
+With PROMETHEUS_MULTIPROC_DIR set (it must be set before the process starts)
+every worker process writes its samples to its own mmap'd files and the
+/metrics view aggregates them at scrape time. config/gunicorn.py clears the
+directory on start and calls mark_process_dead when a worker exits.
+Without it, metrics live in this process's default registry.
+
+Celery pool processes are not behind a web server, so with METRICS_WORKER_PORT
+set the worker's main process serves their aggregated samples itself. See
+the worker signals in apps/common/signals.py.
+"""
+import os
+import shutil
+
+import redis
+from django.conf import settings
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request wall time by route name.',
+    ['route', 'method', 'status'], buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request by route name.',
+    ['route', 'method'], buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Database time per request by route name.',
+    ['route', 'method'], buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Cache lookups by cache layer and result (hit or miss).',
+    ['layer', 'result'],
+)
+TASK_DURATION = Histogram(
+    'celery_task_duration_seconds', 'Celery task runtime by task name and final state.',
+    ['task', 'state'], buckets=TASK_BUCKETS,
+)
+
+
+def record_cache_lookup(layer: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(layer, 'hit' if hit else 'miss').inc()
+
+
+def observe_request(route: str, method: str, status: int, metrics) -> None:
+    """
+    Records a request's RequestMetrics under its route name.
+    """
+    REQUEST_LATENCY.labels(route, method, f"{status // 100}xx").observe(metrics.total_ms / 1000)
+    REQUEST_DB_QUERIES.labels(route, method).observe(metrics.db_queries)
+    REQUEST_DB_DURATION.labels(route, method).observe(metrics.db_ms / 1000)
+
+
+def get_queue_keys(queue: str) -> list[str]:
+    """
+    Get the broker lists of a queue: the Redis transport keeps one per priority
+    step, the highest priority one under the plain queue name.
+    """
+    options = getattr(settings, 'CELERY_BROKER_TRANSPORT_OPTIONS', {})
+    separator = options.get('sep', '\x06\x16')
+    steps = options.get('priority_steps', [0])
+    return [queue] + [f"{queue}{separator}{step}" for step in steps if step]
+
+
+class QueueDepthCollector:
+    """
+    Reads the length of each Celery queue from the broker at scrape time.
+
+    Redis-backed Celery queues are plain lists, so this is one LLEN per list
+    and nothing is tracked between scrapes.
+    """
+
+    def collect(self):
+        gauge = GaugeMetricFamily('celery_queue_length', 'Messages waiting in each Celery queue.', labels=['queue'])
+        queues = getattr(settings, 'METRICS_CELERY_QUEUES', ['celery'])
+        keys = {queue: get_queue_keys(queue) for queue in queues}
+        try:
+            client = redis.Redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=1)
+            pipe = client.pipeline(transaction=False)
+            for queue in queues:
+                for key in keys[queue]:
+                    pipe.llen(key)
+            lengths = iter(pipe.execute())
+        except redis.RedisError:
+            return
+        for queue in queues:
+            gauge.add_metric([queue], sum(next(lengths) for _ in keys[queue]))
+        yield gauge
+
+
+def is_multiprocess() -> bool:
+    return 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+
+def clear_multiprocess_dir() -> None:
+    """
+    Empties PROMETHEUS_MULTIPROC_DIR, creating it if needed. Call once when the
+    server starts, before any worker process writes to it.
+    """
+    if is_multiprocess():
+        path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def mark_process_dead(pid: int) -> None:
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+if not is_multiprocess():
+    REGISTRY.register(QueueDepthCollector())
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Get the registry to expose: this process's, or one aggregating every
+    process writing to PROMETHEUS_MULTIPROC_DIR.
+    """
+    if not is_multiprocess():
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(QueueDepthCollector())
+    return registry
+
+
+def render_metrics() -> bytes:
+    """
+    Renders every metric in the text exposition format.
+    """
+    return generate_latest(get_registry())
+
+
+def start_metrics_server(port: int) -> None:
+    """
+    Serves the metrics on port from a background thread, for processes
+    without /metrics such as Celery workers.
+    """
+    start_http_server(port, registry=get_registry())
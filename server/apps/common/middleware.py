@@ -0,0 +1,306 @@
+import hashlib
+import logging
+import tempfile
+import time
+import uuid
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .metrics import record_cache_lookup
+from .performance import record_request_metrics, request_metrics_recorded
+from .profiling import (
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILE_MODE_HEADER,
+    PROFILE_MODES,
+    get_profiling_user,
+    profile_request,
+    worker_profiler,
+)
+from .queries import QueryCounter, get_query_budget
+from .slow_queries import schedule_slow_queries
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({'POST', 'PATCH'})
+REPLAY_HEADER = 'Idempotent-Replayed'
+# Diagnostics that describe the original request, not the response being replayed
+UNREPLAYED_HEADERS = frozenset({'server-timing', PROFILE_ID_HEADER.lower()})
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+def get_idempotency_scope(request: HttpRequest) -> Optional[str]:
+    """
+    Get the caller an Idempotency-Key belongs to, None for anonymous callers.
+
+    Access tokens are only validated, not looked up, so a replay stays free of
+    queries and a retry with a refreshed token keeps its scope.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is not None:
+        try:
+            token = authentication.get_validated_token(raw_token)
+        except (InvalidToken, TokenError):
+            return None
+        user_id = token.get(jwt_settings.USER_ID_CLAIM)
+        return f"user:{user_id}" if user_id is not None else None
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return None
+
+
+def get_idempotency_cache_key(request: HttpRequest, key: str, scope: str) -> str:
+    """
+    Scopes an Idempotency-Key to the caller, method and path.
+    """
+    scope = '\n'.join([scope, request.method, request.path, key])
+    return f"idempotency:{hashlib.sha256(scope.encode('utf-8')).hexdigest()}"
+
+
+def get_body_hash(request: HttpRequest) -> str:
+    """
+    Hashes the request body to tell a retry from a different request.
+
+    Multipart bodies are not loaded through request.body, that would hold every
+    upload in memory (or fail with RequestDataTooBig) before the view streams it.
+    They are hashed while being copied to a temporary file, spooled in memory up
+    to FILE_UPLOAD_MAX_MEMORY_SIZE, which the view then reads instead.
+    """
+    content_type = request.META.get('CONTENT_TYPE', '')
+    if not content_type.startswith('multipart/'):
+        return hashlib.sha256(request.body).hexdigest()
+
+    digest = hashlib.sha256()
+    body = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    # Read from the stream directly: request.read() would mark the body as read
+    # and stop Django from parsing the upload afterwards
+    while chunk := request._stream.read(BODY_CHUNK_SIZE):
+        digest.update(chunk)
+        body.write(chunk)
+    body.seek(0)
+    request._stream = body
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response for write requests that repeat an Idempotency-Key.
+
+    The first response (anything but a 5xx) is kept in the cache, headers
+    included except per-request diagnostics, for IDEMPOTENCY_KEY_TTL_SECONDS. Concurrent duplicates are
+    collapsed with a cache lock: they wait for the first request to finish and
+    get its response. Keys are scoped to the authenticated user, anonymous
+    requests are passed through.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        key = request.headers.get('Idempotency-Key')
+        if not key or request.method not in IDEMPOTENT_METHODS:
+            return self.get_response(request)
+
+        if len(key) > 255:
+            return JsonResponse(
+                {'detail': 'Idempotency-Key must be at most 255 characters.'},
+                status=400
+            )
+
+        scope = get_idempotency_scope(request)
+        if scope is None:
+            return self.get_response(request)
+
+        cache_key = get_idempotency_cache_key(request, key, scope)
+        body_hash = get_body_hash(request)
+
+        stored = cache.get(cache_key)
+        record_cache_lookup('idempotency', stored is not None)
+        if stored is not None:
+            return self._replay(stored, body_hash)
+
+        lock_key = f"{cache_key}:lock"
+        lock_timeout = getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', 30)
+        lock_token = uuid.uuid4().hex
+        locked_at = time.monotonic()
+        if not cache.add(lock_key, lock_token, timeout=lock_timeout):
+            stored = self._wait_for_response(cache_key)
+            if stored is not None:
+                return self._replay(stored, body_hash)
+            return JsonResponse(
+                {'detail': 'A request with this Idempotency-Key is already in progress.'},
+                status=409
+            )
+
+        try:
+            response = self.get_response(request)
+            if response.status_code < 500 and not response.streaming:
+                cache.set(
+                    cache_key,
+                    {
+                        'body_hash': body_hash,
+                        'status': response.status_code,
+                        'content': response.content,
+                        'content_type': response.get('Content-Type'),
+                        'headers': {
+                            header: value for header, value in response.items()
+                            if header.lower() not in UNREPLAYED_HEADERS
+                        },
+                    },
+                    timeout=getattr(settings, 'IDEMPOTENCY_KEY_TTL_SECONDS', 24 * 60 * 60),
+                )
+        finally:
+            self._release(lock_key, lock_token, locked_at + lock_timeout)
+
+        return response
+
+    def _release(self, lock_key: str, lock_token: str, expires_at: float) -> None:
+        # Once the lock has expired another request may hold it, only a lock
+        # that is still ours and not about to expire is deleted
+        if time.monotonic() < expires_at - 1 and cache.get(lock_key) == lock_token:
+            cache.delete(lock_key)
+
+    def _wait_for_response(self, cache_key: str) -> Optional[dict]:
+        deadline = time.monotonic() + getattr(settings, 'IDEMPOTENCY_LOCK_WAIT_SECONDS', 5)
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return stored
+        return None
+
+    def _replay(self, stored: dict, body_hash: str) -> HttpResponse:
+        if stored['body_hash'] != body_hash:
+            return JsonResponse(
+                {'detail': 'Idempotency-Key was already used with a different request body.'},
+                status=422
+            )
+
+        response = HttpResponse(
+            stored['content'],
+            status=stored['status'],
+            content_type=stored['content_type'],
+        )
+        for header, value in stored.get('headers', {}).items():
+            response[header] = value
+        response[REPLAY_HEADER] = 'true'
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Logs requests that run more queries than their URL's QUERY_BUDGETS entry,
+    with the SQL fingerprints that repeated.
+
+    Only active with QUERY_BUDGET_DEBUG, counting every query has a cost.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        if not getattr(settings, 'QUERY_BUDGET_DEBUG', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        name = match.url_name if match else None
+        budget = get_query_budget(name, request.method)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                '%s %s (%s) exceeded its query budget of %s: %s',
+                request.method, request.path, name, budget, counter.describe(),
+            )
+        return response
+
+
+
+class PerformanceMiddleware:
+    """
+    Measures wall, database, Redis and serialization time for every request.
+
+    Each request is logged as one structured line and sent through
+    request_metrics_recorded. With SERVER_TIMING the numbers are also returned
+    in a Server-Timing header, which should stay off in production.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING', False)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with record_request_metrics() as metrics:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view = match.url_name if match else None
+        logger.info(
+            'request method=%s path=%s view=%s status=%s total_ms=%.1f db_queries=%d db_ms=%.1f '
+            'redis_calls=%d redis_ms=%.1f serialize_ms=%.1f',
+            request.method, request.path, view, response.status_code, metrics.total_ms,
+            metrics.db_queries, metrics.db_ms, metrics.redis_calls, metrics.redis_ms, metrics.serialize_ms,
+            extra={'request_metrics': {
+                'method': request.method, 'view': view, 'status': response.status_code, **metrics.as_dict(),
+            }},
+        )
+        request_metrics_recorded.send(sender=self.__class__, request=request, response=response, metrics=metrics)
+        if metrics.slow_queries:
+            schedule_slow_queries(metrics.slow_queries, view)
+
+        if self.server_timing:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests for staff, and ends signal-started worker profiles.
+
+    A request carrying a valid X-Profile token (see make_profile_token) runs
+    under cProfile, or tracemalloc with X-Profile-Mode: memory, and its response
+    names the stored profile in X-Profile-Id. Requests without the header only
+    pay for a header lookup. CPU profiles are refused with a 409 while a worker
+    profile runs, a second cProfile would replace or fail to start beside it.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        token = request.headers.get(PROFILE_HEADER)
+        if token is None:
+            response = self.get_response(request)
+            if worker_profiler.active:
+                worker_profiler.stop_if_expired()
+            return response
+
+        mode = request.headers.get(PROFILE_MODE_HEADER, 'cpu')
+        if mode not in PROFILE_MODES:
+            return JsonResponse(
+                {'detail': f"{PROFILE_MODE_HEADER} must be one of: {', '.join(PROFILE_MODES)}."},
+                status=400
+            )
+        if get_profiling_user(token) is None:
+            return JsonResponse({'detail': 'Invalid or expired profiling token.'}, status=403)
+        if mode == 'cpu' and worker_profiler.active:
+            return JsonResponse(
+                {'detail': 'A worker profile is running, retry once it has ended.'},
+                status=409
+            )
+
+        with profile_request(mode, f"{request.method} {request.path}") as profile:
+            response = self.get_response(request)
+        response[PROFILE_ID_HEADER] = profile.profile_id
+        return response
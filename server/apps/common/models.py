@@ -0,0 +1,72 @@
+from django.db import models
+from django.utils import timezone
+
+from apps.common.model_utils import Currency
+
+
+class FxRate(models.Model):
+    """
+    Exchange rate: one unit of base_currency buys rate units of quote_currency.
+    """
+    base_currency = models.CharField(max_length=3, choices=Currency.choices)
+    quote_currency = models.CharField(max_length=3, choices=Currency.choices)
+    rate = models.DecimalField(max_digits=18, decimal_places=8)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['base_currency', 'quote_currency'], name='unique_fx_rate_pair'),
+        ]
+
+    def __str__(self):
+        return f"{self.base_currency}/{self.quote_currency} {self.rate}"
+
+
+class SlowQuery(models.Model):
+    """
+    A sampled query that ran over SLOW_QUERY_THRESHOLD_MS, with its plan on PostgreSQL.
+    """
+    fingerprint_hash = models.CharField(max_length=16, db_index=True)
+    fingerprint = models.TextField()
+    sql = models.TextField()
+    params = models.JSONField(default=list)
+    duration_ms = models.FloatField()
+    view = models.CharField(max_length=255, blank=True)
+    frame = models.CharField(max_length=500, blank=True)
+    plan = models.JSONField(null=True, blank=True)
+    plan_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f}ms {self.view} {self.fingerprint[:80]}"
+
+
+class OutboxMessage(models.Model):
+    """
+    A Celery task to publish once the transaction that wrote it commits.
+    failed_at is set once publishing gave up after OUTBOX_MAX_ATTEMPTS.
+    """
+    task_name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['available_at'],
+                condition=models.Q(dispatched_at__isnull=True, failed_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} #{self.id}"
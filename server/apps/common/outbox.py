@@ -0,0 +1,143 @@
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_task(task, args: Iterable = (), kwargs: Optional[dict] = None) -> OutboxMessage:
+    """
+    Records a task to publish once the current transaction commits.
+
+    The message is written in the caller's transaction, so a rollback drops it
+    along with the domain change, and a crash after commit leaves it for
+    relay_outbox. With OUTBOX_DISPATCH_ON_COMMIT it is also published right
+    after the commit, so it does not wait for the next relay. Delivery is at
+    least once: tasks sent through the outbox must tolerate a duplicate.
+    """
+    message = OutboxMessage.objects.create(task_name=task.name, args=list(args), kwargs=kwargs or {})
+    if getattr(settings, 'OUTBOX_DISPATCH_ON_COMMIT', True):
+        transaction.on_commit(lambda: dispatch_messages([message], retry=False))
+    return message
+
+
+@contextmanager
+def get_producer(retry: bool):
+    """
+    Get a producer for publishing, None in eager mode, which runs tasks
+    in-process and never needs a broker connection.
+
+    Without retry the producer gets a connection of its own that gives up after
+    OUTBOX_PUBLISH_TIMEOUT_SECONDS, since the caller is serving a request.
+    """
+    if current_app.conf.task_always_eager:
+        yield None
+        return
+    if retry:
+        with current_app.producer_or_acquire() as producer:
+            yield producer
+        return
+
+    timeout = getattr(settings, 'OUTBOX_PUBLISH_TIMEOUT_SECONDS', 1)
+    with current_app.connection_for_write(
+        connect_timeout=timeout,
+        transport_options={'socket_connect_timeout': timeout, 'socket_timeout': timeout, 'max_retries': 0},
+    ) as connection:
+        yield current_app.amqp.Producer(connection)
+
+
+def dispatch_messages(messages: list[OutboxMessage], retry: bool = True) -> int:
+    """
+    Publishes messages over one broker connection and marks the sent ones.
+
+    retry=False makes a publish fail fast instead of going through Celery's
+    retry policy, for the on-commit dispatch that runs inside the request.
+    Nothing waits on an outbox task's result, so publishing never touches the
+    result backend, whose reconnects would otherwise block for seconds.
+    A failed publish is recorded on the message and retried by the relay after
+    a backoff, up to OUTBOX_MAX_ATTEMPTS; then the message is marked failed and
+    left for an operator. Returns the number published.
+    """
+    sent = []
+    failed = []
+    try:
+        with get_producer(retry) as producer:
+            for message in messages:
+                try:
+                    current_app.tasks[message.task_name].apply_async(
+                        message.args, message.kwargs, producer=producer, retry=retry, ignore_result=True
+                    )
+                    sent.append(message.id)
+                except Exception as e:
+                    logger.warning('Publishing outbox message %s failed: %s', message.id, e)
+                    failed.append((message, str(e)))
+    except Exception as e:
+        # The broker could not be reached at all
+        logger.warning('Connecting to the broker for %s outbox messages failed: %s', len(messages), e)
+        handled = set(sent) | {message.id for message, _ in failed}
+        failed += [(message, str(e)) for message in messages if message.id not in handled]
+
+    now = timezone.now()
+    if sent:
+        OutboxMessage.objects.filter(id__in=sent, dispatched_at__isnull=True).update(dispatched_at=now)
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 10)
+    for message, error in failed:
+        attempts = message.attempts + 1
+        if attempts >= max_attempts:
+            logger.error('Outbox message %s failed %s times, giving up: %s', message.id, attempts, error)
+            OutboxMessage.objects.filter(id=message.id).update(attempts=attempts, last_error=error, failed_at=now)
+            continue
+        backoff = getattr(settings, 'OUTBOX_RETRY_BACKOFF_SECONDS', 5) * 2 ** min(message.attempts, 8)
+        OutboxMessage.objects.filter(id=message.id).update(
+            attempts=attempts,
+            last_error=error,
+            available_at=now + timedelta(seconds=backoff),
+        )
+    return len(sent)
+
+
+def relay_outbox(batch_size: Optional[int] = None) -> int:
+    """
+    Publishes pending messages in batches until none are due.
+
+    Messages younger than OUTBOX_RELAY_GRACE_SECONDS are left to their on-commit
+    dispatch, failed ones to an operator. Rows are claimed with SKIP LOCKED, so several relays can run at
+    once without publishing the same batch twice. Returns the number published.
+    """
+    batch_size = batch_size or getattr(settings, 'OUTBOX_RELAY_BATCH_SIZE', 500)
+    grace = timedelta(seconds=getattr(settings, 'OUTBOX_RELAY_GRACE_SECONDS', 10))
+    published = 0
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(
+                    dispatched_at__isnull=True,
+                    failed_at__isnull=True,
+                    available_at__lte=now,
+                    created_at__lte=now - grace,
+                )
+                .order_by('available_at', 'id')[:batch_size]
+            )
+            published += dispatch_messages(batch)
+        if len(batch) < batch_size:
+            return published
+
+
+def purge_outbox(days: Optional[int] = None) -> int:
+    """
+    Deletes messages dispatched more than OUTBOX_RETENTION_DAYS ago.
+    """
+    days = days if days is not None else getattr(settings, 'OUTBOX_RETENTION_DAYS', 7)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboxMessage.objects.filter(dispatched_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,71 @@
+import base64
+import json
+from typing import Optional
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset newest first on (created_at, id) with an opaque cursor.
+
+    Each page filters past the last row of the previous one, so the cost of a page
+    does not grow with its depth the way OFFSET does.
+    """
+
+    def __init__(self, page_size: int, max_page_size: int) -> None:
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    def encode_cursor(self, obj) -> str:
+        payload = json.dumps({'created_at': obj.created_at.isoformat(), 'id': obj.pk})
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor: str) -> tuple:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            created_at = parse_datetime(payload['created_at'])
+            pk = int(payload['id'])
+        except (ValueError, TypeError, KeyError, UnicodeEncodeError):
+            raise InvalidCursor('Invalid cursor.')
+
+        if created_at is None:
+            raise InvalidCursor('Invalid cursor.')
+        return created_at, pk
+
+    def get_page_size(self, value: Optional[str]) -> int:
+        try:
+            page_size = int(value)
+        except (ValueError, TypeError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate(
+        self,
+        queryset: QuerySet,
+        cursor: Optional[str] = None,
+        page_size: Optional[str] = None,
+    ) -> tuple[list, Optional[str]]:
+        """
+        Returns the page of objects and the cursor for the next page, if any.
+        """
+        size = self.get_page_size(page_size)
+        queryset = queryset.order_by('-created_at', '-id')
+
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset[:size + 1])
+        if len(rows) > size:
+            rows = rows[:size]
+            return rows, self.encode_cursor(rows[-1])
+        return rows, None
@@ -0,0 +1,153 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.db import connections
+from django.dispatch import Signal
+from redis import Redis
+from redis.client import Pipeline
+
+from .slow_queries import get_slow_query_threshold_ms, make_sample, should_sample
+
+# Sent after every instrumented request. Receivers get ``request``,
+# ``response`` and ``metrics`` (a RequestMetrics).
+request_metrics_recorded = Signal()
+
+
+@dataclass
+class RequestMetrics:
+    """
+    Where a request spent its time, durations in milliseconds.
+    """
+    total_ms: float = 0.0
+    db_queries: int = 0
+    db_ms: float = 0.0
+    redis_calls: int = 0
+    redis_ms: float = 0.0
+    serialize_ms: float = 0.0
+    slow_queries: list[dict] = field(default_factory=list)
+
+    @property
+    def app_ms(self) -> float:
+        return max(self.total_ms - self.db_ms - self.redis_ms - self.serialize_ms, 0.0)
+
+    def as_dict(self) -> dict:
+        return {
+            'total_ms': self.total_ms,
+            'db_queries': self.db_queries,
+            'db_ms': self.db_ms,
+            'redis_calls': self.redis_calls,
+            'redis_ms': self.redis_ms,
+            'serialize_ms': self.serialize_ms,
+            'app_ms': self.app_ms,
+        }
+
+    def server_timing(self) -> str:
+        """
+        Formats the metrics as a Server-Timing header value.
+        """
+        return ', '.join([
+            f'db;dur={self.db_ms:.1f};desc="{self.db_queries} queries"',
+            f'redis;dur={self.redis_ms:.1f};desc="{self.redis_calls} calls"',
+            f'serialize;dur={self.serialize_ms:.1f}',
+            f'app;dur={self.app_ms:.1f}',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar('request_metrics', default=None)
+
+
+def get_current_metrics() -> Optional[RequestMetrics]:
+    """
+    Get the metrics of the request being handled, or None outside of one.
+    """
+    return _current_metrics.get()
+
+
+class DatabaseTimer:
+    """
+    Execute wrapper adding the count and duration of every query to metrics.
+
+    Queries over SLOW_QUERY_THRESHOLD_MS are sampled into metrics.slow_queries
+    with the project frame that ran them.
+    """
+
+    def __init__(self, metrics: RequestMetrics) -> None:
+        self.metrics = metrics
+        self.slow_threshold_ms = get_slow_query_threshold_ms()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.metrics.db_queries += 1
+            self.metrics.db_ms += elapsed_ms
+            if 0 < self.slow_threshold_ms <= elapsed_ms and not many and should_sample():
+                self.metrics.slow_queries.append(make_sample(sql, params, elapsed_ms))
+
+
+class record_request_metrics:
+    """
+    Collects RequestMetrics for the block it wraps.
+
+    Installs a DatabaseTimer on every connection and makes the metrics current
+    so the Redis client and renderer can add to them.
+    """
+
+    def __enter__(self) -> RequestMetrics:
+        self.metrics = RequestMetrics()
+        self._token = _current_metrics.set(self.metrics)
+        self._wrappers = [
+            connection.execute_wrapper(DatabaseTimer(self.metrics)) for connection in connections.all()
+        ]
+        for wrapper in self._wrappers:
+            wrapper.__enter__()
+        self._started = time.perf_counter()
+        return self.metrics
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.total_ms = (time.perf_counter() - self._started) * 1000
+        for wrapper in reversed(self._wrappers):
+            wrapper.__exit__(*exc_info)
+        _current_metrics.reset(self._token)
+
+
+class timed_redis:
+    """
+    Adds one Redis round trip and its duration to the current request, if any.
+    """
+
+    def __enter__(self) -> None:
+        self.metrics = get_current_metrics()
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        if self.metrics is not None:
+            self.metrics.redis_calls += 1
+            self.metrics.redis_ms += (time.perf_counter() - self._started) * 1000
+
+
+class InstrumentedPipeline(Pipeline):
+    def execute(self, *args, **kwargs):
+        with timed_redis():
+            return super().execute(*args, **kwargs)
+
+
+class InstrumentedRedis(Redis):
+    """
+    redis-py client that records each round trip, a pipeline counting once.
+
+    Set as django-redis's REDIS_CLIENT_CLASS, so both the cache API and
+    get_raw_redis_client() are measured.
+    """
+
+    def execute_command(self, *args, **options):
+        with timed_redis():
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
@@ -0,0 +1,206 @@
+import cProfile
+import logging
+import marshal
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from typing import Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODE_HEADER = 'X-Profile-Mode'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILE_MODES = ('cpu', 'memory')
+TOKEN_SALT = 'apps.common.profiling'
+
+# Stored profile formats with the file extension they download as
+PSTATS = 'pstats'
+COLLAPSED = 'collapsed'
+EXTENSIONS = {PSTATS: 'prof', COLLAPSED: 'collapsed.txt'}
+
+
+def make_profile_token(user) -> str:
+    """
+    Signs a token letting a staff user profile their own requests for a while.
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def get_profiling_user(token: str):
+    """
+    Get the active staff user a profiling token was issued to, or None.
+    """
+    from apps.identity.models import User
+
+    max_age = getattr(settings, 'PROFILE_TOKEN_MAX_AGE_SECONDS', 15 * 60)
+    try:
+        user_id = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=user_id, is_staff=True, is_active=True).first()
+
+
+def get_profile_key(profile_id: str) -> str:
+    return f"profile:{profile_id}"
+
+
+def store_profile(content: bytes, profile_format: str, label: str) -> str:
+    """
+    Stores a profile for download and returns its ID.
+    """
+    profile_id = uuid.uuid4().hex
+    cache.set(
+        get_profile_key(profile_id),
+        {'format': profile_format, 'label': label, 'content': content},
+        timeout=getattr(settings, 'PROFILE_TTL_SECONDS', 60 * 60),
+    )
+    return profile_id
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    return cache.get(get_profile_key(profile_id))
+
+
+def dump_pstats(profiler: cProfile.Profile) -> bytes:
+    """
+    Serializes a profiler the way pstats.Stats.dump_stats does, so the download
+    loads with pstats, snakeviz or flameprof.
+    """
+    return marshal.dumps(pstats.Stats(profiler).stats)
+
+
+def collapse_snapshot(snapshot: tracemalloc.Snapshot) -> bytes:
+    """
+    Formats live allocations as collapsed stacks ("outer;inner bytes" lines),
+    the input format of flamegraph.pl and speedscope.
+    """
+    own_files = (tracemalloc.__file__, __file__)
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, path) for path in own_files])
+    sizes = Counter()
+    for stat in snapshot.statistics('traceback'):
+        stack = ';'.join(f"{frame.filename}:{frame.lineno}" for frame in reversed(stat.traceback))
+        sizes[stack] += stat.size
+    return '\n'.join(f"{stack} {size}" for stack, size in sizes.most_common()).encode('utf-8')
+
+
+def start_memory_trace() -> bool:
+    """
+    Starts tracemalloc unless it already runs, returns whether it was started here.
+    """
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(getattr(settings, 'PROFILE_TRACEMALLOC_FRAMES', 25))
+    return True
+
+
+class profile_request:
+    """
+    Profiles the block in one mode and stores the result, its ID ends up in profile_id.
+
+    cpu runs cProfile on the current thread. memory records the allocations still
+    alive at the end of the block; tracemalloc is process wide, so on a threaded
+    server concurrent requests show up too.
+    """
+
+    def __init__(self, mode: str, label: str) -> None:
+        self.mode = mode
+        self.label = label
+        self.profile_id: Optional[str] = None
+
+    def __enter__(self) -> 'profile_request':
+        if self.mode == 'cpu':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.started_trace = start_memory_trace()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.mode == 'cpu':
+            self.profiler.disable()
+            self.profile_id = store_profile(dump_pstats(self.profiler), PSTATS, self.label)
+            return
+
+        snapshot = tracemalloc.take_snapshot()
+        if self.started_trace:
+            tracemalloc.stop()
+        self.profile_id = store_profile(collapse_snapshot(snapshot), COLLAPSED, self.label)
+
+
+class WorkerProfiler:
+    """
+    Profiles a whole worker for a window, started and stopped by a signal.
+
+    The first signal starts cProfile on the main thread and tracemalloc. The
+    window ends on the next signal, or on the first request to finish after
+    PROFILE_WINDOW_SECONDS. Both profiles are stored and their IDs logged.
+    """
+
+    def __init__(self) -> None:
+        self.profiler: Optional[cProfile.Profile] = None
+        self.started_at = 0.0
+        self.started_trace = False
+
+    @property
+    def active(self) -> bool:
+        return self.profiler is not None
+
+    def start(self) -> None:
+        self.profiler = cProfile.Profile()
+        self.started_trace = start_memory_trace()
+        self.started_at = time.monotonic()
+        self.profiler.enable()
+        logger.info('Worker %s profiling started', os.getpid())
+
+    def stop(self) -> list[str]:
+        profiler, self.profiler = self.profiler, None
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self.started_trace:
+            tracemalloc.stop()
+
+        label = f"worker-{os.getpid()}"
+        profile_ids = [
+            store_profile(dump_pstats(profiler), PSTATS, label),
+            store_profile(collapse_snapshot(snapshot), COLLAPSED, label),
+        ]
+        logger.info('Worker %s profiling stopped, profiles %s', os.getpid(), ', '.join(profile_ids))
+        return profile_ids
+
+    def toggle(self, signum=None, frame=None) -> None:
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def stop_if_expired(self) -> None:
+        window = getattr(settings, 'PROFILE_WINDOW_SECONDS', 60)
+        if self.active and time.monotonic() - self.started_at >= window:
+            self.stop()
+
+
+worker_profiler = WorkerProfiler()
+
+
+def install_profiling_signal() -> None:
+    """
+    Makes PROFILE_SIGNAL (SIGUSR2 by default) toggle worker profiling.
+    """
+    name = getattr(settings, 'PROFILE_SIGNAL', 'SIGUSR2')
+    signum = getattr(signal, name, None) if name else None
+    if signum is None:
+        return
+    try:
+        signal.signal(signum, worker_profiler.toggle)
+    except ValueError:
+        # Only the main thread may install handlers, e.g. not under some test runners
+        pass
@@ -0,0 +1,113 @@
+import re
+from collections import Counter
+from contextlib import ContextDecorator
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Normalizes SQL so queries that differ only in their parameters compare equal.
+
+    Literals become ?, IN lists collapse to (...), so the N queries of an N+1
+    share one fingerprint.
+    """
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def get_query_budget(name: Optional[str], method: Optional[str] = None) -> Optional[int]:
+    """
+    Get the declared maximum number of queries for a URL name, or None.
+
+    A budget is either one number for the URL or a dict per HTTP method.
+    """
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(name)
+    if isinstance(budget, dict):
+        return budget.get(method.upper()) if method else max(budget.values())
+    return budget
+
+
+class QueryCounter:
+    """
+    Records the SQL run on every database connection while active.
+
+    Uses execute wrappers rather than connection.queries, so it works with
+    DEBUG off and sees queries no matter which code path runs them.
+    """
+
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+        self._wrapped = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> 'QueryCounter':
+        for connection in connections.all():
+            wrapper = connection.execute_wrapper(self)
+            wrapper.__enter__()
+            self._wrapped.append(wrapper)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        while self._wrapped:
+            self._wrapped.pop().__exit__(*exc_info)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def duplicates(self) -> dict[str, int]:
+        """
+        Get the fingerprints that ran more than once, most repeated first.
+        """
+        counts = Counter(fingerprint_sql(sql) for sql in self.queries)
+        return {fingerprint: count for fingerprint, count in counts.most_common() if count > 1}
+
+    def describe(self) -> str:
+        lines = [f"{self.count} queries"]
+        lines += [f"  {count}x {fingerprint}" for fingerprint, count in self.duplicates().items()]
+        return '\n'.join(lines)
+
+
+class assert_query_budget(ContextDecorator):
+    """
+    Fails when the wrapped block runs more queries than budget allows.
+
+    budget is either a number or a URL name declared in QUERY_BUDGETS, with
+    method picking a per-method budget. Usable as a context manager or a
+    decorator; the failure lists the repeated SQL.
+    """
+
+    def __init__(self, budget, method: Optional[str] = None) -> None:
+        self.name = budget if isinstance(budget, str) else None
+        self.budget = get_query_budget(budget, method) if self.name else budget
+        if self.budget is None:
+            raise KeyError(f"No query budget declared for {budget!r} {method or ''}".rstrip())
+
+    def __enter__(self) -> QueryCounter:
+        self.counter = QueryCounter().__enter__()
+        return self.counter
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.counter.__exit__(exc_type, exc, tb)
+        if exc_type is None and self.counter.count > self.budget:
+            label = f"{self.name} " if self.name else ''
+            raise QueryBudgetExceeded(
+                f"{label}exceeded its budget of {self.budget}: {self.counter.describe()}"
+            )
@@ -1,5 +1,6 @@
 from typing import Optional
 from django.core.cache import cache
+from django_redis import get_redis_connection
 
 
 def get_redis_client():
@@ -7,6 +8,11 @@ def get_redis_client():
     return cache
 
 
+def get_raw_redis_client():
+    """Returns the underlying redis-py client for commands the cache API lacks."""
+    return get_redis_connection('default')
+
+
 def get_jti_key(jti: str) -> str:
     return f"magic_link:jti:{jti}"
 
@@ -34,3 +40,27 @@ def delete_magic_link_jti(jti: str) -> None:
     key = get_jti_key(jti)
     cache.delete(key)
 
+
+def get_version_key(name: str) -> str:
+    return f"version:{name}"
+
+
+def get_cache_version(name: str) -> int:
+    """
+    Returns the current version counter for a cached dataset.
+    """
+    key = get_version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_cache_version(name: str) -> int:
+    """
+    Increments the version counter so every process drops its cached copy.
+    """
+    key = get_version_key(name)
+    cache.add(key, 1, timeout=None)
+    return cache.incr(key)
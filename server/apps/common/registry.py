@@ -0,0 +1,75 @@
+import abc
+import time
+from typing import Generic, Optional, TypeVar
+
+from django.conf import settings
+
+from .metrics import record_cache_lookup
+from .redis import bump_cache_version, get_cache_version
+
+T = TypeVar('T')
+
+
+class VersionedRegistry(abc.ABC, Generic[T]):
+    """
+    In-process copy of a small table, reloaded when its shared cache version changes.
+
+    The version is only checked every check_seconds_setting seconds (check_seconds
+    when unset), so most reads are attribute hits. Subclasses set the class
+    attributes and implement load(); loaded data is shared across requests and
+    must not be mutated.
+    """
+    version_name: str
+    metric_name: str
+    check_seconds_setting: str
+    check_seconds: int = 60
+
+    def __init__(self) -> None:
+        self._data: Optional[T] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._forced_at: Optional[float] = None
+
+    @abc.abstractmethod
+    def load(self) -> T:
+        """
+        Reads the full dataset from the DB.
+        """
+
+    def get_data(self, force: bool = False) -> T:
+        """
+        Get the loaded data, reloading it first if the shared version moved on.
+
+        force re-checks the version ahead of schedule, but at most once per check
+        interval, so a stream of lookups for unknown keys cannot force reloads.
+        """
+        now = time.monotonic()
+        interval = getattr(settings, self.check_seconds_setting, self.check_seconds)
+        if force:
+            force = self._forced_at is None or now - self._forced_at >= interval
+            if force:
+                self._forced_at = now
+        if not force and self._version is not None and now - self._checked_at < interval:
+            record_cache_lookup(self.metric_name, True)
+            return self._data
+
+        version = get_cache_version(self.version_name)
+        record_cache_lookup(self.metric_name, version == self._version)
+        if version != self._version:
+            self._data = self.load()
+            self._version = version
+        self._checked_at = now
+        return self._data
+
+    def invalidate(self) -> None:
+        """
+        Drops the local copy so the next lookup reloads from the DB.
+        """
+        self._version = None
+
+    def bump_version(self) -> None:
+        """
+        Invalidates the registry in every process.
+        """
+        self.invalidate()
+        bump_cache_version(self.version_name)
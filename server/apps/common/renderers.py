@@ -0,0 +1,20 @@
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from .performance import get_current_metrics
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that adds its encoding time to the current request's metrics.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics = get_current_metrics()
+            if metrics is not None:
+                metrics.serialize_ms += (time.perf_counter() - started) * 1000
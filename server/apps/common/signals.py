@@ -0,0 +1,63 @@
+import logging
+import time
+
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_shutdown
+from django.conf import settings
+from django.dispatch import receiver
+
+from apps.common.metrics import (
+    TASK_DURATION,
+    clear_multiprocess_dir,
+    is_multiprocess,
+    mark_process_dead,
+    observe_request,
+    start_metrics_server,
+)
+from apps.common.performance import request_metrics_recorded
+
+logger = logging.getLogger(__name__)
+
+# Start times of the tasks running in this worker process, by task ID
+_task_started: dict[str, float] = {}
+
+
+@receiver(request_metrics_recorded)
+def export_request_metrics(sender, request, response, metrics, **kwargs) -> None:
+    match = request.resolver_match
+    route = match.url_name if match and match.url_name else 'unmatched'
+    observe_request(route, request.method, response.status_code, metrics)
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs) -> None:
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+@worker_init.connect
+def start_worker_metrics(**kwargs) -> None:
+    """
+    Serves task metrics from the worker's main process on METRICS_WORKER_PORT.
+
+    Tasks run in pool processes, which only reach the main process through
+    PROMETHEUS_MULTIPROC_DIR; it is cleared here, before the pool starts.
+    """
+    port = getattr(settings, 'METRICS_WORKER_PORT', 0)
+    if not port:
+        return
+    if is_multiprocess():
+        clear_multiprocess_dir()
+    else:
+        logger.warning('PROMETHEUS_MULTIPROC_DIR is not set, metrics of pool processes will not be served')
+    start_metrics_server(port)
+
+
+@worker_process_shutdown.connect
+def mark_worker_process_dead(pid, **kwargs) -> None:
+    mark_process_dead(pid)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import random
+import traceback
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .models import SlowQuery
+from .queries import fingerprint_sql
+
+APPS_DIR = str(Path(__file__).resolve().parents[1])
+
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def get_slow_query_threshold_ms() -> float:
+    """
+    Queries at least this slow are sampled, 0 turns the sampler off.
+    """
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 0)
+
+
+def should_sample() -> bool:
+    return random.random() < getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 1.0)
+
+
+def get_fingerprint_hash(fingerprint: str) -> str:
+    return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+
+
+def get_origin_frame() -> str:
+    """
+    Get the innermost project frame on the stack, skipping Django and libraries.
+    """
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(APPS_DIR) and not frame.filename.endswith(('performance.py', 'slow_queries.py')):
+            return f"{Path(frame.filename).relative_to(Path(APPS_DIR).parent)}:{frame.lineno} in {frame.name}"
+    return ''
+
+
+def to_json_param(value):
+    """
+    Converts a query parameter to something JSON (and so Celery) can carry,
+    in a form the database still accepts when the query is explained.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [to_json_param(item) for item in value]
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return None
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def can_explain(sql: str) -> bool:
+    return connection.vendor == 'postgresql' and sql.lstrip().upper().startswith(EXPLAINABLE)
+
+
+def redact_params(params):
+    """
+    Replaces every parameter with its type name, keeping the shape of the list.
+    """
+    if isinstance(params, dict):
+        return {key: redact_params(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [redact_params(value) for value in params]
+    return type(params).__name__
+
+
+def make_sample(sql: str, params, duration_ms: float) -> dict:
+    """
+    Builds the sample the recording task receives. Parameters can be emails,
+    tokens or hashes, so params only keeps their types; the values travel in
+    explain_params when, and only when, the task needs them for EXPLAIN.
+    """
+    sample = {
+        'sql': sql,
+        'params': redact_params(params or []),
+        'duration_ms': round(duration_ms, 3),
+        'frame': get_origin_frame(),
+    }
+    if can_explain(sql):
+        if isinstance(params, dict):
+            sample['explain_params'] = {key: to_json_param(value) for key, value in params.items()}
+        else:
+            sample['explain_params'] = [to_json_param(value) for value in params or ()]
+    return sample
+
+
+def schedule_slow_queries(samples: list[dict], view: Optional[str]) -> None:
+    """
+    Queues slow query samples for storage, at most one per fingerprint every
+    SLOW_QUERY_THROTTLE_SECONDS so a bad plan on a hot path cannot flood the table.
+    """
+    from .tasks import record_slow_query_task
+
+    throttle = getattr(settings, 'SLOW_QUERY_THROTTLE_SECONDS', 300)
+    for sample in samples:
+        fingerprint = fingerprint_sql(sample['sql'])
+        if not cache.add(f"slow-query:{get_fingerprint_hash(fingerprint)}", 1, timeout=throttle):
+            continue
+        record_slow_query_task.delay({**sample, 'fingerprint': fingerprint, 'view': view or ''})
+
+
+def explain_query(sql: str, params) -> Optional[list]:
+    """
+    Get the PostgreSQL plan of a query without running it, None elsewhere.
+    """
+    if not can_explain(sql):
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE off, FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def record_slow_query(sample: dict) -> SlowQuery:
+    """
+    Stores a slow query sample with its plan.
+
+    A plan that cannot be captured (a parameter that did not survive the
+    trip, a dropped table) is recorded as the error instead. Parameters are
+    stored redacted unless SLOW_QUERY_STORE_PARAMS is set.
+    """
+    params = sample['params']
+    if getattr(settings, 'SLOW_QUERY_STORE_PARAMS', False) and 'explain_params' in sample:
+        params = sample['explain_params']
+
+    try:
+        plan = explain_query(sample['sql'], sample.get('explain_params'))
+        plan_error = ''
+    except Exception as e:
+        plan, plan_error = None, str(e)
+
+    return SlowQuery.objects.create(
+        fingerprint_hash=get_fingerprint_hash(sample['fingerprint']),
+        fingerprint=sample['fingerprint'],
+        sql=sample['sql'],
+        params=params,
+        duration_ms=sample['duration_ms'],
+        view=sample['view'],
+        frame=sample['frame'],
+        plan=plan,
+        plan_error=plan_error,
+    )
+
+
+def purge_slow_queries(days: Optional[int] = None) -> int:
+    """
+    Deletes samples recorded more than SLOW_QUERY_RETENTION_DAYS ago.
+    """
+    days = days if days is not None else getattr(settings, 'SLOW_QUERY_RETENTION_DAYS', 7)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = SlowQuery.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,36 @@
+from celery import shared_task
+
+from apps.common.outbox import purge_outbox, relay_outbox
+from apps.common.slow_queries import purge_slow_queries, record_slow_query
+
+
+@shared_task
+def record_slow_query_task(sample: dict) -> None:
+    """
+    Celery task to store a slow query sample and capture its plan off the request path.
+    """
+    record_slow_query(sample)
+
+
+@shared_task
+def purge_slow_queries_task() -> int:
+    """
+    Celery beat task to delete slow query samples past retention.
+    """
+    return purge_slow_queries()
+
+
+@shared_task
+def relay_outbox_task() -> int:
+    """
+    Celery beat task to publish outbox messages the on-commit dispatch missed.
+    """
+    return relay_outbox()
+
+
+@shared_task
+def purge_outbox_task() -> int:
+    """
+    Celery beat task to delete dispatched outbox messages past retention.
+    """
+    return purge_outbox()
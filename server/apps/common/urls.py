@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import ProfileDownloadView, ProfileTokenView
+
+urlpatterns = [
+    path('token', ProfileTokenView.as_view(), name='profile-token'),
+    path('<str:profile_id>', ProfileDownloadView.as_view(), name='profile-detail'),
+]
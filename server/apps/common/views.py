@@ -0,0 +1,60 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import render_metrics
+from .profiling import COLLAPSED, EXTENSIONS, PROFILE_HEADER, get_profile, make_profile_token
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Prometheus scrape endpoint. Requires a bearer METRICS_TOKEN, and is only
+    open without one in DEBUG.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
+class ProfileTokenView(APIView):
+    """
+    Issues the calling staff user an X-Profile token for profiling their requests.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request: Request) -> Response:
+        return Response({
+            'token': make_profile_token(request.user),
+            'header': PROFILE_HEADER,
+            'expires_in': getattr(settings, 'PROFILE_TOKEN_MAX_AGE_SECONDS', 15 * 60),
+        })
+
+
+class ProfileDownloadView(APIView):
+    """
+    Downloads a stored profile: pstats for CPU, collapsed stacks for memory.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request, profile_id: str) -> HttpResponse:
+        profile = get_profile(profile_id)
+        if profile is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        content_type = 'text/plain' if profile['format'] == COLLAPSED else 'application/octet-stream'
+        response = HttpResponse(profile['content'], content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{profile_id}.{EXTENSIONS[profile["format"]]}"'
+        )
+        return response
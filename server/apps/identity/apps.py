@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class IdentityConfig(AppConfig):
     name = 'apps.identity'
+
+    def ready(self):
+        from . import signals  # noqa: F401
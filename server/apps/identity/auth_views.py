@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.request import Request
@@ -19,6 +20,7 @@ from apps.identity.serializers import (
     TokenResponseSerializer,
 )
 from apps.identity.tasks import send_magic_link_email_task
+from apps.common.outbox import enqueue_task
 from apps.common.redis import store_magic_link_jti
 
 
@@ -57,8 +59,8 @@ class LoginRequestView(APIView):
         ttl_seconds = getattr(settings, 'MAGIC_LINK_EXPIRY_MINUTES', 30) * 60
         store_magic_link_jti(jti, str(user.id), ttl_seconds)
 
-        # Send email with magic link asynchronously using Celery
-        send_magic_link_email_task.delay(user.id, jti)
+        # Send email with magic link asynchronously through the outbox
+        enqueue_task(send_magic_link_email_task, [user.id, jti])
 
         # Return success response immediately (email is sent asynchronously)
         return Response(
@@ -94,22 +96,23 @@ class RegisterRequestView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create new user
-        user = User.objects.create_user(
-            email=email,
-            first_name=first_name,
-            last_name=last_name
-        )
+        # Create the user and its email in one transaction, a rollback sends nothing
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email=email,
+                first_name=first_name,
+                last_name=last_name
+            )
 
-        # Generate JTI
-        jti = generate_magic_link_jti()
+            # Generate JTI
+            jti = generate_magic_link_jti()
 
-        # Store JTI in Redis with TTL
-        ttl_seconds = getattr(settings, 'MAGIC_LINK_EXPIRY_MINUTES', 30) * 60
-        store_magic_link_jti(jti, str(user.id), ttl_seconds)
+            # Store JTI in Redis with TTL before the email can go out
+            ttl_seconds = getattr(settings, 'MAGIC_LINK_EXPIRY_MINUTES', 30) * 60
+            store_magic_link_jti(jti, str(user.id), ttl_seconds)
 
-        # Send email with magic link asynchronously using Celery
-        send_magic_link_email_task.delay(user.id, jti)
+            # Send email with magic link asynchronously through the outbox
+            enqueue_task(send_magic_link_email_task, [user.id, jti])
 
         # Return success response immediately (email is sent asynchronously)
         return Response(
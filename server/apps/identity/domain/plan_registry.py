@@ -0,0 +1,46 @@
+from typing import Optional
+
+from apps.common.registry import VersionedRegistry
+from apps.identity.models import Plan
+
+PLAN_VERSION_NAME = 'plans'
+
+
+class PlanRegistry(VersionedRegistry[dict[int, Plan]]):
+    """
+    In-process copy of the plan table, reloaded when the shared plan version changes.
+
+    The version is only checked every PLAN_REGISTRY_CHECK_SECONDS, so most lookups
+    are dictionary hits. Returned plans are shared across requests and must not be
+    mutated.
+    """
+    version_name = PLAN_VERSION_NAME
+    metric_name = 'plans'
+    check_seconds_setting = 'PLAN_REGISTRY_CHECK_SECONDS'
+    check_seconds = 5
+
+    def load(self) -> dict[int, Plan]:
+        return {plan.pk: plan for plan in Plan.objects.order_by('id')}
+
+    def get(self, pk: int) -> Optional[Plan]:
+        plan = self.get_data().get(pk)
+        if plan is None:
+            # The plan may have been created by another process since the last check
+            plan = self.get_data(force=True).get(pk)
+        return plan
+
+    def all(self) -> list[Plan]:
+        return list(self.get_data().values())
+
+    def active(self) -> list[Plan]:
+        return [plan for plan in self.all() if plan.is_active]
+
+
+plan_registry = PlanRegistry()
+
+
+def bump_plan_version() -> None:
+    """
+    Invalidates the plan registry in every process.
+    """
+    plan_registry.bump_version()
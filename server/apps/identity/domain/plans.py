@@ -1,5 +1,44 @@
+import hashlib
+import json
+from typing import Iterable
+
 from ..models import Plan
 
+PLAN_SYNC_FIELDS = ['name', 'description', 'unit_amount', 'currency', 'interval', 'is_active']
+
+
+def compute_plan_hash(payload: dict) -> str:
+    """
+    Get a stable content hash for a plan payload, independent of key order.
+    """
+    content = {field: value for field, value in payload.items() if field != 'content_hash'}
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def diff_plan_payloads(
+    stored_hashes: dict[str, str],
+    payloads: Iterable[dict],
+    no_delete: bool = False
+) -> tuple[dict[str, dict], set[str]]:
+    """
+    Get the payloads whose hash differs from the stored one and the codes to delete.
+
+    Only the changed payloads are kept, so unchanged plans are never compared field by field.
+    """
+    changed = {}
+    seen = set()
+
+    for payload in payloads:
+        code = payload['code']
+        seen.add(code)
+        content_hash = compute_plan_hash(payload)
+        if stored_hashes.get(code) != content_hash:
+            changed[code] = {**payload, 'content_hash': content_hash}
+
+    removed = set() if no_delete else set(stored_hashes) - seen
+    return changed, removed
+
 
 def compute_plan_changes(
     existing_plans: dict[str, Plan], 
@@ -33,4 +72,4 @@ def compute_plan_changes(
     else:
         to_delete = []
 
-    return to_create, to_update, to_delete
\ No newline at end of file
+    return to_create, to_update, to_delete
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from apps.identity.domain.utils import get_plan_duration
+from apps.identity.models import Plan, User
+from apps.identity.signals import (
+    subscription_expired,
+    subscription_expiring,
+    subscription_renewed,
+)
+
+SUBSCRIPTION_FIELDS = ['plan', 'plan_start_date', 'plan_end_date', 'updated_at']
+
+
+def iter_subscription_batches(
+    queryset: QuerySet,
+    batch_size: int = 500,
+) -> Iterator[list[User]]:
+    """
+    Yields users in batches ordered by (plan_end_date, id).
+
+    Each batch starts after the last row of the previous one, so the scan stays on
+    the plan_end_date index and never uses OFFSET.
+    """
+    queryset = queryset.select_related('plan').order_by('plan_end_date', 'id')
+    last_end_date = None
+    last_id = None
+
+    while True:
+        page = queryset
+        if last_id is not None:
+            page = page.filter(
+                Q(plan_end_date__gt=last_end_date) | Q(plan_end_date=last_end_date, id__gt=last_id)
+            )
+
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+
+        # Take the cursor before yielding, callers may rewrite plan_end_date
+        last_end_date = batch[-1].plan_end_date
+        last_id = batch[-1].id
+
+        yield batch
+
+        if len(batch) < batch_size:
+            return
+
+
+def get_free_plans_by_currency() -> dict[str, Plan]:
+    """
+    Returns the active free plan for each currency, used as the downgrade target.
+    """
+    free_plans = {}
+    for plan in Plan.objects.filter(is_active=True, unit_amount=0).order_by('id'):
+        free_plans.setdefault(plan.currency.lower(), plan)
+    return free_plans
+
+
+def apply_expiry(user: User, now: datetime, free_plans: dict[str, Plan]) -> bool:
+    """
+    Moves an expired user onto their next subscription period.
+
+    Free plans renew for another period. Paid plans fall back to the free plan in
+    the same currency, or are cleared if there is none. Returns True on renewal.
+    """
+    renewed = user.plan.unit_amount == 0
+    plan = user.plan if renewed else free_plans.get(user.plan.currency.lower())
+
+    user.plan = plan
+    user.updated_at = now
+    if plan is None:
+        user.plan_start_date = None
+        user.plan_end_date = None
+    else:
+        user.plan_start_date = now
+        user.plan_end_date = now + get_plan_duration(plan.interval)
+
+    return renewed
+
+
+def process_expired_subscriptions(
+    now: Optional[datetime] = None,
+    batch_size: int = 500,
+) -> dict[str, int]:
+    """
+    Renews or downgrades every subscription whose plan_end_date has passed.
+    """
+    now = now or timezone.now()
+    free_plans = get_free_plans_by_currency()
+    queryset = User.objects.filter(plan__isnull=False, plan_end_date__lte=now)
+    totals = {'renewed': 0, 'expired': 0}
+
+    for batch in iter_subscription_batches(queryset, batch_size):
+        renewed_ids = []
+        expired_ids = []
+
+        with transaction.atomic():
+            # Re-read the batch under lock: a subscription renewed since the scan no
+            # longer matches, one locked by a concurrent writer is left for the next sweep
+            locked = list(
+                queryset.select_related('plan')
+                .select_for_update(skip_locked=True, of=('self',))
+                .filter(id__in=[user.id for user in batch])
+                .order_by('id')
+            )
+
+            for user in locked:
+                if apply_expiry(user, now, free_plans):
+                    renewed_ids.append(user.id)
+                else:
+                    expired_ids.append(user.id)
+
+            User.objects.bulk_update(locked, fields=SUBSCRIPTION_FIELDS)
+
+            if renewed_ids:
+                transaction.on_commit(
+                    lambda ids=renewed_ids: subscription_renewed.send(sender=User, user_ids=ids)
+                )
+            if expired_ids:
+                transaction.on_commit(
+                    lambda ids=expired_ids: subscription_expired.send(sender=User, user_ids=ids)
+                )
+
+        totals['renewed'] += len(renewed_ids)
+        totals['expired'] += len(expired_ids)
+
+    return totals
+
+
+def notify_expiring_subscriptions(
+    notice: timedelta,
+    window: timedelta,
+    now: Optional[datetime] = None,
+    batch_size: int = 500,
+) -> int:
+    """
+    Emits subscription_expiring for paid plans ending in [now + notice, now + notice + window).
+
+    The window should match the sweep interval so each user is notified once.
+    """
+    now = now or timezone.now()
+    start = now + notice
+    queryset = User.objects.filter(
+        plan__unit_amount__gt=0,
+        plan_end_date__gte=start,
+        plan_end_date__lt=start + window,
+    )
+    total = 0
+
+    for batch in iter_subscription_batches(queryset, batch_size):
+        subscription_expiring.send(sender=User, user_ids=[user.id for user in batch])
+        total += len(batch)
+
+    return total
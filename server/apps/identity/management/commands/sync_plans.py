@@ -1,13 +1,13 @@
 import json
 from pathlib import Path
-import select
 
 from django.core.management.base import BaseCommand, CommandError, CommandParser
 from django.db import transaction
-from django.conf import settings
 
+from apps.common.events import CREATED, publish_changes
+from apps.common.json_stream import iter_json_array
 from apps.identity.models import Plan
-from apps.identity.domain.plans import compute_plan_changes
+from apps.identity.domain.plans import PLAN_SYNC_FIELDS, compute_plan_changes, diff_plan_payloads
 
 class Command(BaseCommand):
     help = 'Sync plans from plans.json'
@@ -29,6 +29,12 @@ class Command(BaseCommand):
             action='store_true',
             default=False,
             help='Do not delete db plans that are not in the JSON file'
+        ),
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            default=False,
+            help='Read the JSON file incrementally instead of loading it at once'
         )
 
     def handle(self, *args, **opts) -> None:
@@ -39,26 +45,42 @@ class Command(BaseCommand):
         if not path.exists():
             raise CommandError(f"File at {path} does not exist")
 
-        with open(path, 'r') as f:
-            plans = json.load(f)
-
-        if not isinstance(plans, list):
-            raise CommandError(f"File at {path} is not a valid JSON array")
-
         dry_run = opts.get('dry_run')
         no_delete = opts.get('no_delete')
 
-        desired_by_code = {plan['code']: plan for plan in plans}
-        
         if not no_delete:
             self.stdout.write(self.style.WARNING(
                 "Running in delete mode. Plans that are not in the JSON file will be deleted."
             ))
 
+        # Compare content hashes first so unchanged plans are neither locked nor diffed
+        stored_hashes = dict(Plan.objects.values_list('code', 'content_hash'))
+
+        with open(path, 'r') as f:
+            if opts.get('stream'):
+                plans = iter_json_array(f)
+            else:
+                plans = json.load(f)
+                if not isinstance(plans, list):
+                    raise CommandError(f"File at {path} is not a valid JSON array")
+
+            try:
+                changed, removed = diff_plan_payloads(stored_hashes, plans, no_delete)
+            except ValueError as e:
+                raise CommandError(f"File at {path} is not a valid JSON array: {e}")
+
+        if not changed and not removed:
+            self.stdout.write(self.style.SUCCESS("Plans already up to date"))
+            return
+
         with transaction.atomic():
-            existing = {plan.code: plan for plan in Plan.objects.select_for_update().all()}
+            locked_codes = set(changed) | removed
+            existing = {
+                plan.code: plan
+                for plan in Plan.objects.select_for_update().filter(code__in=locked_codes)
+            }
             
-            to_create, to_update, to_delete = compute_plan_changes(existing, desired_by_code, no_delete)
+            to_create, to_update, to_delete = compute_plan_changes(existing, changed, no_delete)
 
             if dry_run:
                 self.stdout.write(f"[DRY RUN] Would create: {len(to_create)}")
@@ -70,11 +92,14 @@ class Command(BaseCommand):
                 Plan.objects.bulk_create(to_create)
 
             if to_update:
-                fields = ['name', 'description', 'unit_amount', 'currency', 'interval', 'is_active']
-                Plan.objects.bulk_update(to_update, fields=fields)
+                Plan.objects.bulk_update(to_update, fields=PLAN_SYNC_FIELDS + ['content_hash'])
 
             deletes = 0
             if to_delete:
                 deletes = Plan.objects.filter(code__in=[plan.code for plan in to_delete]).delete()[0]
 
+            # bulk_create/bulk_update skip model signals, so publish the changes explicitly
+            publish_changes(Plan, [plan.pk for plan in to_create], action=CREATED)
+            publish_changes(Plan, [plan.pk for plan in to_update])
+
             self.stdout.write(self.style.SUCCESS(f"Plans synced, Created {len(to_create)}, Updated {len(to_update)}, Deleted {deletes}"))
\ No newline at end of file
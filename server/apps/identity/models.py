@@ -21,10 +21,21 @@ class Plan(models.Model):
     currency = models.CharField(max_length=3, choices=Currency.choices, default=Currency.USD)
     interval = models.CharField(max_length=255, choices=Interval.choices, default=Interval.MONTH)
     is_active = models.BooleanField(default=True)
+    # sha256 of the plans.json payload, lets sync_plans skip unchanged plans
+    content_hash = models.CharField(max_length=64, blank=True, default='')
 
     def __str__(self):
         return self.code
 
+    def save(self, *args, **kwargs):
+        # sync_plans writes content_hash with bulk_create/bulk_update, which skip
+        # save(). Any other write clears it, so the next sync compares the row again
+        self.content_hash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'content_hash'}
+        super().save(*args, **kwargs)
+
     class Meta:
         indexes = [
             models.Index(fields=['code']),
@@ -109,4 +120,5 @@ class User(AbstractBaseUser, TimestampedModel):
         indexes = [
             models.Index(fields=['id']),
             models.Index(fields=['email']),
+            models.Index(fields=['plan_end_date', 'id']),
         ]
@@ -3,6 +3,7 @@ from datetime import timedelta
 from rest_framework import serializers
 from django.utils import timezone
 from rest_framework.validators import UniqueValidator
+from .domain.plan_registry import plan_registry
 from .models import User, Plan
 
 
@@ -12,6 +13,23 @@ class PlanSerializer(serializers.ModelSerializer):
         fields = ['id', 'code', 'name', 'description', 'unit_amount', 'currency', 'interval', 'is_active']
 
 
+class RegistryPlanField(serializers.PrimaryKeyRelatedField):
+    """Resolves active plans from the plan registry instead of querying the DB."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        plan = plan_registry.get(pk)
+        if plan is None or not plan.is_active:
+            self.fail('does_not_exist', pk_value=data)
+        return plan
+
+
 class UserSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(
         validators=[UniqueValidator(queryset=User.objects.all(), message='Email already exists')]
@@ -51,7 +69,7 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class UserRetrieveSerializer(serializers.ModelSerializer):
-    plan = PlanSerializer(read_only=True)
+    plan = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -96,6 +114,12 @@ class UserRetrieveSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
 
+    def get_plan(self, user: User) -> dict | None:
+        if user.plan_id is None:
+            return None
+        plan = plan_registry.get(user.plan_id)
+        return PlanSerializer(plan).data if plan else None
+
 
 class RegisterationSerializer(serializers.Serializer):
     class Meta:
@@ -104,7 +128,7 @@ class RegisterationSerializer(serializers.Serializer):
     
 
 class ChangePlanSerializer(serializers.Serializer):
-    plan = serializers.PrimaryKeyRelatedField(
+    plan = RegistryPlanField(
         queryset=Plan.objects.filter(is_active=True), 
         required=True
     )
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.common.events import entities_changed, track_changes
+from apps.identity.domain.plan_registry import bump_plan_version, plan_registry
+from apps.identity.models import Plan
+
+# Sent after a subscription sweep commits. Receivers get ``user_ids``.
+subscription_renewed = Signal()
+subscription_expired = Signal()
+subscription_expiring = Signal()
+
+track_changes(Plan)
+
+
+@receiver([post_save, post_delete], sender=Plan)
+def invalidate_plan_registry(sender, using, **kwargs) -> None:
+    """
+    Drops this process's plan registry once the write commits, so the writing request
+    reads its own change and a rolled back write is never loaded into the registry.
+    """
+    transaction.on_commit(plan_registry.invalidate, using=using)
+
+
+@receiver(entities_changed, sender=Plan)
+def bump_plan_registry_version(sender, events, **kwargs) -> None:
+    """
+    Drops every other process's plan registry once the plan changes commit.
+    """
+    bump_plan_version()
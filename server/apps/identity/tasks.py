@@ -1,8 +1,15 @@
+from datetime import timedelta
+
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
+from django.utils import timezone
 
+from apps.identity.domain.subscriptions import (
+    notify_expiring_subscriptions,
+    process_expired_subscriptions,
+)
 from apps.identity.models import User
 
 
@@ -47,3 +54,20 @@ def send_magic_link_email_task(user_id: int, jti: str) -> None:
         fail_silently=False,
     )
 
+
+@shared_task
+def sweep_subscriptions_task() -> dict:
+    """
+    Celery beat task that renews or downgrades expired subscriptions and
+    announces the ones about to expire.
+    """
+    now = timezone.now()
+    batch_size = getattr(settings, 'SUBSCRIPTION_SWEEP_BATCH_SIZE', 500)
+    notice = timedelta(days=getattr(settings, 'SUBSCRIPTION_EXPIRY_NOTICE_DAYS', 7))
+    window = timedelta(minutes=getattr(settings, 'SUBSCRIPTION_SWEEP_INTERVAL_MINUTES', 60))
+
+    totals = process_expired_subscriptions(now=now, batch_size=batch_size)
+    totals['expiring'] = notify_expiring_subscriptions(
+        notice, window, now=now, batch_size=batch_size
+    )
+    return totals
@@ -10,6 +10,7 @@ from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework import status
 
+from apps.identity.domain.plan_registry import plan_registry
 from apps.identity.domain.utils import format_validation_errors
 
 from .models import User, Plan
@@ -119,4 +120,27 @@ class UserViewSet(ViewSet):
 class PlanViewSet(ModelViewSet):
     queryset = Plan.objects.all()
     serializer_class = PlanSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request: Request) -> Response:
+        # Reads are served from the plan registry, writes go through the DB
+        plans = plan_registry.all()
+        page = self.paginate_queryset(plans)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(plans, many=True)
+        return Response(serializer.data)
+
+    def retrieve(self, request: Request, pk: str) -> Response:
+        try:
+            plan = plan_registry.get(int(pk))
+        except (ValueError, TypeError):
+            plan = None
+
+        if plan is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = self.get_serializer(plan)
+        return Response(serializer.data)
\ No newline at end of file
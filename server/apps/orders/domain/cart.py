@@ -0,0 +1,286 @@
+import json
+import re
+import time
+import uuid
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+
+from apps.common.redis import get_raw_redis_client
+from apps.sellers.domain.prices import get_current_prices
+from apps.sellers.models import Product
+
+# Each line of a cart hash is stored under three fields sharing the line ID:
+# the quantity (so HINCRBY can change it atomically), the price snapshot taken
+# when the product was added, and when the line was first added (for ordering).
+QUANTITY_FIELD = 'qty:'
+LINE_FIELD = 'line:'
+ADDED_FIELD = 'added:'
+
+SNAPSHOT_FIELDS = ('product_id', 'seller_id', 'price_id', 'currency', 'unit_amount', 'name', 'sku')
+
+CART_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class CartError(Exception):
+    pass
+
+
+def get_cart_key(user_id: Optional[int] = None, cart_id: Optional[str] = None) -> str:
+    if user_id is not None:
+        return f"cart:user:{user_id}"
+    return f"cart:anon:{cart_id}"
+
+
+def new_cart_id() -> str:
+    return uuid.uuid4().hex
+
+
+def is_valid_cart_id(cart_id: Optional[str]) -> bool:
+    return bool(cart_id) and CART_ID_PATTERN.match(cart_id) is not None
+
+
+def get_line_id(product_id: int, currency: str) -> str:
+    return f"{product_id}:{currency}"
+
+
+def get_cart_ttl() -> int:
+    return getattr(settings, 'CART_TTL_SECONDS', 7 * 24 * 60 * 60)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _parse_lines(fields: dict) -> list[dict]:
+    """
+    Rebuilds cart lines from raw hash fields, skipping half-written lines.
+    """
+    fields = {_decode(field): _decode(value) for field, value in fields.items()}
+    lines = []
+    for field, value in fields.items():
+        if not field.startswith(QUANTITY_FIELD):
+            continue
+        line_id = field[len(QUANTITY_FIELD):]
+        snapshot = fields.get(LINE_FIELD + line_id)
+        quantity = int(value)
+        if snapshot is None or quantity <= 0:
+            continue
+        lines.append({
+            'id': line_id,
+            'quantity': quantity,
+            'added_at': float(fields.get(ADDED_FIELD + line_id, 0)),
+            **json.loads(snapshot),
+        })
+    return sorted(lines, key=lambda line: (line['added_at'], line['id']))
+
+
+def _build_cart(lines: list[dict]) -> dict:
+    totals = defaultdict(int)
+    for line in lines:
+        line['line_amount'] = line['unit_amount'] * line['quantity']
+        totals[line['currency']] += line['line_amount']
+    return {'lines': lines, 'totals': dict(totals)}
+
+
+def get_cart(key: str) -> dict:
+    """
+    Get the lines of a cart with per-currency totals, refreshing its expiry.
+    """
+    pipe = get_raw_redis_client().pipeline()
+    pipe.hgetall(key)
+    pipe.expire(key, get_cart_ttl())
+    fields, _ = pipe.execute()
+    return _build_cart(_parse_lines(fields))
+
+
+def _get_snapshot(product: Product, currency: str) -> dict:
+    price = get_current_prices([product.id], currency).get((product.id, currency))
+    if price is None:
+        raise CartError(f"Product {product.id} has no price in {currency}.")
+    return {
+        'product_id': product.id,
+        'seller_id': product.seller_id,
+        'price_id': price.id,
+        'currency': currency,
+        'unit_amount': price.amount,
+        'name': product.name,
+        'sku': product.sku,
+    }
+
+
+def _delete_line(pipe, key: str, line_id: str) -> None:
+    pipe.hdel(key, QUANTITY_FIELD + line_id, LINE_FIELD + line_id, ADDED_FIELD + line_id)
+
+
+def add_item(key: str, product_id: int, quantity: int, currency: str) -> dict:
+    """
+    Adds quantity of a product to a cart and returns the updated line.
+
+    The price is resolved now and cached on the line, re-adding a product
+    refreshes it. The quantity is changed with HINCRBY so concurrent adds from
+    several tabs never lose an update.
+    """
+    product = Product.objects.filter(id=product_id, is_active=True).only(
+        'id', 'seller_id', 'name', 'sku'
+    ).first()
+    if product is None:
+        raise CartError(f"Product {product_id} does not exist.")
+
+    line_id = get_line_id(product.id, currency)
+    snapshot = _get_snapshot(product, currency)
+    client = get_raw_redis_client()
+    max_lines = getattr(settings, 'CART_MAX_LINES', 100)
+    max_quantity = getattr(settings, 'CART_MAX_QUANTITY', 99)
+
+    pipe = client.pipeline()
+    pipe.hexists(key, QUANTITY_FIELD + line_id)
+    pipe.hlen(key)
+    exists, field_count = pipe.execute()
+    if not exists and field_count // 3 >= max_lines:
+        raise CartError(f"A cart holds at most {max_lines} lines.")
+
+    pipe = client.pipeline()
+    pipe.hset(key, LINE_FIELD + line_id, json.dumps(snapshot))
+    pipe.hsetnx(key, ADDED_FIELD + line_id, time.time())
+    pipe.hincrby(key, QUANTITY_FIELD + line_id, quantity)
+    pipe.expire(key, get_cart_ttl())
+    new_quantity = pipe.execute()[2]
+
+    if new_quantity > max_quantity:
+        # Undo our increment rather than clobbering a concurrent one
+        if client.hincrby(key, QUANTITY_FIELD + line_id, -quantity) <= 0:
+            pipe = client.pipeline()
+            _delete_line(pipe, key, line_id)
+            pipe.execute()
+        raise CartError(f"A line holds at most {max_quantity} units.")
+
+    return {'id': line_id, 'quantity': new_quantity, **snapshot}
+
+
+def set_quantity(key: str, line_id: str, quantity: int) -> None:
+    """
+    Sets the quantity of an existing line, zero removes it.
+
+    The line is checked and written in one WATCH/MULTI transaction, so a line
+    removed concurrently is never brought back.
+    """
+    max_quantity = getattr(settings, 'CART_MAX_QUANTITY', 99)
+    if quantity > max_quantity:
+        raise CartError(f"A line holds at most {max_quantity} units.")
+
+    def update(pipe) -> None:
+        if not pipe.hexists(key, LINE_FIELD + line_id):
+            raise CartError(f"Line {line_id} is not in the cart.")
+        pipe.multi()
+        if quantity <= 0:
+            _delete_line(pipe, key, line_id)
+        else:
+            pipe.hset(key, QUANTITY_FIELD + line_id, quantity)
+        pipe.expire(key, get_cart_ttl())
+
+    get_raw_redis_client().transaction(update, key)
+
+
+def remove_item(key: str, line_id: str) -> bool:
+    """
+    Removes a line, returns whether it was in the cart.
+    """
+    pipe = get_raw_redis_client().pipeline()
+    _delete_line(pipe, key, line_id)
+    return bool(pipe.execute()[0])
+
+
+def clear_cart(key: str) -> None:
+    get_raw_redis_client().delete(key)
+
+
+def merge_carts(source_key: str, target_key: str) -> int:
+    """
+    Moves every line of source_key into target_key, adding up quantities.
+
+    Used when an anonymous shopper logs in. Reading and deleting the source in
+    one MULTI block is the claim, so two concurrent logins cannot merge the same
+    cart twice. Returns the number of lines merged.
+    """
+    client = get_raw_redis_client()
+    pipe = client.pipeline()
+    pipe.hgetall(source_key)
+    pipe.delete(source_key)
+    fields, _ = pipe.execute()
+    if not fields:
+        return 0
+
+    lines = _parse_lines(fields)
+    max_quantity = getattr(settings, 'CART_MAX_QUANTITY', 99)
+
+    pipe = client.pipeline()
+    for line in lines:
+        snapshot = {field: line[field] for field in SNAPSHOT_FIELDS}
+        pipe.hincrby(target_key, QUANTITY_FIELD + line['id'], line['quantity'])
+        # Lines already in the target keep their own snapshot
+        pipe.hsetnx(target_key, LINE_FIELD + line['id'], json.dumps(snapshot))
+        pipe.hsetnx(target_key, ADDED_FIELD + line['id'], line['added_at'])
+    pipe.expire(target_key, get_cart_ttl())
+    results = pipe.execute()
+
+    over_limit = [line for line, quantity in zip(lines, results[::3]) if quantity > max_quantity]
+    if over_limit:
+        pipe = client.pipeline()
+        for line in over_limit:
+            pipe.hset(target_key, QUANTITY_FIELD + line['id'], max_quantity)
+        pipe.execute()
+
+    return len(lines)
+
+
+def validate_cart(key: str) -> dict:
+    """
+    Checks every line against current prices and stock, in two queries.
+
+    Lines whose price changed since they were added are updated to the current
+    price, both in the result and in the cart (unless removed meanwhile). Each line gets a list of issues
+    ('unavailable', 'price_changed', 'insufficient_stock'), and the cart is
+    valid when no line has any.
+    """
+    cart = get_cart(key)
+    lines = cart['lines']
+    product_ids = {line['product_id'] for line in lines}
+    products = Product.objects.filter(id__in=product_ids, is_active=True).only('id', 'stock').in_bulk()
+    prices = get_current_prices(product_ids)
+
+    refreshed = {}
+    for line in lines:
+        line['issues'] = []
+        product = products.get(line['product_id'])
+        price = prices.get((line['product_id'], line['currency']))
+        if product is None or price is None:
+            line['issues'].append('unavailable')
+            continue
+
+        if price.id != line['price_id'] or price.amount != line['unit_amount']:
+            line['issues'].append('price_changed')
+            line['price_id'] = price.id
+            line['unit_amount'] = price.amount
+            refreshed[line['id']] = line
+        if product.stock < line['quantity']:
+            line['issues'].append('insufficient_stock')
+
+    if refreshed:
+        def refresh(pipe) -> None:
+            # Only lines still in the cart are rewritten, a line removed while
+            # the cart was being checked stays removed
+            line_ids = list(refreshed)
+            present = pipe.hmget(key, [LINE_FIELD + line_id for line_id in line_ids])
+            pipe.multi()
+            for line_id, snapshot in zip(line_ids, present):
+                if snapshot is not None:
+                    line = refreshed[line_id]
+                    pipe.hset(key, LINE_FIELD + line_id, json.dumps({field: line[field] for field in SNAPSHOT_FIELDS}))
+
+        get_raw_redis_client().transaction(refresh, key)
+
+    cart = _build_cart(lines)
+    cart['is_valid'] = not any(line['issues'] for line in lines)
+    return cart
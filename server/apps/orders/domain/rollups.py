@@ -0,0 +1,169 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Iterator, Optional
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, QuerySet, Sum
+from django.db.models.functions import TruncDay, TruncHour
+
+from apps.sellers.models import Seller
+from ..models import Order, OrderItem, ProductSalesRollup, SalesRollup, SellerSalesRollup
+
+# Orders in these states count towards sales
+COUNTED_STATUSES = frozenset({
+    Order.Status.PROCESSING,
+    Order.Status.SHIPPED,
+    Order.Status.DELIVERED,
+})
+
+GRANULARITIES = (SalesRollup.Granularity.HOUR, SalesRollup.Granularity.DAY)
+
+BUCKET_LENGTHS = {
+    SalesRollup.Granularity.HOUR: timedelta(hours=1),
+    SalesRollup.Granularity.DAY: timedelta(days=1),
+}
+
+BUCKET_FUNCTIONS = {
+    SalesRollup.Granularity.HOUR: TruncHour,
+    SalesRollup.Granularity.DAY: TruncDay,
+}
+
+
+def get_rollup_sign(from_status: Optional[str], to_status: str) -> int:
+    """
+    Get +1 when an order starts counting towards sales, -1 when it stops, 0 otherwise.
+    """
+    was_counted = from_status in COUNTED_STATUSES
+    is_counted = to_status in COUNTED_STATUSES
+    return int(is_counted) - int(was_counted)
+
+
+def truncate_to_bucket(value: datetime, granularity: str) -> datetime:
+    value = value.astimezone(dt_timezone.utc)
+    if granularity == SalesRollup.Granularity.HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_counted_items() -> QuerySet:
+    """
+    Get the order items that count towards sales.
+    """
+    return OrderItem.objects.filter(order__status__in=COUNTED_STATUSES)
+
+
+def _aggregate(items: QuerySet, granularity: str, group_by: tuple[str, ...]) -> Iterator[dict]:
+    # Items are grouped by their own currency, so an order mixing currencies
+    # counts once in each of them
+    bucket = BUCKET_FUNCTIONS[granularity]('order__created_at', tzinfo=dt_timezone.utc)
+    rows = (
+        items.annotate(bucket_start=bucket)
+        .values(*group_by, 'bucket_start', 'currency')
+        .annotate(
+            order_count=Count('order_id', distinct=True),
+            gross_amount=Sum(
+                F('unit_amount') * F('quantity'),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            units_sold=Sum('quantity'),
+        )
+        .order_by()
+    )
+    return rows.iterator()
+
+
+def aggregate_seller_rollups(items: QuerySet, granularity: str) -> Iterator[SellerSalesRollup]:
+    """
+    Aggregates order items into unsaved seller rollups, one per bucket and currency.
+    """
+    for row in _aggregate(items, granularity, ('order__seller_id',)):
+        yield SellerSalesRollup(
+            seller_id=row['order__seller_id'],
+            granularity=granularity,
+            bucket_start=row['bucket_start'],
+            currency=row['currency'],
+            order_count=row['order_count'],
+            gross_amount=row['gross_amount'],
+            units_sold=row['units_sold'],
+        )
+
+
+def aggregate_product_rollups(items: QuerySet, granularity: str) -> Iterator[ProductSalesRollup]:
+    """
+    Aggregates order items into unsaved product rollups, one per bucket and currency.
+    """
+    for row in _aggregate(items, granularity, ('order__seller_id', 'product_id')):
+        yield ProductSalesRollup(
+            seller_id=row['order__seller_id'],
+            product_id=row['product_id'],
+            granularity=granularity,
+            bucket_start=row['bucket_start'],
+            currency=row['currency'],
+            order_count=row['order_count'],
+            gross_amount=row['gross_amount'],
+            units_sold=row['units_sold'],
+        )
+
+
+def _get_bucket_filter(buckets: set[datetime], granularity: str) -> Q:
+    length = BUCKET_LENGTHS[granularity]
+    bucket_filter = Q()
+    for bucket_start in buckets:
+        bucket_filter |= Q(order__created_at__gte=bucket_start, order__created_at__lt=bucket_start + length)
+    return bucket_filter
+
+
+def lock_seller_rollups(seller_id: int) -> None:
+    """
+    Locks a seller's row so writers of its rollups run one after the other.
+
+    Must be called inside a transaction, the lock is held until it ends.
+    """
+    list(Seller.objects.select_for_update().filter(id=seller_id).values_list('id'))
+
+
+def refresh_sales_rollups(order_ids: Iterable[int]) -> None:
+    """
+    Recomputes the seller and product buckets the orders fall in from the
+    counted order items, replacing the stored rows.
+
+    Buckets are rewritten rather than incremented, so refreshing the same
+    orders twice (a retried or redelivered task) leaves the same totals.
+    """
+    order_ids = list(order_ids)
+    orders = Order.objects.filter(id__in=order_ids).values_list('id', 'seller_id', 'created_at')
+    created_by_seller = defaultdict(list)
+    for _, seller_id, created_at in orders:
+        created_by_seller[seller_id].append(created_at)
+
+    products_by_seller = defaultdict(set)
+    for seller_id, product_id in OrderItem.objects.filter(order_id__in=order_ids).values_list(
+        'order__seller_id', 'product_id'
+    ).distinct():
+        products_by_seller[seller_id].add(product_id)
+
+    for seller_id, created in created_by_seller.items():
+        with transaction.atomic():
+            # Refreshes of one seller run one after the other, so a slow one
+            # never writes totals older than what a later one already wrote
+            lock_seller_rollups(seller_id)
+            product_ids = products_by_seller[seller_id]
+
+            for granularity in GRANULARITIES:
+                buckets = {truncate_to_bucket(value, granularity) for value in created}
+                items = get_counted_items().filter(order__seller_id=seller_id).filter(
+                    _get_bucket_filter(buckets, granularity)
+                )
+
+                SellerSalesRollup.objects.filter(
+                    seller_id=seller_id, granularity=granularity, bucket_start__in=buckets
+                ).delete()
+                SellerSalesRollup.objects.bulk_create(aggregate_seller_rollups(items, granularity))
+
+                if product_ids:
+                    ProductSalesRollup.objects.filter(
+                        product_id__in=product_ids, granularity=granularity, bucket_start__in=buckets
+                    ).delete()
+                    ProductSalesRollup.objects.bulk_create(
+                        aggregate_product_rollups(items.filter(product_id__in=product_ids), granularity)
+                    )
@@ -0,0 +1,166 @@
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import QuerySet
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+
+from apps.common.events import publish_changes
+
+from ..models import Order, OrderTransition
+from ..signals import order_status_changed
+
+# Allowed source statuses for each target status
+ALLOWED_TRANSITIONS = {
+    Order.Status.PROCESSING: {Order.Status.PENDING},
+    Order.Status.SHIPPED: {Order.Status.PROCESSING},
+    Order.Status.DELIVERED: {Order.Status.SHIPPED},
+    Order.Status.CANCELLED: {Order.Status.PENDING, Order.Status.PROCESSING},
+}
+
+
+# Backends whose UPDATE supports RETURNING (SQLite from 3.35)
+UPDATE_RETURNING_VENDORS = frozenset({'postgresql', 'sqlite'})
+
+
+class TransitionError(Exception):
+    pass
+
+
+def check_transition(from_status: str, to_status: str) -> None:
+    if from_status not in ALLOWED_TRANSITIONS.get(to_status, set()):
+        raise TransitionError(f"Cannot move an order from {from_status} to {to_status}.")
+
+
+def _record(
+    order_ids: list[int],
+    from_status: str,
+    to_status: str,
+    idempotency_key: Optional[str],
+) -> list[OrderTransition]:
+    transitions = OrderTransition.objects.bulk_create([
+        OrderTransition(
+            order_id=order_id,
+            from_status=from_status,
+            to_status=to_status,
+            idempotency_key=idempotency_key,
+        )
+        for order_id in order_ids
+    ])
+    order_status_changed.send(
+        sender=Order, order_ids=order_ids, from_status=from_status, to_status=to_status
+    )
+    # The status is written with QuerySet.update, which skips model signals
+    publish_changes(Order, order_ids, status=to_status)
+    return transitions
+
+
+def _replay(order: Order, to_status: str, idempotency_key: str) -> Optional[OrderTransition]:
+    previous = OrderTransition.objects.filter(order_id=order.pk, idempotency_key=idempotency_key).first()
+    if previous is not None and previous.to_status != to_status:
+        raise TransitionError(
+            f"Idempotency key was already used to move this order to {previous.to_status}."
+        )
+    return previous
+
+
+def transition_order(
+    order: Order,
+    to_status: str,
+    idempotency_key: Optional[str] = None,
+) -> OrderTransition:
+    """
+    Moves one order to to_status with a conditional UPDATE on its current status.
+
+    No row lock is taken: if another request changes the status first, the UPDATE
+    matches nothing and TransitionError is raised. A repeated idempotency key
+    returns the transition recorded by the first request for the order, or
+    raises TransitionError if that request targeted another status.
+    """
+    if idempotency_key:
+        previous = _replay(order, to_status, idempotency_key)
+        if previous is not None:
+            return previous
+
+    from_status = order.status
+    check_transition(from_status, to_status)
+
+    try:
+        with transaction.atomic():
+            updated = Order.objects.filter(pk=order.pk, status=from_status).update(
+                status=to_status,
+                updated_at=timezone.now(),
+            )
+            if not updated:
+                raise TransitionError('Order status changed concurrently, reload and retry.')
+
+            transition = _record([order.pk], from_status, to_status, idempotency_key)[0]
+    except IntegrityError:
+        # A concurrent request with the same idempotency key won the race
+        previous = _replay(order, to_status, idempotency_key) if idempotency_key else None
+        if previous is None:
+            raise
+        return previous
+
+    order.status = to_status
+    return transition
+
+
+def _can_update_returning(using: str) -> bool:
+    connection = connections[using]
+    return (
+        connection.vendor in UPDATE_RETURNING_VENDORS
+        and connection.features.can_return_rows_from_bulk_insert
+    )
+
+
+def _update_returning_ids(queryset: QuerySet, **values) -> list[int]:
+    """
+    Runs queryset.update(**values) as UPDATE ... RETURNING and returns the
+    primary keys of the rows it changed.
+    """
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    compiler = query.get_compiler(queryset.db)
+    sql, params = compiler.as_sql()
+    pk_column = compiler.quote_name_unless_alias(queryset.model._meta.pk.column)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"{sql} RETURNING {pk_column}", params)
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def bulk_transition_orders(
+    queryset: QuerySet,
+    order_ids: Iterable[int],
+    from_status: str,
+    to_status: str,
+) -> list[int]:
+    """
+    Moves every order in order_ids that is still in from_status with a single
+    conditional UPDATE ... RETURNING, which reports the changed rows without
+    taking read locks.
+
+    Returns the IDs that actually changed. Orders already moved by someone else are
+    skipped rather than failing the batch, which also makes retries safe. Backends
+    without UPDATE ... RETURNING (MySQL, MariaDB) lock the candidate rows first
+    instead, since a plain UPDATE cannot tell which of them it changed.
+    """
+    check_transition(from_status, to_status)
+    candidates = queryset.filter(id__in=list(order_ids), status=from_status)
+    values = {'status': to_status, 'updated_at': timezone.now()}
+
+    with transaction.atomic(using=queryset.db):
+        if _can_update_returning(queryset.db):
+            changed_ids = _update_returning_ids(candidates, **values)
+        else:
+            # The locked rows are exactly the ones the UPDATE changes: a concurrent
+            # transition either finished first and moved them out of from_status,
+            # or waits for this transaction
+            changed_ids = list(candidates.select_for_update().order_by('id').values_list('id', flat=True))
+            if changed_ids:
+                Order.objects.filter(id__in=changed_ids).update(**values)
+
+        if changed_ids:
+            _record(changed_ids, from_status, to_status, None)
+
+    return changed_ids
@@ -24,8 +24,11 @@ class Order(TimestampedModel):
 
     class Meta:
         indexes = [
-            models.Index(fields=['seller']),
-            models.Index(fields=['user']),
+            # Composite indexes serve the order history endpoints, their prefixes
+            # still cover plain seller/user lookups.
+            models.Index(fields=['seller', 'created_at', 'id']),
+            models.Index(fields=['seller', 'status', 'created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
         ]
 
 class OrderItem(TimestampedModel):
@@ -36,4 +39,75 @@ class OrderItem(TimestampedModel):
     unit_amount = models.DecimalField(max_digits=10, decimal_places=2)
     currency = models.CharField(max_length=3, choices=Currency.choices, default=Currency.USD)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class OrderTransition(models.Model):
+    """
+    Log of order status changes written by apps.orders.domain.transitions.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='transitions')
+    from_status = models.CharField(max_length=255, choices=Order.Status.choices)
+    to_status = models.CharField(max_length=255, choices=Order.Status.choices)
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Keys are chosen by the client, so they only need to be unique per order
+            models.UniqueConstraint(
+                fields=['order', 'idempotency_key'],
+                name='unique_order_transition_idempotency_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['order', 'created_at']),
+        ]
+
+
+class SalesRollup(models.Model):
+    """
+    Pre-aggregated sales for one time bucket, maintained by apps.orders.tasks.
+    """
+    class Granularity(models.TextChoices):
+        HOUR = 'hour'
+        DAY = 'day'
+
+    granularity = models.CharField(max_length=4, choices=Granularity.choices)
+    bucket_start = models.DateTimeField()
+    currency = models.CharField(max_length=3, choices=Currency.choices, default=Currency.USD)
+    order_count = models.IntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units_sold = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class SellerSalesRollup(SalesRollup):
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name='sales_rollups')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['seller', 'granularity', 'bucket_start', 'currency'],
+                name='unique_seller_sales_rollup',
+            ),
+        ]
+
+
+class ProductSalesRollup(SalesRollup):
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name='product_sales_rollups')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='sales_rollups')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'granularity', 'bucket_start', 'currency'],
+                name='unique_product_sales_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['seller', 'granularity', 'bucket_start']),
+        ]
@@ -0,0 +1,151 @@
+from rest_framework import serializers
+
+from apps.common.model_utils import Currency
+from .models import Order, OrderItem, OrderTransition, SalesRollup
+
+
+class OrderItemResponseSerializer(serializers.ModelSerializer):
+    product_id = serializers.IntegerField(read_only=True)
+    price_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = [
+            'id',
+            'product_id',
+            'price_id',
+            'quantity',
+            'unit_amount',
+            'currency',
+        ]
+        read_only_fields = [
+            'id',
+            'product_id',
+            'price_id',
+            'quantity',
+            'unit_amount',
+            'currency',
+        ]
+
+
+class OrderResponseSerializer(serializers.ModelSerializer):
+    seller_id = serializers.IntegerField(read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
+    items = OrderItemResponseSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'id',
+            'seller_id',
+            'user_id',
+            'status',
+            'total_amount',
+            'items',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = [
+            'id',
+            'seller_id',
+            'user_id',
+            'status',
+            'total_amount',
+            'items',
+            'created_at',
+            'updated_at',
+        ]
+
+
+class OrderTransitionResponseSerializer(serializers.ModelSerializer):
+    order_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = OrderTransition
+        fields = ['id', 'order_id', 'from_status', 'to_status', 'created_at']
+        read_only_fields = ['id', 'order_id', 'from_status', 'to_status', 'created_at']
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    """Serializer for moving one order to a new status."""
+    status = serializers.ChoiceField(choices=Order.Status.choices, required=True)
+
+
+class BulkOrderTransitionSerializer(serializers.Serializer):
+    """Serializer for moving many orders from one status to another."""
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=500,
+    )
+    from_status = serializers.ChoiceField(choices=Order.Status.choices, required=True)
+    status = serializers.ChoiceField(choices=Order.Status.choices, required=True)
+
+
+class OrderHistoryFilterSerializer(serializers.Serializer):
+    """Serializer to validate order history query parameters."""
+    status = serializers.ChoiceField(choices=Order.Status.choices, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+
+class SalesRollupResponseSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(read_only=True, required=False)
+    granularity = serializers.CharField(read_only=True)
+    bucket_start = serializers.DateTimeField(read_only=True)
+    currency = serializers.CharField(read_only=True)
+    order_count = serializers.IntegerField(read_only=True)
+    gross_amount = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    units_sold = serializers.IntegerField(read_only=True)
+
+
+class SalesRollupFilterSerializer(serializers.Serializer):
+    """Serializer to validate sales dashboard query parameters."""
+    granularity = serializers.ChoiceField(
+        choices=SalesRollup.Granularity.choices,
+        default=SalesRollup.Granularity.DAY
+    )
+    start = serializers.DateTimeField(required=True)
+    end = serializers.DateTimeField(required=True)
+    currency = serializers.ChoiceField(choices=Currency.choices, required=False)
+    product_id = serializers.IntegerField(required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError({'end': ['End must be after start.']})
+        return attrs
+
+
+class CartItemSerializer(serializers.Serializer):
+    """Serializer for adding a product to the cart."""
+    product_id = serializers.IntegerField(required=True)
+    quantity = serializers.IntegerField(default=1, min_value=1)
+    currency = serializers.ChoiceField(choices=Currency.choices, default=Currency.USD)
+
+
+class CartQuantitySerializer(serializers.Serializer):
+    """Serializer for setting the quantity of a cart line, zero removes it."""
+    quantity = serializers.IntegerField(required=True, min_value=0)
+
+
+class CartLineResponseSerializer(serializers.Serializer):
+    id = serializers.CharField(read_only=True)
+    product_id = serializers.IntegerField(read_only=True)
+    seller_id = serializers.IntegerField(read_only=True)
+    price_id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    sku = serializers.CharField(read_only=True, allow_null=True)
+    currency = serializers.CharField(read_only=True)
+    unit_amount = serializers.IntegerField(read_only=True)
+    quantity = serializers.IntegerField(read_only=True)
+    line_amount = serializers.IntegerField(read_only=True)
+    issues = serializers.ListField(child=serializers.CharField(), read_only=True, required=False)
+
+
+class CartResponseSerializer(serializers.Serializer):
+    lines = CartLineResponseSerializer(many=True, read_only=True)
+    totals = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    is_valid = serializers.BooleanField(read_only=True, required=False)
+
@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from apps.common.events import track_changes
+from apps.orders.domain.rollups import get_rollup_sign
+from apps.orders.models import Order
+from apps.orders.tasks import update_sales_rollups_task
+
+# Sent when orders change status. Receivers get ``order_ids``, ``from_status``
+# (None for new orders) and ``to_status``.
+order_status_changed = Signal()
+
+track_changes(Order, fields=['status'])
+
+
+@receiver(order_status_changed)
+def schedule_sales_rollup_update(sender, order_ids, from_status, to_status, **kwargs) -> None:
+    """
+    Queues a rollup refresh once a status change into or out of the counted
+    statuses has committed.
+    """
+    if not get_rollup_sign(from_status, to_status) or not order_ids:
+        return
+
+    order_ids = list(order_ids)
+    transaction.on_commit(lambda: update_sales_rollups_task.delay(order_ids))
@@ -0,0 +1,13 @@
+from celery import shared_task
+
+from apps.orders.domain.rollups import refresh_sales_rollups
+
+
+# Refreshing recomputes whole buckets, so the task is acked after it finishes
+# and a retry or redelivery cannot count an order twice.
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def update_sales_rollups_task(order_ids: list[int]) -> None:
+    """
+    Celery task to refresh the sales rollup buckets of orders whose status changed.
+    """
+    refresh_sales_rollups(order_ids)
@@ -0,0 +1,39 @@
+from django.urls import path
+from .views import CartViewSet, OrderViewSet
+
+urlpatterns = [
+    # Buyer order history
+    path('', OrderViewSet.as_view({
+        'get': 'list',
+    }), name='order-list'),
+
+    # Seller order history
+    path('sellers/<str:identifier>', OrderViewSet.as_view({
+        'get': 'seller_list',
+    }), name='seller-order-list'),
+    path('sellers/<str:identifier>/sales', OrderViewSet.as_view({
+        'get': 'seller_sales',
+    }), name='seller-sales'),
+    path('sellers/<str:identifier>/transitions', OrderViewSet.as_view({
+        'post': 'bulk_transition',
+    }), name='seller-order-bulk-transition'),
+    path('sellers/<str:identifier>/<str:order_id>/status', OrderViewSet.as_view({
+        'patch': 'transition',
+    }), name='seller-order-transition'),
+
+    # Cart of the current shopper
+    path('cart', CartViewSet.as_view({
+        'get': 'retrieve',
+        'delete': 'destroy',
+    }), name='cart-detail'),
+    path('cart/items', CartViewSet.as_view({
+        'post': 'add_line',
+    }), name='cart-items'),
+    path('cart/items/<str:line_id>', CartViewSet.as_view({
+        'patch': 'update_line',
+        'delete': 'remove_line',
+    }), name='cart-item-detail'),
+    path('cart/validate', CartViewSet.as_view({
+        'post': 'validate',
+    }), name='cart-validate'),
+]
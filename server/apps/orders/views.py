@@ -1,3 +1,318 @@
-from django.shortcuts import render
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from apps.common.pagination import InvalidCursor, KeysetPaginator
+from apps.identity.domain.utils import format_validation_errors
+from apps.sellers.utils import get_seller, check_seller_owner
+from .domain.cart import (
+    CartError,
+    add_item,
+    clear_cart,
+    get_cart,
+    get_cart_key,
+    is_valid_cart_id,
+    merge_carts,
+    new_cart_id,
+    remove_item,
+    set_quantity,
+    validate_cart,
+)
+from .domain.transitions import TransitionError, bulk_transition_orders, transition_order
+from .models import Order, ProductSalesRollup, SellerSalesRollup
+from .serializers import (
+    BulkOrderTransitionSerializer,
+    CartItemSerializer,
+    CartQuantitySerializer,
+    CartResponseSerializer,
+    OrderHistoryFilterSerializer,
+    OrderResponseSerializer,
+    OrderTransitionResponseSerializer,
+    OrderTransitionSerializer,
+    SalesRollupFilterSerializer,
+    SalesRollupResponseSerializer,
+)
+
+
+class OrderViewSet(ViewSet):
+    queryset = Order.objects.all()
+    permission_classes = [IsAuthenticated]
+
+    def _get_paginator(self) -> KeysetPaginator:
+        return KeysetPaginator(
+            page_size=getattr(settings, 'ORDER_HISTORY_PAGE_SIZE', 50),
+            max_page_size=getattr(settings, 'ORDER_HISTORY_MAX_PAGE_SIZE', 100),
+        )
+
+    def _history_response(self, request: Request, orders: QuerySet) -> Response:
+        """
+        Applies history filters and returns one keyset page of orders with their items.
+        """
+        filters = OrderHistoryFilterSerializer(data=request.query_params)
+
+        if not filters.is_valid():
+            formatted_errors = format_validation_errors(filters.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        params = filters.validated_data
+        if 'status' in params:
+            orders = orders.filter(status=params['status'])
+        if 'created_after' in params:
+            orders = orders.filter(created_at__gte=params['created_after'])
+        if 'created_before' in params:
+            orders = orders.filter(created_at__lt=params['created_before'])
+
+        orders = orders.prefetch_related('items')
+
+        try:
+            page, next_cursor = self._get_paginator().paginate(
+                orders,
+                cursor=params.get('cursor'),
+                page_size=params.get('limit'),
+            )
+        except InvalidCursor:
+            return Response({'detail': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = OrderResponseSerializer(page, many=True)
+        return Response({'results': serializer.data, 'next_cursor': next_cursor})
+
+    def list(self, request: Request) -> Response:
+        """
+        Order history of the authenticated buyer.
+        """
+        orders = self.queryset.filter(user=request.user)
+        return self._history_response(request, orders)
+
+    def seller_list(self, request: Request, **kwargs) -> Response:
+        """
+        Order history of a seller, only visible to its owner.
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        orders = self.queryset.filter(seller=seller)
+        return self._history_response(request, orders)
+
+    def seller_sales(self, request: Request, **kwargs) -> Response:
+        """
+        Sales dashboard of a seller, read from the precomputed rollups.
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        filters = SalesRollupFilterSerializer(data=request.query_params)
+
+        if not filters.is_valid():
+            formatted_errors = format_validation_errors(filters.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        params = filters.validated_data
+        if 'product_id' in params:
+            rollups = ProductSalesRollup.objects.filter(seller=seller, product_id=params['product_id'])
+        else:
+            rollups = SellerSalesRollup.objects.filter(seller=seller)
+
+        rollups = rollups.filter(
+            granularity=params['granularity'],
+            bucket_start__gte=params['start'],
+            bucket_start__lt=params['end'],
+        )
+        if 'currency' in params:
+            rollups = rollups.filter(currency=params['currency'])
+
+        serializer = SalesRollupResponseSerializer(rollups.order_by('bucket_start', 'currency'), many=True)
+        return Response(serializer.data)
+
+    def transition(self, request: Request, **kwargs) -> Response:
+        """
+        Moves one of the seller's orders to a new status.
+        Retries carrying the same Idempotency-Key header get the original result.
+        """
+        identifier = kwargs.get('identifier')
+        order_id = kwargs.get('order_id')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            order = get_object_or_404(self.queryset, id=int(order_id), seller=seller)
+        except (ValueError, TypeError):
+            return Response(
+                {'detail': 'Invalid order ID.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = OrderTransitionSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            transition = transition_order(
+                order,
+                serializer.validated_data['status'],
+                idempotency_key=request.headers.get('Idempotency-Key'),
+            )
+        except TransitionError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+
+        response_serializer = OrderTransitionResponseSerializer(transition)
+        return Response(response_serializer.data)
+
+    def bulk_transition(self, request: Request, **kwargs) -> Response:
+        """
+        Moves many of the seller's orders from one status to another in one statement.
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = BulkOrderTransitionSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        order_ids = serializer.validated_data['order_ids']
+        try:
+            updated = bulk_transition_orders(
+                self.queryset.filter(seller=seller),
+                order_ids,
+                serializer.validated_data['from_status'],
+                serializer.validated_data['status'],
+            )
+        except TransitionError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+
+        updated_set = set(updated)
+        skipped = [order_id for order_id in order_ids if order_id not in updated_set]
+        return Response({'updated': sorted(updated_set), 'skipped': skipped})
+
+
+class CartViewSet(ViewSet):
+    """
+    Server-side cart. Logged in shoppers use their user cart, anonymous ones
+    send the cart ID returned in the X-Cart-Id header. The first authenticated
+    request that still carries an anonymous cart ID merges that cart in.
+    """
+    permission_classes = [AllowAny]
+    cart_id_header = 'X-Cart-Id'
+
+    def _get_cart_key(self, request: Request, create: bool = False) -> tuple[Optional[str], Optional[str]]:
+        """
+        Returns (cart key, anonymous cart ID to send back).
+        """
+        cart_id = request.headers.get(self.cart_id_header)
+        if not is_valid_cart_id(cart_id):
+            cart_id = None
+
+        if request.user.is_authenticated:
+            key = get_cart_key(user_id=request.user.id)
+            if cart_id:
+                merge_carts(get_cart_key(cart_id=cart_id), key)
+            return key, None
+
+        if cart_id is None:
+            if not create:
+                return None, None
+            cart_id = new_cart_id()
+        return get_cart_key(cart_id=cart_id), cart_id
+
+    def _cart_response(self, cart: dict, cart_id: Optional[str], status_code: int = status.HTTP_200_OK) -> Response:
+        response = Response(CartResponseSerializer(cart).data, status=status_code)
+        if cart_id:
+            response[self.cart_id_header] = cart_id
+        return response
+
+    def retrieve(self, request: Request) -> Response:
+        key, cart_id = self._get_cart_key(request)
+        cart = get_cart(key) if key else {'lines': [], 'totals': {}}
+        return self._cart_response(cart, cart_id)
+
+    def destroy(self, request: Request) -> Response:
+        key, _ = self._get_cart_key(request)
+        if key:
+            clear_cart(key)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def add_line(self, request: Request) -> Response:
+        serializer = CartItemSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        key, cart_id = self._get_cart_key(request, create=True)
+        params = serializer.validated_data
+        try:
+            add_item(key, params['product_id'], params['quantity'], params['currency'])
+        except CartError as e:
+            return Response({'errors': {'product_id': [str(e)]}}, status=status.HTTP_400_BAD_REQUEST)
+
+        return self._cart_response(get_cart(key), cart_id, status.HTTP_201_CREATED)
+
+    def update_line(self, request: Request, **kwargs) -> Response:
+        serializer = CartQuantitySerializer(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        key, cart_id = self._get_cart_key(request)
+        if key is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            set_quantity(key, kwargs.get('line_id'), serializer.validated_data['quantity'])
+        except CartError as e:
+            return Response({'errors': {'quantity': [str(e)]}}, status=status.HTTP_400_BAD_REQUEST)
+
+        return self._cart_response(get_cart(key), cart_id)
+
+    def remove_line(self, request: Request, **kwargs) -> Response:
+        key, _ = self._get_cart_key(request)
+        if key is None or not remove_item(key, kwargs.get('line_id')):
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def validate(self, request: Request) -> Response:
+        """
+        Re-checks every line against current prices and stock before checkout.
+        """
+        key, cart_id = self._get_cart_key(request)
+        cart = validate_cart(key) if key else {'lines': [], 'totals': {}, 'is_valid': False}
+        return self._cart_response(cart, cart_id)
 
-# Create your views here.
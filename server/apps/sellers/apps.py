@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SellersConfig(AppConfig):
     name = 'apps.sellers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
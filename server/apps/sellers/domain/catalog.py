@@ -0,0 +1,22 @@
+from typing import Iterable
+
+from apps.common.redis import bump_cache_version, get_cache_version
+
+
+def get_catalog_version_name(seller_id: int) -> str:
+    return f"catalog:{seller_id}"
+
+
+def get_catalog_version(seller_id: int) -> int:
+    """
+    Returns the version counter that seller catalog caches are keyed by.
+    """
+    return get_cache_version(get_catalog_version_name(seller_id))
+
+
+def bump_catalog_versions(seller_ids: Iterable[int]) -> None:
+    """
+    Invalidates every cached catalog view of the given sellers.
+    """
+    for seller_id in set(seller_ids):
+        bump_cache_version(get_catalog_version_name(seller_id))
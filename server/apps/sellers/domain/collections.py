@@ -0,0 +1,131 @@
+from collections import defaultdict
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Value, When
+
+from apps.common.metrics import record_cache_lookup
+from apps.common.redis import bump_cache_version, get_cache_version
+from .catalog import get_catalog_version
+from .prices import get_current_prices
+from ..models import Collection, CollectionProduct
+from ..serializers import CollectionMemberResponseSerializer, CollectionResponseSerializer
+
+
+class CollectionError(Exception):
+    pass
+
+
+def get_collection_version_name(collection_id: int) -> str:
+    return f"collection:{collection_id}"
+
+
+def bump_collection_version(collection_id: int) -> None:
+    """
+    Invalidates the cached rendering of a collection.
+    """
+    bump_cache_version(get_collection_version_name(collection_id))
+
+
+def add_collection_products(collection: Collection, product_ids: Iterable[int]) -> int:
+    """
+    Appends products to the end of a collection, skipping current members.
+
+    Returns the number of products added.
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    with transaction.atomic():
+        # Lock the collection so concurrent appends don't share positions
+        Collection.objects.select_for_update().filter(id=collection.id).first()
+        existing = set(
+            CollectionProduct.objects.filter(collection=collection, product_id__in=product_ids)
+            .values_list('product_id', flat=True)
+        )
+        start = collection.memberships.aggregate(last=Max('position'))['last']
+        start = -1 if start is None else start
+
+        new_ids = [product_id for product_id in product_ids if product_id not in existing]
+        CollectionProduct.objects.bulk_create([
+            CollectionProduct(collection=collection, product_id=product_id, position=start + offset)
+            for offset, product_id in enumerate(new_ids, start=1)
+        ])
+        transaction.on_commit(lambda: bump_collection_version(collection.id))
+    return len(new_ids)
+
+
+def remove_collection_products(collection: Collection, product_ids: Iterable[int]) -> int:
+    """
+    Removes products from a collection. Gaps left in the positions are harmless.
+    """
+    with transaction.atomic():
+        removed, _ = CollectionProduct.objects.filter(
+            collection=collection, product_id__in=list(product_ids)
+        ).delete()
+        transaction.on_commit(lambda: bump_collection_version(collection.id))
+    return removed
+
+
+def reorder_collection(collection: Collection, product_ids: list[int]) -> None:
+    """
+    Rearranges the listed members among the positions they currently hold,
+    with a single UPDATE ... CASE statement.
+
+    Members left out keep their positions, so a collection larger than one
+    request can take is reordered a window at a time. product_ids must list
+    members of the collection, each once.
+    """
+    if len(product_ids) != len(set(product_ids)):
+        raise CollectionError('Product IDs must not repeat.')
+
+    with transaction.atomic():
+        members = CollectionProduct.objects.filter(collection=collection, product_id__in=product_ids)
+        current = dict(members.select_for_update().values_list('product_id', 'position'))
+        if len(current) != len(product_ids):
+            raise CollectionError('Product IDs must be members of the collection.')
+
+        slots = sorted(current.values())
+        positions = [
+            When(product_id=product_id, then=Value(position))
+            for position, product_id in zip(slots, product_ids)
+        ]
+        members.update(position=Case(*positions, output_field=IntegerField()))
+        transaction.on_commit(lambda: bump_collection_version(collection.id))
+
+
+def render_collection(collection: Collection) -> dict:
+    """
+    Serializes a collection with its ordered members and their current prices.
+
+    Two queries regardless of size: memberships with products, then current prices.
+    """
+    memberships = collection.memberships.select_related('product').order_by('position', 'id')
+    products = [membership.product for membership in memberships]
+
+    prices = defaultdict(list)
+    for (product_id, _), price in get_current_prices([product.id for product in products]).items():
+        prices[product_id].append(price)
+    for product in products:
+        product.current_prices = prices[product.id]
+
+    data = dict(CollectionResponseSerializer(collection).data)
+    data['products'] = [dict(member) for member in CollectionMemberResponseSerializer(products, many=True).data]
+    return data
+
+
+def get_cached_collection(collection: Collection) -> dict:
+    """
+    Returns the rendered collection, cached per collection and seller catalog version.
+    """
+    key = (
+        f"collection:{collection.id}"
+        f":{get_cache_version(get_collection_version_name(collection.id))}"
+        f":{get_catalog_version(collection.seller_id)}"
+    )
+    data = cache.get(key)
+    record_cache_lookup('collection', data is not None)
+    if data is None:
+        data = render_collection(collection)
+        cache.set(key, data, timeout=getattr(settings, 'COLLECTION_CACHE_SECONDS', 300))
+    return data
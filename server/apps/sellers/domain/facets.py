@@ -0,0 +1,198 @@
+import hashlib
+import json
+import math
+from collections import defaultdict
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import BooleanField, Case, Count, IntegerField, Q, QuerySet, Value, When
+from django.db.models.fields.json import KeyTransform
+
+from apps.common.metrics import record_cache_lookup
+from .catalog import get_catalog_version
+from ..serializers import ATTRIBUTE_KEY_PATTERN
+
+# Query parameters that filter a listing, and so change its facet counts,
+# besides the attribute filters named ATTRIBUTE_PARAM_PREFIX + key
+FACET_FILTER_PARAMS = frozenset({'name', 'sku', 'is_published', 'in_stock', 'currency', 'min_price', 'max_price'})
+ATTRIBUTE_PARAM_PREFIX = 'attr_'
+
+
+def get_price_bands() -> list[tuple[int, Optional[int]]]:
+    """
+    Get [lower, upper) price bands in minor units from PRODUCT_PRICE_BAND_BOUNDARIES.
+    """
+    boundaries = sorted(getattr(settings, 'PRODUCT_PRICE_BAND_BOUNDARIES', [1000, 2500, 5000, 10000]))
+    lowers = [0] + boundaries
+    uppers = boundaries + [None]
+    return list(zip(lowers, uppers))
+
+
+def _price_band_case(bands: list[tuple[int, Optional[int]]]) -> Case:
+    whens = []
+    for index, (lower, upper) in enumerate(bands):
+        lookup = {'min_price__gte': lower}
+        if upper is not None:
+            lookup['min_price__lt'] = upper
+        whens.append(When(then=Value(index), **lookup))
+    return Case(*whens, default=None, output_field=IntegerField())
+
+
+def format_attribute_value(value) -> str:
+    """
+    Renders an attribute value the way facets list it: strings as they are,
+    numbers and booleans as JSON text (10, 1.5, true).
+    """
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def get_attribute_params(params: dict) -> dict[str, str]:
+    """
+    Get the attribute filters in a listing's query parameters (?attr_color=red),
+    keyed by attribute name. Parameters naming an invalid attribute are ignored.
+    """
+    attributes = {}
+    for param, value in params.items():
+        key = param[len(ATTRIBUTE_PARAM_PREFIX):]
+        if param.startswith(ATTRIBUTE_PARAM_PREFIX) and ATTRIBUTE_KEY_PATTERN.match(key):
+            attributes[key] = value
+    return attributes
+
+
+def get_attribute_filter(lookup: str, value: str) -> Q:
+    """
+    Matches products whose attribute under lookup equals value, read as any
+    JSON type it spells, so the values listed by the facets filter what they count.
+    """
+    condition = Q(**{lookup: value})
+    if value in ('true', 'false'):
+        return condition | Q(**{lookup: value == 'true'})
+
+    try:
+        number = json.loads(value)
+    except ValueError:
+        return condition
+    if isinstance(number, (int, float)) and not isinstance(number, bool) and math.isfinite(number):
+        condition |= Q(**{lookup: number})
+    return condition
+
+
+def filter_by_attributes(products: QuerySet, attributes: dict[str, str]) -> QuerySet:
+    """
+    Keeps the products matching every attribute filter.
+
+    Each key is read through a KeyTransform alias rather than spelled as an
+    attributes__<key> lookup, so a key like "contains" or "color__regex" is
+    always an attribute name and never an ORM lookup.
+    """
+    for index, (key, value) in enumerate(attributes.items()):
+        alias = f'attribute_filter_{index}'
+        products = products.alias(**{alias: KeyTransform(key, 'attributes')})
+        products = products.filter(get_attribute_filter(alias, value))
+    return products
+
+
+def count_attribute_values(products: QuerySet) -> dict[str, dict[str, int]]:
+    """
+    Counts products per attribute key and value.
+
+    PostgreSQL expands each product's attributes with jsonb_each_text and groups
+    per key and value; other backends group by the whole attributes object and
+    split the groups in Python.
+    """
+    counts = defaultdict(lambda: defaultdict(int))
+    connection = connections[products.db]
+
+    if connection.vendor == 'postgresql':
+        sql, params = products.order_by().values('attributes').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT entry.key, entry.value, COUNT(*) FROM ({sql}) AS product "
+                "CROSS JOIN LATERAL jsonb_each_text(product.attributes) AS entry "
+                "GROUP BY entry.key, entry.value",
+                params,
+            )
+            for key, value, count in cursor.fetchall():
+                counts[key][value] += count
+    else:
+        groups = products.order_by().values('attributes').annotate(count=Count('id'))
+        for group in groups:
+            for key, value in (group['attributes'] or {}).items():
+                counts[key][format_attribute_value(value)] += group['count']
+
+    return {key: dict(values) for key, values in counts.items()}
+
+
+def compute_facets(products: QuerySet, with_price: bool = False) -> dict:
+    """
+    Counts products per facet value with two grouped aggregate queries.
+
+    Rows are grouped by the fixed facet dimensions at once (published, in stock
+    and, when products carry a min_price annotation, price band) and the
+    per-facet counts are summed from those groups. Attributes are counted per
+    key and value by count_attribute_values.
+    """
+    bands = get_price_bands() if with_price else []
+    annotations = {
+        'in_stock': Case(When(stock__gt=0, then=Value(True)), default=Value(False), output_field=BooleanField()),
+    }
+    group_fields = ['is_published', 'in_stock']
+    if with_price:
+        annotations['price_band'] = _price_band_case(bands)
+        group_fields.append('price_band')
+
+    groups = products.annotate(**annotations).order_by().values(*group_fields).annotate(count=Count('id'))
+
+    total = 0
+    published = {'true': 0, 'false': 0}
+    in_stock = {'true': 0, 'false': 0}
+    band_counts = [0] * len(bands)
+
+    for group in groups:
+        count = group['count']
+        total += count
+        published['true' if group['is_published'] else 'false'] += count
+        in_stock['true' if group['in_stock'] else 'false'] += count
+        if with_price and group['price_band'] is not None:
+            band_counts[group['price_band']] += count
+
+    facets = {
+        'is_published': published,
+        'in_stock': in_stock,
+        'attributes': count_attribute_values(products) if total else {},
+    }
+    if with_price:
+        facets['price'] = [
+            {'min': lower, 'max': upper, 'count': count}
+            for (lower, upper), count in zip(bands, band_counts)
+        ]
+    return {'total': total, 'facets': facets}
+
+
+def get_facets_cache_key(seller_id: int, params: dict) -> str:
+    # Only recognised filters are part of the key, so unknown parameters
+    # cannot create new cache entries
+    relevant = sorted(
+        [(param, params[param]) for param in FACET_FILTER_PARAMS if param in params]
+        + [(ATTRIBUTE_PARAM_PREFIX + key, value) for key, value in get_attribute_params(params).items()]
+    )
+    params_hash = hashlib.sha256(json.dumps(relevant).encode('utf-8')).hexdigest()[:32]
+    return f"facets:{seller_id}:{get_catalog_version(seller_id)}:{params_hash}"
+
+
+def get_cached_facets(seller_id: int, params: dict, compute: Callable[[], dict]) -> dict:
+    """
+    Returns facets for a seller listing from the cache, computing them on a miss.
+
+    Keys embed the seller's catalog version, so product and price writes
+    invalidate every cached facet set of that seller at once.
+    """
+    key = get_facets_cache_key(seller_id, params)
+    facets = cache.get(key)
+    record_cache_lookup('facets', facets is not None)
+    if facets is None:
+        facets = compute()
+        cache.set(key, facets, timeout=getattr(settings, 'PRODUCT_FACET_CACHE_SECONDS', 300))
+    return facets
@@ -0,0 +1,111 @@
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from apps.common.events import publish_changes
+from apps.common.images import ImageError, fetch_image, process_image
+from ..models import Product, ProductImage, Seller
+
+logger = logging.getLogger(__name__)
+
+
+def get_image_path_prefix(image: ProductImage) -> str:
+    return f"products/{image.product_id}/images/{image.id}"
+
+
+def store_original(image: ProductImage, name: str, content: bytes) -> None:
+    """
+    Saves an uploaded original next to the variants it will produce.
+    """
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else 'bin'
+    image.original = default_storage.save(
+        f"{get_image_path_prefix(image)}/original.{extension}", ContentFile(content)
+    )
+    image.save(update_fields=['original', 'updated_at'])
+
+
+def refresh_product_image_metadata(product_id: int) -> None:
+    """
+    Rewrites Product.image_metadata from the product's ready images.
+    """
+    images = ProductImage.objects.filter(
+        product_id=product_id, status=ProductImage.Status.READY
+    ).order_by('position', 'id')
+    metadata = [{'id': image.id, 'alt': image.alt_text, **image.metadata} for image in images]
+
+    with transaction.atomic():
+        Product.objects.filter(id=product_id).update(image_metadata=metadata)
+        # QuerySet.update skips model signals, so publish the change explicitly
+        seller_id = Product.objects.filter(id=product_id).values_list('seller_id', flat=True).first()
+        if seller_id is not None:
+            publish_changes(Product, [product_id], seller_id=seller_id)
+
+
+def process_product_image(image_id: int) -> None:
+    """
+    Fetches or reads the original, renders its variants and publishes the metadata.
+    """
+    image = ProductImage.objects.filter(id=image_id).first()
+    if image is None:
+        return
+
+    try:
+        if image.original:
+            with default_storage.open(image.original, 'rb') as f:
+                data = f.read()
+        elif image.source_url:
+            data = fetch_image(image.source_url)
+            store_original(image, image.source_url.split('?')[0], data)
+        else:
+            raise ImageError('Image has neither an upload nor a source URL.')
+
+        image.metadata = process_image(data, get_image_path_prefix(image))
+        image.status = ProductImage.Status.READY
+        image.error = ''
+    except (ImageError, OSError) as e:
+        image.status = ProductImage.Status.FAILED
+        image.error = str(e)
+    except Exception:
+        # Anything else is a bug, but the image must still leave PENDING
+        logger.exception('Processing product image %s failed', image.id)
+        image.status = ProductImage.Status.FAILED
+        image.error = 'The image could not be processed.'
+
+    image.save(update_fields=['metadata', 'status', 'error', 'updated_at'])
+    refresh_product_image_metadata(image.product_id)
+
+
+def delete_product_image(image: ProductImage) -> None:
+    """
+    Deletes an image with its stored files and republishes the product's metadata.
+    """
+    paths = [variant['path'] for variant in image.metadata.get('variants', [])]
+    if image.original:
+        paths.append(image.original)
+
+    product_id = image.product_id
+    image.delete()
+    refresh_product_image_metadata(product_id)
+
+    for path in paths:
+        default_storage.delete(path)
+
+
+def process_seller_logo(seller_id: int) -> None:
+    """
+    Renders the variants of a seller's logo URL into Seller.logo_metadata.
+    """
+    seller = Seller.objects.filter(id=seller_id).first()
+    if seller is None or not seller.logo:
+        return
+
+    try:
+        metadata = process_image(fetch_image(seller.logo), f"sellers/{seller.id}/logo")
+    except (ImageError, OSError):
+        metadata = None
+
+    # Skip the write if the logo changed while it was being processed
+    if Seller.objects.filter(id=seller.id, logo=seller.logo).update(logo_metadata=metadata):
+        publish_changes(Seller, [seller.id])
@@ -0,0 +1,207 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef, Q
+from django.utils import timezone
+
+from apps.common.redis import get_raw_redis_client
+from .catalog import bump_catalog_versions
+from .prices import get_effective_prices, resolve_prices
+from ..models import Price, Product, ProductPriceSummary
+
+# Sorted set of product IDs scored by the timestamp of their next price boundary
+PRICE_SCHEDULE_KEY = 'price-schedule'
+
+
+SUMMARY_FIELDS = ['current_price', 'current_amount', 'min_amount', 'max_amount', 'default_amount']
+
+
+def get_price_ranges(product_ids: list[int], at: datetime) -> dict[tuple[int, str], dict]:
+    """
+    Get the min, max and default amount over the prices valid at at per (product_id, currency).
+    """
+    rows = (
+        get_effective_prices(at)
+        .filter(product_id__in=product_ids)
+        .values('product_id', 'currency')
+        .annotate(
+            min_amount=Min('amount'),
+            max_amount=Max('amount'),
+            default_amount=Max('amount', filter=Q(is_default=True)),
+        )
+        .order_by()
+    )
+    return {
+        (row['product_id'], row['currency']): {
+            'min_amount': row['min_amount'],
+            'max_amount': row['max_amount'],
+            'default_amount': row['default_amount'],
+        }
+        for row in rows
+    }
+
+
+def refresh_price_summaries(product_ids: Iterable[int], at: Optional[datetime] = None) -> set[int]:
+    """
+    Rewrites the price summaries of product_ids to the prices effective at at.
+
+    Returns the seller IDs whose summaries changed. Run it inside the transaction
+    that changed the prices so readers never see the two disagree.
+    """
+    at = at or timezone.now()
+    product_ids = list(product_ids)
+    resolved = resolve_prices(product_ids, at=at)
+    ranges = get_price_ranges(product_ids, at)
+
+    with transaction.atomic():
+        existing = {
+            (summary.product_id, summary.currency): summary
+            for summary in ProductPriceSummary.objects.select_for_update().filter(product_id__in=product_ids)
+        }
+
+        to_create = []
+        to_update = []
+        for key, price in resolved.items():
+            values = {'current_price_id': price.id, 'current_amount': price.amount, **ranges[key]}
+            summary = existing.pop(key, None)
+            if summary is None:
+                to_create.append(ProductPriceSummary(product_id=key[0], currency=key[1], **values))
+            elif any(getattr(summary, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(summary, field, value)
+                summary.updated_at = timezone.now()
+                to_update.append(summary)
+
+        # Currencies left over have no effective price anymore
+        stale_ids = [summary.id for summary in existing.values()]
+
+        if to_create:
+            ProductPriceSummary.objects.bulk_create(to_create)
+        if to_update:
+            ProductPriceSummary.objects.bulk_update(to_update, SUMMARY_FIELDS + ['updated_at'])
+        if stale_ids:
+            ProductPriceSummary.objects.filter(id__in=stale_ids).delete()
+
+    changed_product_ids = (
+        {summary.product_id for summary in to_create + to_update}
+        | {product_id for product_id, _ in existing}
+    )
+    if not changed_product_ids:
+        return set()
+    return set(
+        Product.objects.filter(id__in=changed_product_ids).values_list('seller_id', flat=True)
+    )
+
+
+def get_next_price_boundaries(
+    product_ids: Iterable[int],
+    after: Optional[datetime] = None,
+) -> dict[int, Optional[datetime]]:
+    """
+    Get the next instant after after at which each product's effective price may change.
+    """
+    after = after or timezone.now()
+    product_ids = list(product_ids)
+    rows = (
+        Price.objects.filter(product_id__in=product_ids, is_active=True)
+        .values('product_id')
+        .annotate(
+            next_from=Min('valid_from', filter=Q(valid_from__gt=after)),
+            next_to=Min('valid_to', filter=Q(valid_to__gt=after)),
+        )
+    )
+
+    boundaries = dict.fromkeys(product_ids)
+    for row in rows:
+        candidates = [value for value in (row['next_from'], row['next_to']) if value is not None]
+        boundaries[row['product_id']] = min(candidates) if candidates else None
+    return boundaries
+
+
+def schedule_price_boundaries(product_ids: Iterable[int], after: Optional[datetime] = None) -> None:
+    """
+    Puts each product on the timer queue at its next price boundary, or takes it off.
+    """
+    boundaries = get_next_price_boundaries(product_ids, after)
+    if not boundaries:
+        return
+
+    pipe = get_raw_redis_client().pipeline()
+    for product_id, boundary in boundaries.items():
+        if boundary is None:
+            pipe.zrem(PRICE_SCHEDULE_KEY, product_id)
+        else:
+            pipe.zadd(PRICE_SCHEDULE_KEY, {product_id: boundary.timestamp()})
+    pipe.execute()
+
+
+def apply_due_price_changes(now: Optional[datetime] = None, batch_size: int = 500) -> int:
+    """
+    Applies price boundaries that are due and reschedules the affected products.
+
+    ZREM is the claim, so concurrent workers never apply the same product twice.
+    Returns the number of products claimed.
+    """
+    now = now or timezone.now()
+    client = get_raw_redis_client()
+    due = client.zrangebyscore(PRICE_SCHEDULE_KEY, '-inf', now.timestamp(), start=0, num=batch_size)
+    if not due:
+        return 0
+
+    pipe = client.pipeline()
+    for member in due:
+        pipe.zrem(PRICE_SCHEDULE_KEY, member)
+    claimed = [int(member) for member, removed in zip(due, pipe.execute()) if removed]
+    if not claimed:
+        return 0
+
+    try:
+        seller_ids = refresh_price_summaries(claimed, now)
+    except Exception:
+        # Put the claims back so the next drain retries them
+        client.zadd(PRICE_SCHEDULE_KEY, {product_id: now.timestamp() for product_id in claimed})
+        raise
+
+    schedule_price_boundaries(claimed, now)
+    bump_catalog_versions(seller_ids)
+    return len(claimed)
+
+
+def reconcile_price_schedule(
+    now: Optional[datetime] = None,
+    batch_size: int = 500,
+    windowed_only: bool = True,
+) -> int:
+    """
+    Refreshes price summaries and re-arms price boundaries from the Price table.
+
+    With windowed_only only products with a time limited price are covered:
+    they are the only ones with boundaries, so the only ones a lost schedule or
+    a drain that died between its claim and the refresh can leave behind.
+    Without it every product is rebuilt, e.g. after a deploy or a Redis flush.
+    Returns the number of products processed.
+    """
+    now = now or timezone.now()
+    products = Product.objects.all()
+    if windowed_only:
+        windowed = Price.objects.filter(product_id=OuterRef('pk')).filter(
+            Q(valid_from__isnull=False) | Q(valid_to__isnull=False)
+        )
+        products = products.filter(Exists(windowed))
+
+    processed = 0
+    last_id = 0
+    while True:
+        product_ids = list(
+            products.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not product_ids:
+            return processed
+
+        seller_ids = refresh_price_summaries(product_ids, now)
+        schedule_price_boundaries(product_ids, now)
+        bump_catalog_versions(seller_ids)
+
+        last_id = product_ids[-1]
+        processed += len(product_ids)
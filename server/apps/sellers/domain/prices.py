@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+
+from ..models import Price, ProductPriceSummary
+
+
+def get_effective_prices(at: datetime) -> QuerySet:
+    """
+    Get active prices whose validity window contains at.
+
+    valid_from is inclusive and valid_to exclusive, an empty bound is open ended.
+    """
+    return Price.objects.filter(
+        Q(valid_from__isnull=True) | Q(valid_from__lte=at),
+        Q(valid_to__isnull=True) | Q(valid_to__gt=at),
+        is_active=True,
+    )
+
+
+def resolve_prices(
+    product_ids: Iterable[int],
+    currency: Optional[str] = None,
+    at: Optional[datetime] = None,
+    seller_id: Optional[int] = None,
+) -> dict[tuple[int, str], Price]:
+    """
+    Resolves the single effective price per (product_id, currency) in one query.
+
+    When several prices overlap, the one whose window started most recently wins
+    (so a scheduled sale beats an open-ended base price), then the default price,
+    then the newest row. On PostgreSQL this is a DISTINCT ON, elsewhere the
+    ordered rows are reduced in Python. Pass seller_id to ignore products of
+    other sellers.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+
+    prices = get_effective_prices(at or timezone.now()).filter(product_id__in=product_ids)
+    if currency:
+        prices = prices.filter(currency=currency)
+    if seller_id is not None:
+        prices = prices.filter(product__seller_id=seller_id)
+
+    prices = prices.order_by(
+        'product_id',
+        'currency',
+        F('valid_from').desc(nulls_last=True),
+        '-is_default',
+        '-id',
+    )
+
+    if connection.features.can_distinct_on_fields:
+        prices = prices.distinct('product_id', 'currency')
+
+    resolved = {}
+    for price in prices:
+        resolved.setdefault((price.product_id, price.currency), price)
+    return resolved
+
+
+def resolve_price(product_id: int, currency: str, at: Optional[datetime] = None) -> Optional[Price]:
+    """
+    Get the effective price of one product in currency, or None.
+    """
+    return resolve_prices([product_id], currency, at).get((product_id, currency))
+
+
+def get_current_prices(
+    product_ids: Iterable[int],
+    currency: Optional[str] = None,
+    seller_id: Optional[int] = None,
+) -> dict[tuple[int, str], Price]:
+    """
+    Get the current price per (product_id, currency) from the maintained summaries.
+
+    Same shape as resolve_prices but without evaluating validity windows, which
+    the price schedule already applied.
+    """
+    summaries = ProductPriceSummary.objects.filter(
+        product_id__in=list(product_ids),
+        current_price__isnull=False,
+    ).select_related('current_price')
+    if currency:
+        summaries = summaries.filter(currency=currency)
+    if seller_id is not None:
+        summaries = summaries.filter(product__seller_id=seller_id)
+
+    return {
+        (summary.product_id, summary.currency): summary.current_price
+        for summary in summaries.order_by('product_id', 'currency')
+    }
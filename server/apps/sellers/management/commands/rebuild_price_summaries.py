@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from apps.sellers.domain.price_schedule import reconcile_price_schedule
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild every product price summary from the Price table and re-arm the price schedule. '
+        'Run it after deploying price summaries or when the Redis schedule was lost.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of products refreshed per transaction'
+        )
+        parser.add_argument(
+            '--windowed-only',
+            action='store_true',
+            default=False,
+            help='Only rebuild products with a time limited price, like the periodic reconcile'
+        )
+
+    def handle(self, *args, **opts) -> None:
+        batch_size = opts.get('batch_size')
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+
+        processed = reconcile_price_schedule(
+            batch_size=batch_size,
+            windowed_only=opts.get('windowed_only'),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt price summaries of {processed} products"))
@@ -48,6 +48,8 @@ class Seller(TimestampedModel):
     description = models.TextField(null=True, blank=True)
     support_email = models.EmailField(null=True, blank=True)
     logo = models.URLField(max_length=255, null=True, blank=True)
+    # Dimensions, blurhash and resized variants of logo, filled in by the image pipeline
+    logo_metadata = models.JSONField(null=True, blank=True)
     theme = models.CharField(max_length=255, choices=Theme.choices, default=Theme.LIGHT)
     content = models.JSONField(null=True, blank=True)
     custom_domain = models.CharField(max_length=255, null=True, blank=True)
@@ -71,6 +73,10 @@ class Product(TimestampedModel):
     sku = models.CharField(max_length=255, null=True, blank=True)
     stock = models.IntegerField(default=0)
     images = models.JSONField(null=True, blank=True)
+    # Flat facetable attributes, e.g. {"color": "red", "material": "cotton"}
+    attributes = models.JSONField(default=dict, blank=True)
+    # Processed ProductImage metadata in display order, denormalized for list rendering
+    image_metadata = models.JSONField(default=list, blank=True)
     is_active = models.BooleanField(default=True)
     is_published = models.BooleanField(default=False)
 
@@ -95,4 +101,102 @@ class Price(TimestampedModel):
     class Meta:
         indexes = [
             models.Index(fields=['product']),
-        ]
\ No newline at end of file
+            # Effective price lookups only ever consider active rows
+            models.Index(
+                fields=['product', 'currency', 'valid_from', 'valid_to'],
+                condition=models.Q(is_active=True),
+                name='price_effective_idx',
+            ),
+        ]
+
+class ProductImage(TimestampedModel):
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        READY = 'ready'
+        FAILED = 'failed'
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='product_images')
+    source_url = models.URLField(max_length=1024, null=True, blank=True)
+    # Storage path of the original upload
+    original = models.CharField(max_length=255, blank=True, default='')
+    alt_text = models.CharField(max_length=255, blank=True, default='')
+    position = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    metadata = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'position']),
+        ]
+
+class ProductVariant(TimestampedModel):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='variants')
+    sku = models.CharField(max_length=255)
+    # Option values that identify the variant, e.g. {"size": "m", "color": "red"}
+    options = models.JSONField(default=dict, blank=True)
+    stock = models.IntegerField(default=0)
+    price = models.ForeignKey(Price, on_delete=models.SET_NULL, null=True, blank=True, related_name='variants')
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.sku
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'sku'], name='unique_product_variant_sku'),
+        ]
+
+class Collection(TimestampedModel):
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name='collections')
+    name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=255)
+    description = models.TextField(null=True, blank=True)
+    is_featured = models.BooleanField(default=False)
+    is_published = models.BooleanField(default=False)
+    products = models.ManyToManyField(Product, through='CollectionProduct', related_name='collections')
+
+    def __str__(self):
+        return self.slug
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'slug'], name='unique_seller_collection_slug'),
+        ]
+
+
+class CollectionProduct(models.Model):
+    collection = models.ForeignKey(Collection, on_delete=models.CASCADE, related_name='memberships')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='memberships')
+    position = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'product'], name='unique_collection_product'),
+        ]
+        indexes = [
+            models.Index(fields=['collection', 'position']),
+        ]
+
+class ProductPriceSummary(models.Model):
+    """
+    Denormalized effective price per product and currency, kept current by the
+    price schedule so catalog reads don't evaluate validity windows.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='price_summaries')
+    currency = models.CharField(max_length=3, choices=Currency.choices, default=Currency.USD)
+    current_price = models.ForeignKey(Price, on_delete=models.SET_NULL, null=True, related_name='+')
+    current_amount = models.IntegerField(null=True)
+    # Range over every price valid right now, for "from $X" listings
+    min_amount = models.IntegerField(null=True)
+    max_amount = models.IntegerField(null=True)
+    default_amount = models.IntegerField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'currency'], name='unique_product_price_summary'),
+        ]
+        indexes = [
+            models.Index(fields=['currency', 'min_amount', 'product'], name='price_summary_min_idx'),
+        ]
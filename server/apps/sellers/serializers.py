@@ -1,6 +1,13 @@
+import re
+
+from django.conf import settings
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
-from .models import Seller, Product, Price
+from apps.common.images import build_responsive_image
+from apps.common.model_utils import Currency
+from .models import Collection, Seller, Product, Price, ProductImage, ProductVariant
+
+ATTRIBUTE_KEY_PATTERN = re.compile(r'^\w{1,64}$')
 
 
 class SellerSerializer(serializers.ModelSerializer):
@@ -34,6 +41,8 @@ class SellerSerializer(serializers.ModelSerializer):
 
 
 class SellerResponseSerializer(serializers.ModelSerializer):
+    logo_image = serializers.SerializerMethodField()
+
     class Meta:
         model = Seller
         fields = [
@@ -43,6 +52,7 @@ class SellerResponseSerializer(serializers.ModelSerializer):
             'slug',
             'support_email',
             'logo',
+            'logo_image',
             'theme',
             'content',
             'custom_domain',
@@ -58,6 +68,7 @@ class SellerResponseSerializer(serializers.ModelSerializer):
             'slug',
             'support_email',
             'logo',
+            'logo_image',
             'theme',
             'content',
             'custom_domain',
@@ -67,6 +78,9 @@ class SellerResponseSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
 
+    def get_logo_image(self, obj: Seller):
+        return build_responsive_image(obj.logo_metadata) if obj.logo_metadata else None
+
 
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
@@ -78,6 +92,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'sku',
             'stock',
             'images',
+            'attributes',
             'is_active',
             'is_published',
             'created_at',
@@ -90,8 +105,22 @@ class ProductSerializer(serializers.ModelSerializer):
             'sku': {'required': True},
         }
 
+    def validate_attributes(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('Attributes must be an object.')
+        for key, attribute in value.items():
+            if not ATTRIBUTE_KEY_PATTERN.match(key):
+                raise serializers.ValidationError(
+                    'Attribute names may only contain letters, digits and underscores.'
+                )
+            if not isinstance(attribute, (str, int, float, bool)):
+                raise serializers.ValidationError('Attribute values must be strings, numbers or booleans.')
+        return value
+
 
 class ProductResponseSerializer(serializers.ModelSerializer):
+    responsive_images = serializers.SerializerMethodField()
+
     class Meta:
         model = Product
         fields = [
@@ -101,6 +130,8 @@ class ProductResponseSerializer(serializers.ModelSerializer):
             'sku',
             'stock',
             'images',
+            'responsive_images',
+            'attributes',
             'created_at',
             'updated_at',
         ]
@@ -111,13 +142,60 @@ class ProductResponseSerializer(serializers.ModelSerializer):
             'sku',
             'stock',
             'images',
+            'responsive_images',
+            'attributes',
             'created_at',
             'updated_at',
         ]
 
+    def get_responsive_images(self, obj: Product) -> list[dict]:
+        # Built from the denormalized metadata so listings never query images
+        return [
+            {'id': image['id'], 'alt': image['alt'], **build_responsive_image(image)}
+            for image in obj.image_metadata or []
+        ]
+
+
+class ProductPriceRangeResponseSerializer(ProductResponseSerializer):
+    """Serializer for product list rows annotated with their price range in one currency."""
+    currency = serializers.CharField(source='price_currency', read_only=True, allow_null=True)
+    current_price = serializers.IntegerField(read_only=True, allow_null=True)
+    min_price = serializers.IntegerField(read_only=True, allow_null=True)
+    max_price = serializers.IntegerField(read_only=True, allow_null=True)
+    default_price = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta(ProductResponseSerializer.Meta):
+        fields = ProductResponseSerializer.Meta.fields + [
+            'currency',
+            'current_price',
+            'min_price',
+            'max_price',
+            'default_price',
+        ]
+
+
+class ProductPriceFilterSerializer(serializers.Serializer):
+    """Serializer to validate product list price parameters."""
+    currency = serializers.ChoiceField(choices=Currency.choices, required=False)
+    display_currency = serializers.ChoiceField(choices=Currency.choices, required=False)
+    min_price = serializers.IntegerField(required=False, min_value=0)
+    max_price = serializers.IntegerField(required=False, min_value=0)
+    sort = serializers.CharField(required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        uses_price = (
+            'min_price' in attrs
+            or 'max_price' in attrs
+            or 'display_currency' in attrs
+            or attrs.get('sort') == 'price'
+        )
+        if uses_price and not attrs.get('currency'):
+            raise serializers.ValidationError({'currency': 'Currency is required to sort or filter by price.'})
+        return attrs
+
 
 class PriceSerializer(serializers.ModelSerializer):
-    product_id = serializers.IntegerField(source='product.id', read_only=True)
+    product_id = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Price
@@ -140,7 +218,7 @@ class PriceSerializer(serializers.ModelSerializer):
 
 
 class PriceResponseSerializer(serializers.ModelSerializer):
-    product_id = serializers.IntegerField(source='product.id', read_only=True)
+    product_id = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Price
@@ -167,3 +245,176 @@ class PriceResponseSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
 
+
+class EffectivePriceFilterSerializer(serializers.Serializer):
+    """Serializer to validate effective price query parameters."""
+    currency = serializers.ChoiceField(choices=Currency.choices, required=False)
+    at = serializers.DateTimeField(required=False)
+
+
+class BulkEffectivePriceFilterSerializer(EffectivePriceFilterSerializer):
+    """Serializer to validate bulk effective price query parameters."""
+    product_ids = serializers.CharField()
+
+    def validate_product_ids(self, value: str) -> list[int]:
+        try:
+            product_ids = [int(product_id) for product_id in value.split(',') if product_id.strip()]
+        except ValueError:
+            raise serializers.ValidationError('Product IDs must be a comma separated list of integers.')
+
+        if not product_ids:
+            raise serializers.ValidationError('At least one product ID is required.')
+        if len(product_ids) > 100:
+            raise serializers.ValidationError('At most 100 product IDs can be resolved at once.')
+        return product_ids
+
+
+def validate_option_values(value):
+    if not isinstance(value, dict):
+        raise serializers.ValidationError('Options must be an object.')
+    for key, option in value.items():
+        if not ATTRIBUTE_KEY_PATTERN.match(key):
+            raise serializers.ValidationError('Option names may only contain letters, digits and underscores.')
+        if not isinstance(option, str):
+            raise serializers.ValidationError('Option values must be strings.')
+    return value
+
+
+class ProductVariantSerializer(serializers.ModelSerializer):
+    """Serializer for creating a product variant."""
+    price_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = ProductVariant
+        fields = ['sku', 'options', 'stock', 'price_id', 'is_active']
+        extra_kwargs = {
+            'sku': {'required': True},
+            'options': {'validators': [validate_option_values]},
+            'stock': {'min_value': 0},
+        }
+        # Uniqueness is checked for the whole batch in the view
+        validators = []
+
+
+class ProductVariantUpdateSerializer(serializers.Serializer):
+    """Serializer for a partial update of one variant in a bulk update."""
+    id = serializers.IntegerField()
+    sku = serializers.CharField(max_length=255, required=False)
+    options = serializers.JSONField(required=False, validators=[validate_option_values])
+    stock = serializers.IntegerField(required=False, min_value=0)
+    price_id = serializers.IntegerField(required=False, allow_null=True)
+    is_active = serializers.BooleanField(required=False)
+
+
+class BulkProductVariantCreateSerializer(serializers.Serializer):
+    """Serializer for creating many variants of a product."""
+    variants = ProductVariantSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class BulkProductVariantUpdateSerializer(serializers.Serializer):
+    """Serializer for updating many variants of a product."""
+    variants = ProductVariantUpdateSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class PriceAmountResponseSerializer(serializers.ModelSerializer):
+    """Serializer for a price embedded in another resource."""
+    class Meta:
+        model = Price
+        fields = ['id', 'amount', 'currency']
+        read_only_fields = ['id', 'amount', 'currency']
+
+
+class ProductVariantResponseSerializer(serializers.ModelSerializer):
+    """Serializer for product variant responses."""
+    price = PriceAmountResponseSerializer(read_only=True, allow_null=True)
+
+    class Meta:
+        model = ProductVariant
+        fields = ['id', 'sku', 'options', 'stock', 'price', 'is_active', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'sku', 'options', 'stock', 'price', 'is_active', 'created_at', 'updated_at']
+
+
+class CollectionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Collection
+        fields = [
+            'id',
+            'name',
+            'slug',
+            'description',
+            'is_featured',
+            'is_published',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+        extra_kwargs = {
+            'name': {'required': True},
+            'slug': {'required': True},
+        }
+
+
+class CollectionResponseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Collection
+        fields = [
+            'id',
+            'name',
+            'slug',
+            'description',
+            'is_featured',
+            'is_published',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class CollectionProductsSerializer(serializers.Serializer):
+    """Serializer for adding, removing or ordering collection members."""
+    product_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=500,
+    )
+
+
+class CollectionMemberResponseSerializer(ProductResponseSerializer):
+    """Serializer for a collection member with its current prices."""
+    prices = PriceAmountResponseSerializer(source='current_prices', many=True, read_only=True)
+
+    class Meta(ProductResponseSerializer.Meta):
+        fields = ProductResponseSerializer.Meta.fields + ['prices']
+
+
+class ProductImageSerializer(serializers.Serializer):
+    """Serializer for adding a product image from an upload or a URL."""
+    file = serializers.ImageField(required=False)
+    url = serializers.URLField(required=False, max_length=1024)
+    alt_text = serializers.CharField(required=False, allow_blank=True, max_length=255)
+    position = serializers.IntegerField(required=False, min_value=0)
+
+    def validate_file(self, value):
+        max_bytes = getattr(settings, 'IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+        if value.size > max_bytes:
+            raise serializers.ValidationError(f'Images may be at most {max_bytes} bytes.')
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        if bool(attrs.get('file')) == bool(attrs.get('url')):
+            raise serializers.ValidationError({'file': 'Provide either a file or a url.'})
+        return attrs
+
+
+class ProductImageResponseSerializer(serializers.ModelSerializer):
+    """Serializer for product image responses."""
+    image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductImage
+        fields = ['id', 'source_url', 'alt_text', 'position', 'status', 'error', 'image', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+    def get_image(self, obj: ProductImage):
+        return build_responsive_image(obj.metadata) if obj.status == ProductImage.Status.READY else None
+
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.events import entities_changed, track_changes
+from apps.sellers.domain.catalog import bump_catalog_versions
+from apps.sellers.domain.price_schedule import refresh_price_summaries, schedule_price_boundaries
+from apps.sellers.models import Price, Product, Seller
+
+track_changes(Seller)
+track_changes(Product, fields=['seller_id'])
+track_changes(Price, fields=['product_id'])
+
+
+@receiver([post_save, post_delete], sender=Price)
+def refresh_product_price_summary(sender, instance: Price, **kwargs) -> None:
+    """
+    Keeps the product's price summary in step with its prices inside the same
+    transaction.
+    """
+    refresh_price_summaries([instance.product_id])
+
+
+@receiver(entities_changed, sender=Price)
+def reschedule_changed_prices(sender, events, **kwargs) -> None:
+    """
+    Re-arms the price timers of the changed products and drops their sellers'
+    catalog caches, once per transaction.
+    """
+    product_ids = {event.data['product_id'] for event in events}
+    schedule_price_boundaries(product_ids)
+    bump_catalog_versions(Product.objects.filter(id__in=product_ids).values_list('seller_id', flat=True))
+
+
+@receiver(entities_changed, sender=Product)
+def invalidate_seller_catalog(sender, events, **kwargs) -> None:
+    """
+    Drops the cached catalog views (facets, collections) of every seller whose
+    products changed.
+    """
+    bump_catalog_versions(event.data['seller_id'] for event in events)
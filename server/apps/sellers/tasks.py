@@ -0,0 +1,46 @@
+from celery import shared_task
+from django.conf import settings
+
+from apps.sellers.domain.images import process_product_image, process_seller_logo
+from apps.sellers.domain.price_schedule import apply_due_price_changes, reconcile_price_schedule
+
+
+@shared_task
+def apply_price_changes_task() -> int:
+    """
+    Celery beat task to apply scheduled price changes that are due.
+    """
+    batch_size = getattr(settings, 'PRICE_SCHEDULE_BATCH_SIZE', 500)
+    applied = 0
+    while True:
+        claimed = apply_due_price_changes(batch_size=batch_size)
+        applied += claimed
+        if claimed < batch_size:
+            return applied
+
+
+@shared_task
+def reconcile_price_schedule_task() -> int:
+    """
+    Celery beat task to re-arm price boundaries from the Price table, in case
+    the schedule was lost or a drain died before applying its claims.
+    """
+    return reconcile_price_schedule(batch_size=getattr(settings, 'PRICE_SCHEDULE_BATCH_SIZE', 500))
+
+
+# Rendering is idempotent, so the image tasks are acked after they finish and
+# a worker lost mid-render hands the image to another one.
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_product_image_task(image_id: int) -> None:
+    """
+    Celery task to render the responsive variants of a product image.
+    """
+    process_product_image(image_id)
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_seller_logo_task(seller_id: int) -> None:
+    """
+    Celery task to render the responsive variants of a seller logo.
+    """
+    process_seller_logo(seller_id)
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import PriceViewSet, ProductViewSet, SellerViewSet
+from .views import CollectionViewSet, PriceViewSet, ProductImageViewSet, ProductViewSet, SellerViewSet, VariantViewSet
 
 urlpatterns = [
     # Seller endpoints
@@ -17,6 +17,9 @@ urlpatterns = [
         'get': 'list',
         'post': 'create',
     }), name='product-list'),
+    path('<str:identifier>/products/facets', ProductViewSet.as_view({
+        'get': 'facets',
+    }), name='product-facets'),
     path('<str:identifier>/products/<str:product_id>', ProductViewSet.as_view({
         'get': 'retrieve',
         'put': 'update',
@@ -28,9 +31,48 @@ urlpatterns = [
         'get': 'list',
         'post': 'create',
     }), name='price-list'),
+    path('<str:identifier>/products/<str:product_id>/prices/effective', PriceViewSet.as_view({
+        'get': 'effective',
+    }), name='price-effective'),
     path('<str:identifier>/products/<str:product_id>/prices/<str:price_id>', PriceViewSet.as_view({
         'get': 'retrieve',
         'delete': 'destroy',
     }), name='price-detail'),
-]
 
+    # Variant endpoints (nested under seller and product)
+    path('<str:identifier>/products/<str:product_id>/variants', VariantViewSet.as_view({
+        'get': 'list',
+        'post': 'bulk_create',
+        'patch': 'bulk_update',
+    }), name='variant-list'),
+
+    # Image endpoints (nested under seller and product)
+    path('<str:identifier>/products/<str:product_id>/images', ProductImageViewSet.as_view({
+        'get': 'list',
+        'post': 'create',
+    }), name='product-image-list'),
+    path('<str:identifier>/products/<str:product_id>/images/<str:image_id>', ProductImageViewSet.as_view({
+        'delete': 'destroy',
+    }), name='product-image-detail'),
+
+    # Effective prices for many products of a seller
+    path('<str:identifier>/prices/effective', PriceViewSet.as_view({
+        'get': 'bulk_effective',
+    }), name='price-bulk-effective'),
+
+    # Collection endpoints (nested under seller)
+    path('<str:identifier>/collections', CollectionViewSet.as_view({
+        'get': 'list',
+        'post': 'create',
+    }), name='collection-list'),
+    path('<str:identifier>/collections/<str:collection_id>', CollectionViewSet.as_view({
+        'get': 'retrieve',
+        'put': 'update',
+        'delete': 'destroy',
+    }), name='collection-detail'),
+    path('<str:identifier>/collections/<str:collection_id>/products', CollectionViewSet.as_view({
+        'post': 'add_products',
+        'put': 'reorder',
+        'delete': 'remove_products',
+    }), name='collection-products'),
+]
@@ -18,7 +18,7 @@ def get_seller(identifier: str) -> Seller:
 
 def check_seller_owner(seller: Seller, user) -> bool:
     """
-    Check if user owns the seller.
+    Check if user owns the seller, without loading the seller's user.
     """
-    return seller.user == user
+    return seller.user_id is not None and seller.user_id == getattr(user, 'id', None)
 
@@ -1,6 +1,9 @@
+from .collection_views import CollectionViewSet
+from .image_views import ProductImageViewSet
 from .price_views import PriceViewSet
 from .product_views import ProductViewSet
 from .seller_views import SellerViewSet
+from .variant_views import VariantViewSet
 
-__all__ = ['SellerViewSet', 'ProductViewSet', 'PriceViewSet']
+__all__ = ['SellerViewSet', 'ProductViewSet', 'PriceViewSet', 'VariantViewSet', 'CollectionViewSet', 'ProductImageViewSet']
 
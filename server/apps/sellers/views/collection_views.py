@@ -0,0 +1,210 @@
+from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from apps.identity.domain.utils import format_validation_errors
+from ..domain.collections import (
+    CollectionError,
+    add_collection_products,
+    bump_collection_version,
+    get_cached_collection,
+    remove_collection_products,
+    reorder_collection,
+)
+from ..models import Collection, Product, Seller
+from ..serializers import (
+    CollectionProductsSerializer,
+    CollectionResponseSerializer,
+    CollectionSerializer,
+)
+from ..utils import get_seller, check_seller_owner
+
+
+class CollectionViewSet(ViewSet):
+    queryset = Collection.objects.all()
+    serializer_class = CollectionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_permissions(self):
+        """
+        Override to allow public access for list and retrieve actions.
+        """
+        if self.action in ['list', 'retrieve']:
+            return [AllowAny()]
+        return [IsAuthenticated()]
+
+    def _get_collection(self, seller: Seller, collection_id: str, user=None) -> Collection:
+        """
+        Get collection by ID, ensuring it belongs to the seller. Unpublished
+        collections are only visible to the seller's owner.
+        """
+        collections = self.queryset.filter(seller=seller)
+        if user is not None and not check_seller_owner(seller, user):
+            collections = collections.filter(is_published=True)
+        try:
+            collection_id_int = int(collection_id)
+            return get_object_or_404(collections, id=collection_id_int)
+        except (ValueError, TypeError):
+            raise Http404('Invalid collection ID.')
+
+    def list(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+        collections = self.queryset.filter(seller=seller)
+
+        if not check_seller_owner(seller, request.user):
+            collections = collections.filter(is_published=True)
+
+        is_featured = request.query_params.get('is_featured')
+        if is_featured is not None:
+            is_featured_bool = is_featured.lower() in ('true', '1', 'yes')
+            collections = collections.filter(is_featured=is_featured_bool)
+
+        serializer = CollectionResponseSerializer(collections.order_by('name', 'id'), many=True)
+        return Response(serializer.data)
+
+    def create(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = self.serializer_class(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                serializer.save(seller=seller)
+        except IntegrityError:
+            return Response({'errors': {'slug': ['Slug already exists']}}, status=status.HTTP_400_BAD_REQUEST)
+
+        response_serializer = CollectionResponseSerializer(serializer.instance)
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request: Request, **kwargs) -> Response:
+        """
+        Get a collection with its ordered products and their current prices.
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+        collection = self._get_collection(seller, kwargs.get('collection_id'), request.user)
+        return Response(get_cached_collection(collection))
+
+    def update(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        collection = self._get_collection(seller, kwargs.get('collection_id'))
+        serializer = self.serializer_class(collection, data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                serializer.save()
+                transaction.on_commit(lambda: bump_collection_version(collection.id))
+        except IntegrityError:
+            return Response({'errors': {'slug': ['Slug already exists']}}, status=status.HTTP_400_BAD_REQUEST)
+
+        response_serializer = CollectionResponseSerializer(serializer.instance)
+        return Response(response_serializer.data)
+
+    def destroy(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        collection = self._get_collection(seller, kwargs.get('collection_id'))
+        collection.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def _members_request(self, request: Request, **kwargs):
+        """
+        Resolve the collection and validated product IDs for a membership change.
+
+        Returns (collection, product_ids) or (None, error response).
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return None, Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        collection = self._get_collection(seller, kwargs.get('collection_id'))
+        serializer = CollectionProductsSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return None, Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        return collection, serializer.validated_data['product_ids']
+
+    def add_products(self, request: Request, **kwargs) -> Response:
+        collection, result = self._members_request(request, **kwargs)
+        if collection is None:
+            return result
+
+        product_ids = result
+        owned = set(
+            Product.objects.filter(seller_id=collection.seller_id, id__in=product_ids)
+            .values_list('id', flat=True)
+        )
+        missing = [product_id for product_id in product_ids if product_id not in owned]
+        if missing:
+            messages = [f"Product {product_id} does not exist." for product_id in missing]
+            return Response({'errors': {'product_ids': messages}}, status=status.HTTP_400_BAD_REQUEST)
+
+        added = add_collection_products(collection, product_ids)
+        return Response({'added': added}, status=status.HTTP_200_OK)
+
+    def remove_products(self, request: Request, **kwargs) -> Response:
+        collection, result = self._members_request(request, **kwargs)
+        if collection is None:
+            return result
+
+        removed = remove_collection_products(collection, result)
+        return Response({'removed': removed})
+
+    def reorder(self, request: Request, **kwargs) -> Response:
+        collection, result = self._members_request(request, **kwargs)
+        if collection is None:
+            return result
+
+        try:
+            reorder_collection(collection, result)
+        except CollectionError as e:
+            return Response({'errors': {'product_ids': [str(e)]}}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'product_ids': result})
@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from apps.identity.domain.utils import format_validation_errors
+from ..domain.images import delete_product_image, store_original
+from ..models import Product, ProductImage, Seller
+from ..serializers import ProductImageResponseSerializer, ProductImageSerializer
+from ..tasks import process_product_image_task
+from ..utils import get_seller, check_seller_owner
+
+
+class ProductImageViewSet(ViewSet):
+    queryset = ProductImage.objects.all()
+    serializer_class = ProductImageSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_permissions(self):
+        """
+        Override to allow public access for list action.
+        """
+        if self.action == 'list':
+            return [AllowAny()]
+        return [IsAuthenticated()]
+
+    def _get_product(self, seller: Seller, product_id: str) -> Product:
+        """
+        Get product by ID, ensuring it belongs to the seller.
+        """
+        try:
+            product_id_int = int(product_id)
+            return get_object_or_404(Product.objects.filter(seller=seller), id=product_id_int)
+        except (ValueError, TypeError):
+            raise Http404('Invalid product ID.')
+
+    def _get_image(self, product: Product, image_id: str) -> ProductImage:
+        """
+        Get image by ID, ensuring it belongs to the product.
+        """
+        try:
+            image_id_int = int(image_id)
+            return get_object_or_404(self.queryset.filter(product=product), id=image_id_int)
+        except (ValueError, TypeError):
+            raise Http404('Invalid image ID.')
+
+    def list(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+        product = self._get_product(seller, kwargs.get('product_id'))
+
+        images = self.queryset.filter(product=product).order_by('position', 'id')
+        serializer = ProductImageResponseSerializer(images, many=True)
+        return Response(serializer.data)
+
+    def create(self, request: Request, **kwargs) -> Response:
+        """
+        Add an image from a multipart upload or a URL.
+
+        The image is stored as pending and its variants are rendered by a
+        background task once the transaction commits.
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        product = self._get_product(seller, kwargs.get('product_id'))
+        serializer = self.serializer_class(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        with transaction.atomic():
+            position = data.get('position')
+            if position is None:
+                last = product.product_images.aggregate(last=Max('position'))['last']
+                position = 0 if last is None else last + 1
+
+            image = ProductImage.objects.create(
+                product=product,
+                source_url=data.get('url'),
+                alt_text=data.get('alt_text', ''),
+                position=position,
+            )
+            upload = data.get('file')
+            if upload is not None:
+                store_original(image, upload.name, upload.read())
+            transaction.on_commit(lambda: process_product_image_task.delay(image.id))
+
+        response_serializer = ProductImageResponseSerializer(image)
+        return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    def destroy(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        product = self._get_product(seller, kwargs.get('product_id'))
+        image = self._get_image(product, kwargs.get('image_id'))
+        delete_product_image(image)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,3 +1,6 @@
+from typing import Iterable
+
+from django.db import transaction
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import status
@@ -7,8 +10,14 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
 from apps.identity.domain.utils import format_validation_errors
+from ..domain.prices import get_current_prices, resolve_prices
 from ..models import Product, Price, Seller
-from ..serializers import PriceSerializer, PriceResponseSerializer
+from ..serializers import (
+    BulkEffectivePriceFilterSerializer,
+    EffectivePriceFilterSerializer,
+    PriceResponseSerializer,
+    PriceSerializer,
+)
 from ..utils import get_seller, check_seller_owner
 
 
@@ -21,7 +30,7 @@ class PriceViewSet(ViewSet):
         """
         Override to allow public access for list and retrieve actions.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'effective', 'bulk_effective']:
             return [AllowAny()]
         return [IsAuthenticated()]
 
@@ -45,6 +54,57 @@ class PriceViewSet(ViewSet):
         serializer = PriceResponseSerializer(prices, many=True)
         return Response(serializer.data)
 
+    def _resolve(self, product_ids: Iterable[int], currency=None, at=None, seller_id=None) -> dict:
+        """
+        Current prices come from the maintained summaries, other instants are resolved.
+        """
+        if at is None:
+            return get_current_prices(product_ids, currency=currency, seller_id=seller_id)
+        return resolve_prices(product_ids, currency=currency, at=at, seller_id=seller_id)
+
+    def effective(self, request: Request, **kwargs) -> Response:
+        """
+        Get the effective price of a product per currency at an instant (default now).
+        """
+        identifier = kwargs.get('identifier')
+        product_id = kwargs.get('product_id')
+        seller = get_seller(identifier)
+        product = self._get_product(seller, product_id)
+
+        filters = EffectivePriceFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            formatted_errors = format_validation_errors(filters.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        resolved = self._resolve(
+            [product.id],
+            currency=filters.validated_data.get('currency'),
+            at=filters.validated_data.get('at'),
+        )
+        serializer = PriceResponseSerializer(list(resolved.values()), many=True)
+        return Response(serializer.data)
+
+    def bulk_effective(self, request: Request, **kwargs) -> Response:
+        """
+        Get the effective prices of many of the seller's products in one query.
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        filters = BulkEffectivePriceFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            formatted_errors = format_validation_errors(filters.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        resolved = self._resolve(
+            filters.validated_data['product_ids'],
+            currency=filters.validated_data.get('currency'),
+            at=filters.validated_data.get('at'),
+            seller_id=seller.id,
+        )
+        serializer = PriceResponseSerializer(list(resolved.values()), many=True)
+        return Response(serializer.data)
+
     def create(self, request: Request, **kwargs) -> Response:
         identifier = kwargs.get('identifier')
         product_id = kwargs.get('product_id')
@@ -64,7 +124,9 @@ class PriceViewSet(ViewSet):
             formatted_errors = format_validation_errors(serializer.errors)
             return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer.save(product=product)
+        # The price summary is refreshed by a post_save receiver in this transaction
+        with transaction.atomic():
+            serializer.save(product=product)
         response_serializer = PriceResponseSerializer(serializer.instance)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -111,6 +173,7 @@ class PriceViewSet(ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        price.delete()
+        with transaction.atomic():
+            price.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
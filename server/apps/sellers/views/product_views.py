@@ -1,3 +1,4 @@
+from django.db.models import F, FilteredRelation, Q
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -5,12 +6,37 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from apps.common.fx import FxRateNotFound, convert_amounts
 from apps.identity.domain.utils import format_validation_errors
+from ..domain.facets import compute_facets, filter_by_attributes, get_attribute_params, get_cached_facets
 from ..models import Product
-from ..serializers import ProductSerializer, ProductResponseSerializer
+from ..serializers import (
+    ProductPriceFilterSerializer,
+    ProductPriceRangeResponseSerializer,
+    ProductResponseSerializer,
+    ProductSerializer,
+)
 from ..utils import get_seller, check_seller_owner
 
 
+# Annotated price range fields, in the currency of the price summary
+PRICE_RANGE_FIELDS = ('current_price', 'min_price', 'max_price', 'default_price')
+
+
+def convert_price_ranges(products: list[Product], from_currency: str, to_currency: str) -> None:
+    """
+    Converts the annotated price ranges of a product page in place, one rate lookup in total.
+    """
+    for field in PRICE_RANGE_FIELDS:
+        amounts = convert_amounts([getattr(product, field) for product in products], from_currency, to_currency)
+        for product, amount in zip(products, amounts):
+            setattr(product, field, amount)
+
+    for product in products:
+        if product.price_currency is not None:
+            product.price_currency = to_currency
+
+
 class ProductViewSet(ViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
@@ -20,7 +46,7 @@ class ProductViewSet(ViewSet):
         """
         Override to allow public access for list and retrieve actions.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'facets']:
             return [AllowAny()]
         return [IsAuthenticated()]
 
@@ -45,9 +71,10 @@ class ProductViewSet(ViewSet):
         response_serializer = ProductResponseSerializer(serializer.instance)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
-    def list(self, request: Request, **kwargs) -> Response:
-        identifier = kwargs.get('identifier')
-        seller = get_seller(identifier)
+    def _filter_products(self, request: Request, seller, price_filters: dict):
+        """
+        Apply the listing filters shared by list and facets.
+        """
         products = self.queryset.filter(seller=seller)
 
         # Apply filters
@@ -64,17 +91,69 @@ class ProductViewSet(ViewSet):
             is_published_bool = is_published.lower() in ('true', '1', 'yes')
             products = products.filter(is_published=is_published_bool)
 
+        in_stock = request.query_params.get('in_stock')
+        if in_stock is not None:
+            if in_stock.lower() in ('true', '1', 'yes'):
+                products = products.filter(stock__gt=0)
+            else:
+                products = products.filter(stock__lte=0)
+
+        # Attribute filters, e.g. ?attr_color=red or ?attr_waterproof=true
+        products = filter_by_attributes(products, get_attribute_params(request.query_params))
+
+        # Price data comes from the maintained summaries, never from Price rows
+        currency = price_filters.get('currency')
+        if currency:
+            products = products.annotate(
+                price_summary=FilteredRelation(
+                    'price_summaries', condition=Q(price_summaries__currency=currency)
+                ),
+            ).annotate(
+                price_currency=F('price_summary__currency'),
+                current_price=F('price_summary__current_amount'),
+                min_price=F('price_summary__min_amount'),
+                max_price=F('price_summary__max_amount'),
+                default_price=F('price_summary__default_amount'),
+            )
+
+            min_price = price_filters.get('min_price')
+            if min_price is not None:
+                products = products.filter(min_price__gte=min_price)
+
+            max_price = price_filters.get('max_price')
+            if max_price is not None:
+                products = products.filter(min_price__lte=max_price)
+
+        return products
+
+    def list(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        price_filters = ProductPriceFilterSerializer(data=request.query_params)
+        if not price_filters.is_valid():
+            formatted_errors = format_validation_errors(price_filters.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        currency = price_filters.validated_data.get('currency')
+        products = self._filter_products(request, seller, price_filters.validated_data)
+
         # Apply sorting
         sort_field = request.query_params.get('sort', 'created_at')
         order = request.query_params.get('order', 'desc')
 
         # Validate sort field
-        valid_sort_fields = ['name', 'sku', 'created_at', 'updated_at']
+        valid_sort_fields = ['name', 'sku', 'created_at', 'updated_at', 'price']
         if sort_field not in valid_sort_fields:
             sort_field = 'created_at'
 
         # Apply ordering
-        if order == 'asc':
+        if sort_field == 'price':
+            # Sort on the "from" price, products without a price in the currency go last
+            price = F('min_price')
+            price = price.asc(nulls_last=True) if order == 'asc' else price.desc(nulls_last=True)
+            products = products.order_by(price, 'id')
+        elif order == 'asc':
             products = products.order_by(sort_field)
         else:
             products = products.order_by(f'-{sort_field}')
@@ -88,9 +167,41 @@ class ProductViewSet(ViewSet):
         except (ValueError, TypeError):
             pass
 
-        serializer = ProductResponseSerializer(products, many=True)
+        display_currency = price_filters.validated_data.get('display_currency')
+        if display_currency and display_currency != currency:
+            products = list(products)
+            try:
+                convert_price_ranges(products, currency, display_currency)
+            except FxRateNotFound as e:
+                return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer_class = ProductPriceRangeResponseSerializer if currency else ProductResponseSerializer
+        serializer = serializer_class(products, many=True)
         return Response(serializer.data)
 
+    def facets(self, request: Request, **kwargs) -> Response:
+        """
+        Get facet counts for the filtered listing, cached per seller catalog version.
+        """
+        identifier = kwargs.get('identifier')
+        seller = get_seller(identifier)
+
+        price_filters = ProductPriceFilterSerializer(data=request.query_params)
+        if not price_filters.is_valid():
+            formatted_errors = format_validation_errors(price_filters.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with_price = bool(price_filters.validated_data.get('currency'))
+        facets = get_cached_facets(
+            seller.id,
+            request.query_params.dict(),
+            lambda: compute_facets(
+                self._filter_products(request, seller, price_filters.validated_data),
+                with_price=with_price,
+            ),
+        )
+        return Response(facets)
+
     def retrieve(self, request: Request, **kwargs) -> Response:
         identifier = kwargs.get('identifier')
         product_id = kwargs.get('product_id')
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
@@ -6,6 +7,7 @@ from rest_framework.viewsets import ViewSet
 
 from apps.identity.domain.utils import format_validation_errors
 from ..models import Seller
+from ..tasks import process_seller_logo_task
 from ..serializers import SellerSerializer, SellerResponseSerializer
 from ..utils import get_seller, check_seller_owner
 
@@ -38,7 +40,10 @@ class SellerViewSet(ViewSet):
             return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
 
         # Set user from request
-        serializer.save(user=request.user)
+        with transaction.atomic():
+            seller = serializer.save(user=request.user)
+            if seller.logo:
+                transaction.on_commit(lambda: process_seller_logo_task.delay(seller.id))
         response_serializer = SellerResponseSerializer(serializer.instance)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -65,7 +70,16 @@ class SellerViewSet(ViewSet):
             formatted_errors = format_validation_errors(serializer.errors)
             return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer.save()
+        previous_logo = seller.logo
+        with transaction.atomic():
+            serializer.save()
+            if seller.logo != previous_logo:
+                # Drop the stale variants until the new logo has been processed
+                seller.logo_metadata = None
+                seller.save(update_fields=['logo_metadata'])
+                if seller.logo:
+                    transaction.on_commit(lambda: process_seller_logo_task.delay(seller.id))
+
         response_serializer = SellerResponseSerializer(serializer.instance)
         return Response(response_serializer.data)
 
@@ -0,0 +1,178 @@
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from apps.common.events import publish_changes
+from apps.identity.domain.utils import format_validation_errors
+from ..models import Price, Product, ProductVariant, Seller
+from ..serializers import (
+    BulkProductVariantCreateSerializer,
+    BulkProductVariantUpdateSerializer,
+    ProductVariantResponseSerializer,
+)
+from ..utils import get_seller, check_seller_owner
+
+VARIANT_UPDATE_FIELDS = ('sku', 'options', 'stock', 'price_id', 'is_active')
+
+
+class VariantViewSet(ViewSet):
+    queryset = ProductVariant.objects.all()
+    permission_classes = [IsAuthenticated]
+
+    def get_permissions(self):
+        """
+        Override to allow public access to the variant matrix.
+        """
+        if self.action == 'list':
+            return [AllowAny()]
+        return [IsAuthenticated()]
+
+    def _get_product(self, seller: Seller, product_id: str) -> Product:
+        """
+        Get product by ID, ensuring it belongs to the seller.
+        """
+        try:
+            product_id_int = int(product_id)
+            return get_object_or_404(Product.objects.filter(seller=seller), id=product_id_int)
+        except (ValueError, TypeError):
+            raise Http404('Invalid product ID.')
+
+    def _check_prices(self, product: Product, price_ids: Iterable[Optional[int]]) -> Optional[Response]:
+        """
+        Check every referenced price belongs to the product, in one query.
+        """
+        price_ids = {price_id for price_id in price_ids if price_id is not None}
+        if not price_ids:
+            return None
+
+        found = set(Price.objects.filter(product=product, id__in=price_ids).values_list('id', flat=True))
+        missing = sorted(price_ids - found)
+        if missing:
+            messages = [f"Price {price_id} does not belong to this product." for price_id in missing]
+            return Response({'errors': {'price_id': messages}}, status=status.HTTP_400_BAD_REQUEST)
+        return None
+
+    def _variants_response(self, product: Product, status_code: int = status.HTTP_200_OK) -> Response:
+        variants = list(self.queryset.filter(product=product).select_related('price').order_by('id'))
+
+        # Option values in the order they first appear, for rendering the matrix axes
+        options = {}
+        for variant in variants:
+            for key, value in variant.options.items():
+                values = options.setdefault(key, [])
+                if value not in values:
+                    values.append(value)
+
+        serializer = ProductVariantResponseSerializer(variants, many=True)
+        return Response(
+            {'product_id': product.id, 'options': options, 'variants': serializer.data},
+            status=status_code
+        )
+
+    def list(self, request: Request, **kwargs) -> Response:
+        """
+        Get the variant matrix of a product with prices in a single query.
+        """
+        identifier = kwargs.get('identifier')
+        product_id = kwargs.get('product_id')
+        seller = get_seller(identifier)
+        product = self._get_product(seller, product_id)
+        return self._variants_response(product)
+
+    def bulk_create(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        product_id = kwargs.get('product_id')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        product = self._get_product(seller, product_id)
+        serializer = BulkProductVariantCreateSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        variants = serializer.validated_data['variants']
+        error_response = self._check_prices(product, (variant.get('price_id') for variant in variants))
+        if error_response is not None:
+            return error_response
+
+        try:
+            with transaction.atomic():
+                ProductVariant.objects.bulk_create([
+                    ProductVariant(product=product, **variant) for variant in variants
+                ])
+                publish_changes(Product, [product.id], seller_id=seller.id)
+        except IntegrityError:
+            return Response(
+                {'errors': {'sku': ['Variant SKUs must be unique per product.']}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return self._variants_response(product, status.HTTP_201_CREATED)
+
+    def bulk_update(self, request: Request, **kwargs) -> Response:
+        identifier = kwargs.get('identifier')
+        product_id = kwargs.get('product_id')
+        seller = get_seller(identifier)
+
+        # Check ownership
+        if not check_seller_owner(seller, request.user):
+            return Response(
+                {'detail': 'You do not have permission to perform this action.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        product = self._get_product(seller, product_id)
+        serializer = BulkProductVariantUpdateSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            formatted_errors = format_validation_errors(serializer.errors)
+            return Response({'errors': formatted_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = {change['id']: change for change in serializer.validated_data['variants']}
+        error_response = self._check_prices(product, (change.get('price_id') for change in changes.values()))
+        if error_response is not None:
+            return error_response
+
+        try:
+            with transaction.atomic():
+                variants = list(self.queryset.select_for_update().filter(product=product, id__in=changes))
+                missing = sorted(set(changes) - {variant.id for variant in variants})
+                if missing:
+                    return Response(
+                        {'errors': {'id': [f"Variant {variant_id} does not exist." for variant_id in missing]}},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+                fields = {'updated_at'}
+                for variant in variants:
+                    for field in VARIANT_UPDATE_FIELDS:
+                        if field in changes[variant.id]:
+                            setattr(variant, field, changes[variant.id][field])
+                            fields.add('price' if field == 'price_id' else field)
+                    variant.updated_at = timezone.now()
+
+                ProductVariant.objects.bulk_update(variants, sorted(fields))
+                publish_changes(Product, [product.id], seller_id=seller.id)
+        except IntegrityError:
+            return Response(
+                {'errors': {'sku': ['Variant SKUs must be unique per product.']}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return self._variants_response(product)
@@ -0,0 +1,21 @@
+"""
+Gunicorn settings: gunicorn -c config/gunicorn.py config.wsgi
+
+Keeps PROMETHEUS_MULTIPROC_DIR consistent across worker restarts, see
+apps/common/metrics.py.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+
+
+def on_starting(server) -> None:
+    # Samples left by a previous run would be added to this one's
+    from apps.common.metrics import clear_multiprocess_dir
+    clear_multiprocess_dir()
+
+
+def child_exit(server, worker) -> None:
+    from apps.common.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -46,11 +46,15 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
+    'apps.common',
     'apps.identity',
     'apps.sellers',
+    'apps.orders',
 ]
 
 MIDDLEWARE = [
+    'apps.common.middleware.PerformanceMiddleware',
+    'apps.common.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,6 +62,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.common.middleware.IdempotencyMiddleware',
+    'apps.common.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -135,6 +141,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files and generated image variants
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', str(BASE_DIR.parent / 'media'))
+MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
+
 # Cache configuration
 # https://docs.djangoproject.com/en/6.0/topics/cache/
 
@@ -144,6 +154,7 @@ CACHES = {
         'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'apps.common.performance.InstrumentedRedis',
         }
     }
 }
@@ -158,6 +169,10 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.common.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # Simple JWT configuration
@@ -206,4 +221,229 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
-CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes
\ No newline at end of file
+CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes
+
+# Queues, so a backlog of bulk or maintenance work never delays the tasks users
+# are waiting on. Each queue gets its own workers (manage.py run_worker <queue>).
+CELERY_QUEUE_AUTH_CRITICAL = 'auth-critical'
+CELERY_QUEUE_BULK = 'bulk'
+CELERY_QUEUE_MAINTENANCE = 'maintenance'
+CELERY_TASK_QUEUES = {
+    CELERY_QUEUE_AUTH_CRITICAL: {},
+    CELERY_QUEUE_BULK: {},
+    CELERY_QUEUE_MAINTENANCE: {},
+}
+CELERY_TASK_DEFAULT_QUEUE = CELERY_QUEUE_BULK
+CELERY_TASK_CREATE_MISSING_QUEUES = False
+
+# Priorities within a queue, 0 is the highest. The Redis transport keeps one
+# list per step and pops the highest step with messages first.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': [0, 3, 6, 9],
+    'queue_order_strategy': 'priority',
+}
+CELERY_TASK_DEFAULT_PRIORITY = 6
+CELERY_TASK_ROUTES = {
+    'apps.identity.tasks.send_magic_link_email_task': {'queue': CELERY_QUEUE_AUTH_CRITICAL, 'priority': 0},
+    'apps.sellers.tasks.process_product_image_task': {'queue': CELERY_QUEUE_BULK, 'priority': 3},
+    'apps.sellers.tasks.process_seller_logo_task': {'queue': CELERY_QUEUE_BULK, 'priority': 3},
+    'apps.orders.tasks.update_sales_rollups_task': {'queue': CELERY_QUEUE_BULK, 'priority': 6},
+    'apps.sellers.tasks.apply_price_changes_task': {'queue': CELERY_QUEUE_MAINTENANCE, 'priority': 3},
+    'apps.sellers.tasks.reconcile_price_schedule_task': {'queue': CELERY_QUEUE_MAINTENANCE, 'priority': 6},
+    'apps.identity.tasks.sweep_subscriptions_task': {'queue': CELERY_QUEUE_MAINTENANCE, 'priority': 6},
+    'apps.common.tasks.record_slow_query_task': {'queue': CELERY_QUEUE_MAINTENANCE, 'priority': 9},
+    'apps.common.tasks.purge_slow_queries_task': {'queue': CELERY_QUEUE_MAINTENANCE, 'priority': 9},
+    # The relay delivers auth-critical messages, so it must not queue behind maintenance work
+    'apps.common.tasks.relay_outbox_task': {'queue': CELERY_QUEUE_AUTH_CRITICAL, 'priority': 3},
+    'apps.common.tasks.purge_outbox_task': {'queue': CELERY_QUEUE_MAINTENANCE, 'priority': 9},
+}
+
+# Worker settings per queue, used by manage.py run_worker. Auth-critical work
+# is short and latency sensitive: no prefetching beyond the task in hand and
+# headroom to scale up. Bulk workers prefetch a batch per process.
+CELERY_WORKER_PROFILES = {
+    CELERY_QUEUE_AUTH_CRITICAL: {
+        'autoscale': os.getenv('CELERY_AUTH_CRITICAL_AUTOSCALE', '8,2'),
+        'prefetch_multiplier': int(os.getenv('CELERY_AUTH_CRITICAL_PREFETCH', '1')),
+    },
+    CELERY_QUEUE_BULK: {
+        'autoscale': os.getenv('CELERY_BULK_AUTOSCALE', '4,1'),
+        'prefetch_multiplier': int(os.getenv('CELERY_BULK_PREFETCH', '4')),
+    },
+    CELERY_QUEUE_MAINTENANCE: {
+        'autoscale': os.getenv('CELERY_MAINTENANCE_AUTOSCALE', '2,1'),
+        'prefetch_multiplier': int(os.getenv('CELERY_MAINTENANCE_PREFETCH', '1')),
+    },
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Plan registry: seconds between checks of the shared plan version
+PLAN_REGISTRY_CHECK_SECONDS = int(os.getenv('PLAN_REGISTRY_CHECK_SECONDS', '5'))
+
+# Idempotency-Key handling for write requests
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_TTL_SECONDS', str(24 * 60 * 60)))
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', '30'))
+IDEMPOTENCY_LOCK_WAIT_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_WAIT_SECONDS', '5'))
+
+# Order history pagination
+ORDER_HISTORY_PAGE_SIZE = int(os.getenv('ORDER_HISTORY_PAGE_SIZE', '50'))
+ORDER_HISTORY_MAX_PAGE_SIZE = int(os.getenv('ORDER_HISTORY_MAX_PAGE_SIZE', '100'))
+
+# Subscription lifecycle
+SUBSCRIPTION_SWEEP_INTERVAL_MINUTES = int(os.getenv('SUBSCRIPTION_SWEEP_INTERVAL_MINUTES', '60'))
+SUBSCRIPTION_SWEEP_BATCH_SIZE = int(os.getenv('SUBSCRIPTION_SWEEP_BATCH_SIZE', '500'))
+SUBSCRIPTION_EXPIRY_NOTICE_DAYS = int(os.getenv('SUBSCRIPTION_EXPIRY_NOTICE_DAYS', '7'))
+
+# Seconds between checks of the shared FX rate version
+FX_RATES_CHECK_SECONDS = int(os.getenv('FX_RATES_CHECK_SECONDS', '60'))
+
+# Product facets: price band boundaries in minor units and cache lifetime
+PRODUCT_PRICE_BAND_BOUNDARIES = [1000, 2500, 5000, 10000]
+PRODUCT_FACET_CACHE_SECONDS = int(os.getenv('PRODUCT_FACET_CACHE_SECONDS', '300'))
+COLLECTION_CACHE_SECONDS = int(os.getenv('COLLECTION_CACHE_SECONDS', '300'))
+
+# Scheduled price changes
+PRICE_SCHEDULE_INTERVAL_SECONDS = int(os.getenv('PRICE_SCHEDULE_INTERVAL_SECONDS', '30'))
+PRICE_SCHEDULE_BATCH_SIZE = int(os.getenv('PRICE_SCHEDULE_BATCH_SIZE', '500'))
+PRICE_SCHEDULE_RECONCILE_MINUTES = int(os.getenv('PRICE_SCHEDULE_RECONCILE_MINUTES', '15'))
+
+# Transactional outbox: messages are published right after their transaction
+# commits, the relay picks up what that missed once OUTBOX_RELAY_GRACE_SECONDS old
+OUTBOX_DISPATCH_ON_COMMIT = os.getenv('OUTBOX_DISPATCH_ON_COMMIT', 'True') == 'True'
+OUTBOX_RELAY_INTERVAL_SECONDS = int(os.getenv('OUTBOX_RELAY_INTERVAL_SECONDS', '5'))
+OUTBOX_RELAY_GRACE_SECONDS = int(os.getenv('OUTBOX_RELAY_GRACE_SECONDS', '10'))
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv('OUTBOX_RELAY_BATCH_SIZE', '500'))
+OUTBOX_RETRY_BACKOFF_SECONDS = int(os.getenv('OUTBOX_RETRY_BACKOFF_SECONDS', '5'))
+# The on-commit publish runs in the request: it gets no retries and gives up
+# connecting after OUTBOX_PUBLISH_TIMEOUT_SECONDS. After OUTBOX_MAX_ATTEMPTS
+# failed publishes a message is marked failed and no longer relayed.
+OUTBOX_PUBLISH_TIMEOUT_SECONDS = float(os.getenv('OUTBOX_PUBLISH_TIMEOUT_SECONDS', '1'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '10'))
+OUTBOX_RETENTION_DAYS = int(os.getenv('OUTBOX_RETENTION_DAYS', '7'))
+
+CELERY_BEAT_SCHEDULE = {
+    'sweep-subscriptions': {
+        'task': 'apps.identity.tasks.sweep_subscriptions_task',
+        'schedule': timedelta(minutes=SUBSCRIPTION_SWEEP_INTERVAL_MINUTES),
+    },
+    'apply-price-changes': {
+        'task': 'apps.sellers.tasks.apply_price_changes_task',
+        'schedule': timedelta(seconds=PRICE_SCHEDULE_INTERVAL_SECONDS),
+    },
+    'reconcile-price-schedule': {
+        'task': 'apps.sellers.tasks.reconcile_price_schedule_task',
+        'schedule': timedelta(minutes=PRICE_SCHEDULE_RECONCILE_MINUTES),
+    },
+    'relay-outbox': {
+        'task': 'apps.common.tasks.relay_outbox_task',
+        'schedule': timedelta(seconds=OUTBOX_RELAY_INTERVAL_SECONDS),
+    },
+    'purge-outbox': {
+        'task': 'apps.common.tasks.purge_outbox_task',
+        'schedule': timedelta(hours=1),
+    },
+    'purge-slow-queries': {
+        'task': 'apps.common.tasks.purge_slow_queries_task',
+        'schedule': timedelta(hours=1),
+    },
+}
+
+# Image pipeline: variant widths in px, formats in fallback-last order
+IMAGE_VARIANT_WIDTHS = [320, 640, 1024, 1600]
+IMAGE_VARIANT_FORMATS = ['webp', 'jpeg']
+IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', '80'))
+IMAGE_MAX_BYTES = int(os.getenv('IMAGE_MAX_BYTES', str(10 * 1024 * 1024)))
+IMAGE_FETCH_TIMEOUT_SECONDS = int(os.getenv('IMAGE_FETCH_TIMEOUT_SECONDS', '10'))
+IMAGE_FETCH_MAX_REDIRECTS = int(os.getenv('IMAGE_FETCH_MAX_REDIRECTS', '3'))
+# Threads rendering the variants of one image; 0 renders them one by one
+IMAGE_RENDER_THREADS = int(os.getenv('IMAGE_RENDER_THREADS', '2'))
+
+# Server-side carts: idle lifetime and size limits
+CART_TTL_SECONDS = int(os.getenv('CART_TTL_SECONDS', str(7 * 24 * 60 * 60)))
+CART_MAX_LINES = int(os.getenv('CART_MAX_LINES', '100'))
+CART_MAX_QUANTITY = int(os.getenv('CART_MAX_QUANTITY', '99'))
+
+# Maximum queries per request, by URL name and optionally by method. Enforced
+# in tests through assert_query_budget, logged at runtime with QUERY_BUDGET_DEBUG.
+QUERY_BUDGET_DEBUG = os.getenv('QUERY_BUDGET_DEBUG', 'False') == 'True'
+QUERY_BUDGETS = {
+    # Identity
+    'auth-register': 6,
+    'auth-login': 3,
+    'auth-verify': 2,
+    'user-list': {'GET': 1, 'POST': 3},
+    'user-detail': {'GET': 1, 'PATCH': 2, 'DELETE': 6},
+    'user-archive': 2,
+    'user-change-plan': 3,
+    'plan-list': {'GET': 0, 'POST': 2},
+    'plan-detail': {'GET': 0, 'PUT': 3, 'PATCH': 2, 'DELETE': 3},
+    'api-root': 0,
+    # Sellers
+    'seller-list': 5,
+    'seller-detail': {'GET': 1, 'PUT': 5, 'DELETE': 7},
+    'product-list': {'GET': 2, 'POST': 2},
+    'product-facets': 3,
+    'product-detail': {'GET': 2, 'PUT': 3, 'DELETE': 10},
+    'price-list': {'GET': 3, 'POST': 12},
+    'price-effective': 3,
+    'price-detail': {'GET': 3, 'DELETE': 16},
+    'price-bulk-effective': 2,
+    'variant-list': {'GET': 3, 'POST': 6, 'PATCH': 7},
+    'product-image-list': {'GET': 3, 'POST': 6},
+    'product-image-detail': 9,
+    'collection-list': {'GET': 2, 'POST': 4},
+    'collection-detail': {'GET': 4, 'PUT': 5, 'DELETE': 4},
+    'collection-products': {'POST': 9, 'PUT': 6, 'DELETE': 5},
+    # Orders
+    'order-list': 2,
+    'seller-order-list': 3,
+    'seller-sales': 2,
+    'seller-order-bulk-transition': 6,
+    'seller-order-transition': 6,
+    'cart-detail': 0,
+    'cart-items': 2,
+    'cart-item-detail': 0,
+    'cart-validate': 2,
+}
+
+# Per-request timings are always logged; SERVER_TIMING also returns them in a
+# Server-Timing header, which exposes internals and defaults to DEBUG only.
+SERVER_TIMING = os.getenv('SERVER_TIMING', str(DEBUG)) == 'True'
+
+# Prometheus scraping. Set PROMETHEUS_MULTIPROC_DIR in the environment when
+# running several worker processes. METRICS_TOKEN protects /metrics, which is
+# refused outside DEBUG until it is set. Celery workers serve their own metrics
+# on METRICS_WORKER_PORT (0 turns it off).
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_WORKER_PORT = int(os.getenv('METRICS_WORKER_PORT', '0'))
+METRICS_CELERY_QUEUES = list(CELERY_TASK_QUEUES)
+
+# Slow query sampler: queries at least SLOW_QUERY_THRESHOLD_MS long (0 turns it
+# off) are sampled at SLOW_QUERY_SAMPLE_RATE, at most once per fingerprint every
+# SLOW_QUERY_THROTTLE_SECONDS, and stored with their plan by a Celery task for
+# SLOW_QUERY_RETENTION_DAYS. Parameter values are only stored with
+# SLOW_QUERY_STORE_PARAMS, they can hold personal data and secrets.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', '1.0'))
+SLOW_QUERY_THROTTLE_SECONDS = int(os.getenv('SLOW_QUERY_THROTTLE_SECONDS', '300'))
+SLOW_QUERY_RETENTION_DAYS = int(os.getenv('SLOW_QUERY_RETENTION_DAYS', '7'))
+SLOW_QUERY_STORE_PARAMS = os.getenv('SLOW_QUERY_STORE_PARAMS', 'False') == 'True'
+
+# On-demand profiling: staff get X-Profile tokens from /api/profiles/token, and
+# PROFILE_SIGNAL profiles a whole worker for up to PROFILE_WINDOW_SECONDS.
+# Profiles are kept in the cache for PROFILE_TTL_SECONDS.
+PROFILE_TOKEN_MAX_AGE_SECONDS = int(os.getenv('PROFILE_TOKEN_MAX_AGE_SECONDS', str(15 * 60)))
+PROFILE_TTL_SECONDS = int(os.getenv('PROFILE_TTL_SECONDS', str(60 * 60)))
+PROFILE_WINDOW_SECONDS = int(os.getenv('PROFILE_WINDOW_SECONDS', '60'))
+PROFILE_SIGNAL = os.getenv('PROFILE_SIGNAL', 'SIGUSR2')
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv('PROFILE_TRACEMALLOC_FRAMES', '25'))
+
+# Domain events are delivered to in-process subscribers on commit. Setting
+# EVENT_STREAM also appends them to that Redis stream, trimmed to about
+# EVENT_STREAM_MAXLEN entries, for the consume_events command. Entries a
+# consumer failed on EVENT_STREAM_MAX_DELIVERIES times are moved to
+# EVENT_STREAM_DEAD_LETTER (the stream name plus ':dead' by default).
+EVENT_STREAM = os.getenv('EVENT_STREAM', '')
+EVENT_STREAM_MAXLEN = int(os.getenv('EVENT_STREAM_MAXLEN', '100000'))
+EVENT_STREAM_MAX_DELIVERIES = int(os.getenv('EVENT_STREAM_MAX_DELIVERIES', '5'))
+EVENT_STREAM_DEAD_LETTER = os.getenv('EVENT_STREAM_DEAD_LETTER', '')
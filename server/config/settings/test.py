@@ -1,3 +1,5 @@
+import tempfile
+
 from .base import *
 
 DEBUG = False
@@ -10,4 +12,16 @@ DATABASES = {
     }
 }
 
-EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
\ No newline at end of file
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+CELERY_TASK_ALWAYS_EAGER = True
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+SLOW_QUERY_THRESHOLD_MS = 0
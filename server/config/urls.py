@@ -14,8 +14,11 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
+from apps.common.views import metrics_view
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -24,9 +27,15 @@ from rest_framework_simplejwt.views import (
 
 urlpatterns = [
     path('admin', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/token', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify', TokenVerifyView.as_view(), name='token_verify'),
     path('api/identity/', include('apps.identity.urls')),
     path('api/sellers/', include('apps.sellers.urls')),
+    path('api/orders/', include('apps.orders.urls')),
+    path('api/profiles/', include('apps.common.urls')),
 ]
+
+# Serve uploaded images locally; production fronts MEDIA_URL with the storage's own host
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
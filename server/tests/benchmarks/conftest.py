@@ -0,0 +1,342 @@
+"""
+Seeding and measurement helpers for the endpoint benchmarks.
+
+The dataset is seeded once per session with bulk_create, then every benchmark
+runs inside its own rolled back transaction, so write endpoints never leak
+into the next measurement.
+"""
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.common.model_utils import Currency
+from apps.identity.models import Plan, User
+from apps.orders.models import Order, OrderItem
+from apps.sellers.models import (
+    Collection,
+    CollectionProduct,
+    Price,
+    Product,
+    ProductPriceSummary,
+    ProductVariant,
+    Seller,
+)
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+
+# Full-scale dataset, --benchmark-scale multiplies the seller and order counts
+SELLERS = 2000
+PRODUCTS_PER_SELLER = 50
+ORDERS = 20000
+BATCH_SIZE = 2000
+
+COLORS = ['red', 'blue', 'green', 'black']
+SIZES = ['s', 'm', 'l']
+
+
+def seed_benchmark_data(scale: float) -> dict:
+    """
+    Seeds sellers with products, three prices each, price summaries, variants,
+    a collection and orders. Returns the objects the benchmarks address.
+    """
+    now = timezone.now()
+    seller_count = max(1, int(SELLERS * scale))
+
+    plans = Plan.objects.bulk_create([
+        Plan(code=code, name=code.title(), unit_amount=amount, interval=interval)
+        for code, amount, interval in [('basic', 900, 'month'), ('pro', 2900, 'month'), ('pro-year', 29000, 'year')]
+    ])
+
+    users = User.objects.bulk_create([
+        User(email=f"seller{i}@bench.test", first_name="Seller", last_name=str(i), password='!')
+        for i in range(seller_count)
+    ] + [
+        User(email=f"buyer{i}@bench.test", first_name="Buyer", last_name=str(i), password='!')
+        for i in range(seller_count)
+    ], batch_size=BATCH_SIZE)
+    seller_users, buyers = users[:seller_count], users[seller_count:]
+
+    sellers = Seller.objects.bulk_create([
+        Seller(user=user, name=f"Seller {i}", slug=f"seller-{i}", support_email=f"support{i}@bench.test")
+        for i, user in enumerate(seller_users)
+    ], batch_size=BATCH_SIZE)
+
+    products = Product.objects.bulk_create([
+        Product(
+            seller=seller,
+            name=f"Product {seller.id}-{j}",
+            description="Benchmark product",
+            sku=f"SKU-{seller.id}-{j}",
+            stock=(j * 7) % 20,
+            attributes={'color': COLORS[j % len(COLORS)], 'size': SIZES[j % len(SIZES)]},
+            is_published=True,
+        )
+        for seller in sellers
+        for j in range(PRODUCTS_PER_SELLER)
+    ], batch_size=BATCH_SIZE)
+
+    # A base price and a running sale in USD plus a CAD price per product
+    prices = []
+    for j, product in enumerate(products):
+        base = 1000 + (j * 37) % 9000
+        prices += [
+            Price(product=product, amount=base, currency=Currency.USD, is_default=True),
+            Price(
+                product=product,
+                amount=base * 8 // 10,
+                currency=Currency.USD,
+                valid_from=now - timedelta(days=1),
+                valid_to=now + timedelta(days=30),
+            ),
+            Price(product=product, amount=base * 137 // 100, currency=Currency.CAD, is_default=True),
+        ]
+    prices = Price.objects.bulk_create(prices, batch_size=BATCH_SIZE)
+
+    # bulk_create skips the signals that maintain the summaries, write them directly
+    summaries = []
+    for base, sale, cad in zip(prices[0::3], prices[1::3], prices[2::3]):
+        summaries += [
+            ProductPriceSummary(
+                product_id=base.product_id,
+                currency=Currency.USD,
+                current_price=sale,
+                current_amount=sale.amount,
+                min_amount=sale.amount,
+                max_amount=base.amount,
+                default_amount=base.amount,
+            ),
+            ProductPriceSummary(
+                product_id=cad.product_id,
+                currency=Currency.CAD,
+                current_price=cad,
+                current_amount=cad.amount,
+                min_amount=cad.amount,
+                max_amount=cad.amount,
+                default_amount=cad.amount,
+            ),
+        ]
+    ProductPriceSummary.objects.bulk_create(summaries, batch_size=BATCH_SIZE)
+
+    seller = sellers[0]
+    seller_products = products[:PRODUCTS_PER_SELLER]
+    product = seller_products[0]
+
+    variants = ProductVariant.objects.bulk_create([
+        ProductVariant(
+            product=product,
+            sku=f"{product.sku}-{color}-{size}",
+            options={'color': color, 'size': size},
+            stock=5,
+        )
+        for color in COLORS
+        for size in SIZES
+    ])
+
+    collection = Collection.objects.create(
+        seller=seller, name="Featured", slug="featured", is_featured=True, is_published=True
+    )
+    CollectionProduct.objects.bulk_create([
+        CollectionProduct(collection=collection, product=member, position=position)
+        for position, member in enumerate(seller_products)
+    ])
+
+    order_count = max(1, int(ORDERS * scale))
+    orders = Order.objects.bulk_create([
+        Order(
+            seller=sellers[i % seller_count],
+            user=buyers[(i * 7) % seller_count],
+            status=Order.Status.DELIVERED if i % 3 else Order.Status.PENDING,
+            total_amount=0,
+        )
+        for i in range(order_count)
+    ], batch_size=BATCH_SIZE)
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product=products[(i % seller_count) * PRODUCTS_PER_SELLER + k],
+            price=prices[((i % seller_count) * PRODUCTS_PER_SELLER + k) * 3],
+            quantity=1 + k,
+            unit_amount=10,
+            currency=Currency.USD,
+        )
+        for i, order in enumerate(orders)
+        for k in range(2)
+    ], batch_size=BATCH_SIZE)
+
+    return {
+        'plan': plans[1],
+        'owner': seller_users[0],
+        'buyer': buyers[0],
+        'seller': seller,
+        'products': seller_products,
+        'product': product,
+        'price': prices[0],
+        'variants': variants,
+        'collection': collection,
+    }
+
+
+@pytest.fixture(scope='session')
+def benchmark_data(request, django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        return seed_benchmark_data(request.config.getoption('--benchmark-scale'))
+
+
+def percentile(timings: list[float], percent: int) -> float:
+    if len(timings) == 1:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method='inclusive')[percent - 1]
+
+
+def run_benchmark(case, data: dict, iterations: int, warmup: int = 2) -> dict:
+    """
+    Times iterations of a benchmark case after a warmup.
+
+    case.build(data, i) prepares request i outside the timed section. Memory is
+    measured on one extra request with tracemalloc, which would skew timings.
+    """
+    cache.clear()
+    client = APIClient()
+
+    def send(i: int):
+        spec = case.build(data, i)
+        client.force_authenticate(user=spec.get('user'))
+        call = getattr(client, spec.get('method', 'get'))
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = call(spec['path'], spec.get('data'), format=spec.get('format', 'json'), **spec.get('headers', {}))
+            elapsed = time.perf_counter() - started
+
+        expected = spec.get('status', 200)
+        assert response.status_code == expected, (
+            f"{case.name}: expected {expected}, got {response.status_code}: {getattr(response, 'data', '')}"
+        )
+        return elapsed * 1000, len(queries.captured_queries)
+
+    timings = []
+    query_counts = []
+    for i in range(warmup + iterations):
+        elapsed_ms, query_count = send(i)
+        if i >= warmup:
+            timings.append(elapsed_ms)
+            query_counts.append(query_count)
+
+    tracemalloc.start()
+    try:
+        send(warmup + iterations)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'queries': max(query_counts),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+@pytest.fixture
+def run_benchmark_case(request):
+    iterations = request.config.getoption('--benchmark-iterations')
+
+    def run(case, data: dict) -> dict:
+        return run_benchmark(case, data, iterations)
+    return run
+
+
+def load_baselines() -> dict:
+    if not BASELINES_PATH.exists():
+        return {'scale': None, 'endpoints': {}}
+    return json.loads(BASELINES_PATH.read_text())
+
+
+def compare_to_baseline(name: str, result: dict, baseline: dict, threshold: float, same_scale: bool) -> list[str]:
+    """
+    Lists the regressions of result against its baseline.
+
+    Query counts do not depend on the dataset and must never grow. Latency and
+    memory only compare at the scale the baseline was recorded at, within threshold.
+    """
+    if baseline is None:
+        return [f"{name}: no baseline, run with --benchmark-update to record one"]
+
+    regressions = []
+    if result['queries'] > baseline['queries']:
+        regressions.append(f"{name}: {result['queries']} queries, baseline {baseline['queries']}")
+
+    if same_scale:
+        for metric in ('p95_ms', 'peak_kib'):
+            limit = baseline[metric] * (1 + threshold)
+            if result[metric] > limit:
+                regressions.append(f"{name}: {metric} {result[metric]} over {limit:.1f} (baseline {baseline[metric]})")
+    return regressions
+
+
+class BenchmarkRecorder:
+    """
+    Collects results over the session, reports them and optionally stores them
+    as the new baselines.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.baselines = load_baselines()
+        self.results = {}
+
+    @property
+    def scale(self) -> float:
+        return self.config.getoption('--benchmark-scale')
+
+    def check(self, name: str, result: dict) -> list[str]:
+        self.results[name] = result
+        if self.config.getoption('--benchmark-update'):
+            return []
+        return compare_to_baseline(
+            name,
+            result,
+            self.baselines['endpoints'].get(name),
+            self.config.getoption('--benchmark-threshold'),
+            self.baselines.get('scale') == self.scale,
+        )
+
+    def save(self) -> None:
+        endpoints = {**self.baselines['endpoints'], **self.results}
+        payload = {'scale': self.scale, 'endpoints': dict(sorted(endpoints.items()))}
+        BASELINES_PATH.write_text(json.dumps(payload, indent=2) + '\n')
+
+
+@pytest.fixture(scope='session')
+def benchmark_recorder(request):
+    recorder = BenchmarkRecorder(request.config)
+    request.config._benchmark_recorder = recorder
+    yield recorder
+    if request.config.getoption('--benchmark-update') and recorder.results:
+        recorder.save()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    recorder = getattr(config, '_benchmark_recorder', None)
+    if recorder is None or not recorder.results:
+        return
+
+    terminalreporter.section(f"endpoint benchmarks (scale {recorder.scale})")
+    terminalreporter.write_line(
+        f"{'endpoint':<32}{'queries':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>10}"
+    )
+    for name, result in sorted(recorder.results.items()):
+        terminalreporter.write_line(
+            f"{name:<32}{result['queries']:>8}{result['p50_ms']:>10}"
+            f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['peak_kib']:>10}"
+        )
@@ -0,0 +1,370 @@
+from collections import namedtuple
+
+import pytest
+from django.urls import reverse
+
+from apps.common.redis import store_magic_link_jti
+from apps.identity.models import User
+from apps.sellers.models import Collection, Price, Product, ProductImage, Seller
+
+BenchmarkCase = namedtuple('BenchmarkCase', ['name', 'build'])
+
+
+def seller_kwargs(data: dict) -> dict:
+    return {'identifier': data['seller'].slug}
+
+
+def product_kwargs(data: dict) -> dict:
+    return {'identifier': data['seller'].slug, 'product_id': data['product'].id}
+
+
+def collection_kwargs(data: dict) -> dict:
+    return {'identifier': data['seller'].slug, 'collection_id': data['collection'].id}
+
+
+def new_user(i: int, prefix: str) -> User:
+    return User.objects.create_user(email=f"{prefix}{i}@bench.test", first_name="New", last_name=str(i))
+
+
+# Sellers
+
+def seller_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('seller-list'),
+        'data': {'name': f"New {i}", 'slug': f"new-seller-{i}", 'support_email': f"new{i}@bench.test"},
+        'user': new_user(i, 'new-seller'),
+        'status': 201,
+    }
+
+
+def seller_retrieve(data, i):
+    return {'path': reverse('seller-detail', kwargs=seller_kwargs(data))}
+
+
+def seller_update(data, i):
+    seller = data['seller']
+    return {
+        'method': 'put',
+        'path': reverse('seller-detail', kwargs=seller_kwargs(data)),
+        'data': {'name': f"Seller {i}", 'slug': seller.slug, 'support_email': seller.support_email},
+        'user': data['owner'],
+    }
+
+
+def seller_destroy(data, i):
+    user = new_user(i, 'doomed-seller')
+    seller = Seller.objects.create(user=user, name="Doomed", slug=f"doomed-{i}", support_email="d@bench.test")
+    return {'method': 'delete', 'path': reverse('seller-detail', kwargs={'identifier': seller.slug}),
+            'user': user, 'status': 204}
+
+
+# Products
+
+def product_list(data, i):
+    return {'path': reverse('product-list', kwargs=seller_kwargs(data)) + '?currency=usd&sort=price'}
+
+
+def product_facets(data, i):
+    return {'path': reverse('product-facets', kwargs=seller_kwargs(data)) + '?currency=usd&attr_color=red'}
+
+
+def product_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('product-list', kwargs=seller_kwargs(data)),
+        'data': {'name': f"New {i}", 'description': "New", 'sku': f"NEW-{i}", 'attributes': {'color': 'red'}},
+        'user': data['owner'],
+        'status': 201,
+    }
+
+
+def product_retrieve(data, i):
+    return {'path': reverse('product-detail', kwargs=product_kwargs(data))}
+
+
+def product_update(data, i):
+    return {
+        'method': 'put',
+        'path': reverse('product-detail', kwargs=product_kwargs(data)),
+        'data': {'name': f"Product {i}", 'description': "Updated", 'sku': data['product'].sku, 'stock': i},
+        'user': data['owner'],
+    }
+
+
+def product_destroy(data, i):
+    product = Product.objects.create(seller=data['seller'], name="Doomed", description="Doomed")
+    return {
+        'method': 'delete',
+        'path': reverse('product-detail', kwargs={'identifier': data['seller'].slug, 'product_id': product.id}),
+        'user': data['owner'],
+        'status': 204,
+    }
+
+
+# Prices
+
+def price_list(data, i):
+    return {'path': reverse('price-list', kwargs=product_kwargs(data))}
+
+
+def price_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('price-list', kwargs=product_kwargs(data)),
+        'data': {'amount': 1000 + i, 'currency': 'usd'},
+        'user': data['owner'],
+        'status': 201,
+    }
+
+
+def price_effective(data, i):
+    return {'path': reverse('price-effective', kwargs=product_kwargs(data)) + '?currency=usd'}
+
+
+def price_retrieve(data, i):
+    return {'path': reverse('price-detail', kwargs={**product_kwargs(data), 'price_id': data['price'].id})}
+
+
+def price_destroy(data, i):
+    price = Price.objects.create(product=data['product'], amount=100 + i, currency='cad')
+    return {
+        'method': 'delete',
+        'path': reverse('price-detail', kwargs={**product_kwargs(data), 'price_id': price.id}),
+        'user': data['owner'],
+        'status': 204,
+    }
+
+
+def price_bulk_effective(data, i):
+    product_ids = ','.join(str(product.id) for product in data['products'])
+    return {'path': reverse('price-bulk-effective', kwargs=seller_kwargs(data)) + f"?product_ids={product_ids}"}
+
+
+# Variants
+
+def variant_list(data, i):
+    return {'path': reverse('variant-list', kwargs=product_kwargs(data))}
+
+
+def variant_bulk_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('variant-list', kwargs=product_kwargs(data)),
+        'data': {'variants': [
+            {'sku': f"BULK-{i}-{k}", 'options': {'color': 'white', 'size': str(k)}, 'stock': k}
+            for k in range(20)
+        ]},
+        'user': data['owner'],
+        'status': 201,
+    }
+
+
+def variant_bulk_update(data, i):
+    return {
+        'method': 'patch',
+        'path': reverse('variant-list', kwargs=product_kwargs(data)),
+        'data': {'variants': [{'id': variant.id, 'stock': i} for variant in data['variants']]},
+        'user': data['owner'],
+    }
+
+
+# Images
+
+def image_list(data, i):
+    return {'path': reverse('product-image-list', kwargs=product_kwargs(data))}
+
+
+def image_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('product-image-list', kwargs=product_kwargs(data)),
+        'data': {'url': f"https://images.bench.test/{i}.jpg", 'alt_text': "Front"},
+        'user': data['owner'],
+        'status': 202,
+    }
+
+
+def image_destroy(data, i):
+    image = ProductImage.objects.create(product=data['product'], source_url="https://images.bench.test/x.jpg")
+    return {
+        'method': 'delete',
+        'path': reverse('product-image-detail', kwargs={**product_kwargs(data), 'image_id': image.id}),
+        'user': data['owner'],
+        'status': 204,
+    }
+
+
+# Collections
+
+def collection_list(data, i):
+    return {'path': reverse('collection-list', kwargs=seller_kwargs(data)) + '?is_featured=true'}
+
+
+def collection_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('collection-list', kwargs=seller_kwargs(data)),
+        'data': {'name': f"New {i}", 'slug': f"new-{i}"},
+        'user': data['owner'],
+        'status': 201,
+    }
+
+
+def collection_retrieve(data, i):
+    return {'path': reverse('collection-detail', kwargs=collection_kwargs(data))}
+
+
+def collection_update(data, i):
+    return {
+        'method': 'put',
+        'path': reverse('collection-detail', kwargs=collection_kwargs(data)),
+        'data': {'name': f"Featured {i}", 'slug': 'featured', 'is_published': True},
+        'user': data['owner'],
+    }
+
+
+def collection_destroy(data, i):
+    collection = Collection.objects.create(seller=data['seller'], name="Doomed", slug=f"doomed-{i}")
+    return {
+        'method': 'delete',
+        'path': reverse('collection-detail', kwargs={**seller_kwargs(data), 'collection_id': collection.id}),
+        'user': data['owner'],
+        'status': 204,
+    }
+
+
+def collection_add_products(data, i):
+    collection = Collection.objects.create(seller=data['seller'], name="Fresh", slug=f"fresh-{i}")
+    return {
+        'method': 'post',
+        'path': reverse('collection-products', kwargs={**seller_kwargs(data), 'collection_id': collection.id}),
+        'data': {'product_ids': [product.id for product in data['products']]},
+        'user': data['owner'],
+    }
+
+
+def collection_reorder(data, i):
+    product_ids = [product.id for product in data['products']]
+    return {
+        'method': 'put',
+        'path': reverse('collection-products', kwargs=collection_kwargs(data)),
+        'data': {'product_ids': product_ids if i % 2 else product_ids[::-1]},
+        'user': data['owner'],
+    }
+
+
+def collection_remove_products(data, i):
+    return {
+        'method': 'delete',
+        'path': reverse('collection-products', kwargs=collection_kwargs(data)),
+        'data': {'product_ids': [data['products'][-1].id]},
+        'user': data['owner'],
+    }
+
+
+# Identity
+
+def auth_register(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('auth-register'),
+        'data': {'email': f"register{i}@bench.test", 'first_name': "New", 'last_name': "User"},
+        'status': 201,
+    }
+
+
+def auth_login(data, i):
+    return {'method': 'post', 'path': reverse('auth-login'), 'data': {'email': data['buyer'].email}}
+
+
+def auth_verify(data, i):
+    jti = f"bench-jti-{i}"
+    store_magic_link_jti(jti, str(data['buyer'].id), 60)
+    return {'path': reverse('auth-verify') + f"?jti={jti}"}
+
+
+def user_lookup(data, i):
+    return {'path': reverse('user-list') + f"?email={data['buyer'].email}"}
+
+
+def user_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('user-list'),
+        'data': {'email': f"created{i}@bench.test", 'first_name': "New", 'last_name': "User"},
+        'status': 201,
+    }
+
+
+def user_retrieve(data, i):
+    return {'path': reverse('user-detail', kwargs={'pk': data['buyer'].id}), 'user': data['buyer']}
+
+
+def user_update(data, i):
+    return {
+        'method': 'patch',
+        'path': reverse('user-detail', kwargs={'pk': data['buyer'].id}),
+        'data': {'first_name': f"Buyer {i}"},
+        'user': data['buyer'],
+    }
+
+
+def user_destroy(data, i):
+    user = new_user(i, 'doomed-user')
+    return {'method': 'delete', 'path': reverse('user-detail', kwargs={'pk': user.id}), 'user': user, 'status': 204}
+
+
+def user_archive(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('user-archive', kwargs={'pk': data['buyer'].id}),
+        'user': data['buyer'],
+        'status': 204,
+    }
+
+
+def user_change_plan(data, i):
+    return {
+        'method': 'patch',
+        'path': reverse('user-change-plan', kwargs={'pk': data['buyer'].id}),
+        'data': {'plan': data['plan'].id},
+        'user': data['buyer'],
+    }
+
+
+def plan_list(data, i):
+    return {'path': reverse('plan-list'), 'user': data['buyer']}
+
+
+def plan_retrieve(data, i):
+    return {'path': reverse('plan-detail', kwargs={'pk': data['plan'].id}), 'user': data['buyer']}
+
+
+CASES = [
+    BenchmarkCase(build.__name__.replace('_', '-'), build)
+    for build in [
+        seller_create, seller_retrieve, seller_update, seller_destroy,
+        product_list, product_facets, product_create, product_retrieve, product_update, product_destroy,
+        price_list, price_create, price_effective, price_retrieve, price_destroy, price_bulk_effective,
+        variant_list, variant_bulk_create, variant_bulk_update,
+        image_list, image_create, image_destroy,
+        collection_list, collection_create, collection_retrieve, collection_update, collection_destroy,
+        collection_add_products, collection_reorder, collection_remove_products,
+        auth_register, auth_login, auth_verify,
+        user_lookup, user_create, user_retrieve, user_update, user_destroy, user_archive, user_change_plan,
+        plan_list, plan_retrieve,
+    ]
+]
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('case', CASES, ids=[case.name for case in CASES])
+def test_endpoint_benchmark(case, benchmark_data, benchmark_recorder, run_benchmark_case):
+    """Test an endpoint stays within its baseline queries, latency and memory."""
+    result = run_benchmark_case(case, benchmark_data)
+
+    regressions = benchmark_recorder.check(case.name, result)
+
+    assert not regressions, '\n'.join(regressions)
@@ -0,0 +1,59 @@
+import pytest
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from apps.common.management.commands.run_worker import Command as RunWorkerCommand
+from apps.common.metrics import get_queue_keys
+from config.celery import app
+
+
+def route(task_name: str) -> dict:
+    return app.amqp.router.route({}, task_name)
+
+
+def test_magic_links_skip_the_bulk_backlog():
+    """Test magic link emails go to their own queue at the highest priority."""
+    options = route('apps.identity.tasks.send_magic_link_email_task')
+
+    assert options['queue'].name == 'auth-critical'
+    assert options['priority'] == 0
+
+
+def test_every_task_is_routed():
+    """Test every project task names a queue explicitly rather than falling to the default."""
+    app.loader.import_default_modules()
+    tasks = {name for name in app.tasks if name.startswith('apps.')}
+
+    assert tasks - set(settings.CELERY_TASK_ROUTES) == set()
+    assert {options['queue'] for options in settings.CELERY_TASK_ROUTES.values()} <= set(settings.CELERY_TASK_QUEUES)
+
+
+def test_unrouted_tasks_default_to_bulk():
+    """Test a task without a route never lands on the auth-critical queue."""
+    assert route('apps.example.tasks.unrouted_task')['queue'].name == 'bulk'
+
+
+class TestRunWorker:
+    """Test the per-queue worker command."""
+
+    def test_applies_queue_profile(self, settings):
+        """Test the worker consumes one queue with that queue's profile."""
+        settings.CELERY_WORKER_PROFILES = {'bulk': {'autoscale': '6,2', 'prefetch_multiplier': 4}}
+
+        argv = RunWorkerCommand().get_worker_argv('bulk', 'INFO')
+
+        assert argv[:2] == ['worker', '--queues=bulk']
+        assert '--autoscale=6,2' in argv
+        assert '--prefetch-multiplier=4' in argv
+
+    def test_unknown_queue(self):
+        """Test an unknown queue is an error."""
+        with pytest.raises(CommandError):
+            RunWorkerCommand().get_worker_argv('celery', 'INFO')
+
+
+def test_queue_keys_cover_priority_steps(settings):
+    """Test queue depth reads every priority list of a queue."""
+    settings.CELERY_BROKER_TRANSPORT_OPTIONS = {'priority_steps': [0, 3, 6, 9], 'sep': ':'}
+
+    assert get_queue_keys('bulk') == ['bulk', 'bulk:3', 'bulk:6', 'bulk:9']
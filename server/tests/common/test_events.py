@@ -0,0 +1,250 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+
+from apps.common.events import (
+    CREATED,
+    DELETED,
+    UPDATED,
+    EntityChanged,
+    consume_stream,
+    create_consumer_group,
+    entities_changed,
+    publish_changes,
+)
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.sellers.domain.catalog import get_catalog_version
+from apps.sellers.models import Price, Product, Seller
+
+received = []
+
+
+def record_events(sender, events, **kwargs) -> None:
+    received.append((sender, events))
+
+
+def failing_subscriber(sender, events, **kwargs) -> None:
+    raise RuntimeError('subscriber failed')
+
+
+def collect_events(events) -> None:
+    pass
+
+
+@pytest.fixture
+def events():
+    received.clear()
+    entities_changed.connect(record_events, sender=Product)
+    entities_changed.connect(record_events, sender=Price)
+    yield received
+    entities_changed.disconnect(record_events, sender=Product)
+    entities_changed.disconnect(record_events, sender=Price)
+
+
+@pytest.fixture
+def seller(db):
+    user = User.objects.create_user(email="seller@example.com", first_name="John", last_name="Doe")
+    return Seller.objects.create(user=user, name="My Seller", slug="my-seller", support_email="s@example.com")
+
+
+@pytest.fixture
+def product(seller):
+    return Product.objects.create(seller=seller, name="Mug", description="Mug", sku="MUG", stock=10)
+
+
+@pytest.mark.django_db
+class TestEventBus:
+    """Test domain events are coalesced and delivered on commit."""
+
+    def test_changes_are_coalesced_per_entity(self, events, product, django_capture_on_commit_callbacks):
+        """Test several writes to one row in a transaction send one event."""
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                for stock in range(5):
+                    product.stock = stock
+                    product.save()
+                assert events == []
+
+        assert events == [(Product, [EntityChanged('sellers.Product', product.id, UPDATED, {'seller_id': product.seller_id})])]
+
+    def test_events_are_sent_once_per_model(self, events, seller, django_capture_on_commit_callbacks):
+        """Test subscribers get every changed entity of their model in one call."""
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                products = [
+                    Product.objects.create(seller=seller, name=f"P{i}", description="P", sku=f"P{i}", stock=1)
+                    for i in range(3)
+                ]
+                Price.objects.create(product=products[0], amount=100, currency=Currency.USD, is_default=True)
+
+        senders = {sender: batch for sender, batch in events}
+        assert [event.id for event in senders[Product]] == [product.id for product in products]
+        assert {event.action for event in senders[Product]} == {CREATED}
+        assert senders[Price][0].data == {'product_id': products[0].id}
+
+    def test_created_then_deleted_sends_nothing(self, events, seller, django_capture_on_commit_callbacks):
+        """Test a row created and deleted in one transaction cancels out."""
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                product = Product.objects.create(seller=seller, name="Tmp", description="T", sku="TMP", stock=1)
+                product.delete()
+
+        assert events == []
+
+    def test_rollback_sends_nothing(self, events, product, django_capture_on_commit_callbacks):
+        """Test events of a rolled back transaction are dropped."""
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    product.save()
+                    raise RuntimeError
+
+        assert events == []
+
+    def test_rolled_back_savepoint_keeps_outer_events(self, events, seller, product, django_capture_on_commit_callbacks):
+        """Test a rolled back nested block drops only its own events."""
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                product.save()
+                with pytest.raises(RuntimeError):
+                    with transaction.atomic():
+                        Product.objects.create(seller=seller, name="Tmp", description="T", sku="TMP", stock=1)
+                        raise RuntimeError
+                publish_changes(Product, [product.id], action=DELETED, seller_id=seller.id)
+
+        assert events == [(Product, [EntityChanged('sellers.Product', product.id, DELETED, {'seller_id': seller.id})])]
+
+    def test_one_callback_per_block(self, events, seller, django_capture_on_commit_callbacks):
+        """Test a block registers a single on-commit callback however many events it publishes."""
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                publish_changes(Product, range(1, 101), seller_id=seller.id)
+                with transaction.atomic():
+                    publish_changes(Product, [101], seller_id=seller.id)
+
+        assert len(callbacks) == 2
+        assert sum(len(batch) for _, batch in events) == 101
+
+    def test_rolled_back_transaction_does_not_swallow_the_next(self, events, product, django_capture_on_commit_callbacks):
+        """Test the batch of a rolled back transaction is not reused by the next one."""
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    product.save()
+                    raise RuntimeError
+            with transaction.atomic():
+                product.save()
+
+        assert len(events) == 1
+
+    def test_failing_subscriber_does_not_stop_others(self, events, product, django_capture_on_commit_callbacks):
+        """Test a subscriber raising is logged and the others still run."""
+        entities_changed.connect(failing_subscriber, sender=Product)
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                with transaction.atomic():
+                    product.save()
+        finally:
+            entities_changed.disconnect(failing_subscriber, sender=Product)
+
+        assert len(events) == 1
+
+    def test_product_changes_bump_catalog_version(self, product, django_capture_on_commit_callbacks):
+        """Test the catalog cache subscriber bumps the seller's version once per commit."""
+        version = get_catalog_version(product.seller_id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                product.save()
+                product.save()
+
+        assert get_catalog_version(product.seller_id) == version + 1
+
+
+@pytest.mark.django_db
+class TestEventStream:
+    """Test events mirrored to a Redis stream."""
+
+    def test_events_are_appended_and_consumed(self, redis_client, settings, product, django_capture_on_commit_callbacks):
+        """Test committed events reach a consumer group and are acknowledged."""
+        settings.EVENT_STREAM = 'events'
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                product.save()
+
+        assert redis_client.xlen('events') == 1
+        create_consumer_group('indexer')
+        batches = []
+        assert consume_stream('indexer', 'worker-1', batches.append) == 1
+        assert batches == [[EntityChanged('sellers.Product', product.id, UPDATED, {'seller_id': product.seller_id})]]
+        assert consume_stream('indexer', 'worker-1', batches.append) == 0
+        assert redis_client.xpending('events', 'indexer')['pending'] == 0
+
+    def test_unacknowledged_events_are_redelivered(self, redis_client, settings, product, django_capture_on_commit_callbacks):
+        """Test a batch whose handler failed is handed out again."""
+        settings.EVENT_STREAM = 'events'
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                product.save()
+
+        create_consumer_group('indexer')
+        with pytest.raises(RuntimeError):
+            consume_stream('indexer', 'worker-1', lambda events: failing_subscriber(None, events))
+
+        batches = []
+        assert consume_stream('indexer', 'worker-1', batches.append) == 1
+        assert batches[0][0].id == product.id
+
+    def test_consume_events_command(self, redis_client, settings, product, django_capture_on_commit_callbacks):
+        """Test the command feeds one batch to a handler by dotted path."""
+        settings.EVENT_STREAM = 'events'
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                product.save()
+
+        stdout = StringIO()
+        call_command(
+            'consume_events', 'tests.common.test_events.collect_events',
+            group='indexer', once=True, stdout=stdout,
+        )
+
+        assert 'Handled 1 events' in stdout.getvalue()
+        assert redis_client.xpending('events', 'indexer')['pending'] == 0
+
+    def test_failing_events_are_dead_lettered(self, redis_client, settings, product, django_capture_on_commit_callbacks):
+        """Test an event the handler keeps failing on moves to the dead letter stream."""
+        settings.EVENT_STREAM = 'events'
+        settings.EVENT_STREAM_MAX_DELIVERIES = 2
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                product.save()
+
+        create_consumer_group('indexer')
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                consume_stream('indexer', 'worker-1', lambda events: failing_subscriber(None, events))
+
+        assert consume_stream('indexer', 'worker-1', collect_events) == 0
+        assert redis_client.xpending('events', 'indexer')['pending'] == 0
+        [(_, fields)] = redis_client.xrange('events:dead')
+        assert fields[b'group'] == b'indexer'
+        assert fields[b'id'] == str(product.id).encode()
+
+    def test_command_survives_a_failing_handler(self, redis_client, settings, monkeypatch, caplog):
+        """Test the consumer loop logs a failed batch and keeps going."""
+        settings.EVENT_STREAM = 'events'
+        calls = iter([RuntimeError('handler failed'), KeyboardInterrupt()])
+
+        def consume(*args, **kwargs):
+            raise next(calls)
+
+        monkeypatch.setattr('apps.common.management.commands.consume_events.consume_stream', consume)
+        monkeypatch.setattr('apps.common.management.commands.consume_events.time.sleep', lambda seconds: None)
+
+        with pytest.raises(KeyboardInterrupt):
+            call_command('consume_events', 'tests.common.test_events.collect_events', group='indexer')
+
+        assert 'Handling events for group indexer failed' in caplog.text
@@ -0,0 +1,101 @@
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.common.fx import FxRateNotFound, convert_amounts, fx_rates
+from apps.common.models import FxRate
+from apps.identity.models import User
+from apps.sellers.models import Seller, Product, Price
+
+
+@pytest.fixture(autouse=True)
+def fresh_fx_table():
+    fx_rates.invalidate()
+    yield
+    fx_rates.invalidate()
+
+
+@pytest.mark.django_db
+class TestConvertAmounts:
+    """Test suite for FX conversion."""
+
+    def test_converts_and_rounds_half_up(self):
+        """Test amounts are converted with one rate and rounded to minor units."""
+        FxRate.objects.create(base_currency="usd", quote_currency="cad", rate=Decimal("1.375"))
+
+        assert convert_amounts([1000, 2, None], "usd", "cad") == [1375, 3, None]
+
+    def test_inverse_rate_is_derived(self):
+        """Test a pair stored one way converts in the other direction too."""
+        FxRate.objects.create(base_currency="usd", quote_currency="cad", rate=Decimal("1.25"))
+
+        assert convert_amounts([1250], "cad", "usd") == [1000]
+
+    def test_same_currency_is_a_no_op(self, django_assert_num_queries):
+        """Test converting into the same currency does no lookup."""
+        with django_assert_num_queries(0):
+            assert convert_amounts([100], "usd", "usd") == [100]
+
+    def test_missing_rate(self):
+        """Test converting without a rate raises FxRateNotFound."""
+        with pytest.raises(FxRateNotFound):
+            convert_amounts([100], "usd", "cad")
+
+    def test_rate_table_is_loaded_once(self, django_assert_num_queries):
+        """Test repeated conversions are served from the in-process table."""
+        FxRate.objects.create(base_currency="usd", quote_currency="cad", rate=Decimal("1.25"))
+        convert_amounts([1], "usd", "cad")
+
+        with django_assert_num_queries(0):
+            convert_amounts(list(range(500)), "usd", "cad")
+
+
+@pytest.mark.django_db
+class TestLoadFxRatesCommand:
+    """Test suite for the load_fx_rates management command."""
+
+    def test_loads_and_updates_rates(self, tmp_path):
+        """Test rates are inserted and then updated in place."""
+        path = tmp_path / "fx_rates.json"
+        path.write_text(json.dumps({"base": "usd", "rates": {"cad": "1.30"}}))
+        call_command("load_fx_rates", path=str(path))
+
+        path.write_text(json.dumps({"base": "usd", "rates": {"cad": "1.40"}}))
+        call_command("load_fx_rates", path=str(path))
+
+        assert FxRate.objects.get().rate == Decimal("1.40")
+
+    def test_rejects_unknown_currency(self, tmp_path):
+        """Test unknown currencies fail the command."""
+        path = tmp_path / "fx_rates.json"
+        path.write_text(json.dumps({"base": "usd", "rates": {"eur": "0.9"}}))
+
+        with pytest.raises(CommandError):
+            call_command("load_fx_rates", path=str(path))
+
+
+@pytest.mark.django_db
+class TestProductListDisplayCurrency:
+    """Test suite for rendering product prices in the shopper's currency."""
+
+    def test_price_range_is_converted(self):
+        """Test display_currency converts the listed price range."""
+        FxRate.objects.create(base_currency="usd", quote_currency="cad", rate=Decimal("1.5"))
+        user = User.objects.create_user(email="s@example.com", first_name="Sam", last_name="Seller")
+        seller = Seller.objects.create(user=user, name="Seller", slug="seller", support_email="s@example.com")
+        product = Product.objects.create(seller=seller, name="Shirt", description="Shirt", sku="SHIRT")
+        Price.objects.create(product=product, amount=1000, currency="usd", is_default=True)
+
+        response = APIClient().get(
+            reverse('product-list', kwargs={'identifier': seller.slug}),
+            {'currency': 'usd', 'display_currency': 'cad'}
+        )
+
+        assert response.status_code == 200
+        assert response.data[0]['currency'] == "cad"
+        assert response.data[0]['min_price'] == 1500
@@ -0,0 +1,193 @@
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.common.middleware import REPLAY_HEADER, IdempotencyMiddleware, get_idempotency_cache_key
+from apps.identity.models import User
+from apps.sellers.models import Seller, Product
+
+
+class IdempotencyMiddlewareTests(APITestCase):
+    """Test suite for the Idempotency-Key middleware."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.url = reverse('product-list', kwargs={'identifier': self.seller.slug})
+        self.payload = {'name': 'Shirt', 'description': 'Cotton shirt', 'sku': 'SHIRT-001'}
+        self.token = str(AccessToken.for_user(self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def make_request(self):
+        return RequestFactory().post(
+            self.url, data=b'{}', content_type='application/json',
+            HTTP_IDEMPOTENCY_KEY='key-1', HTTP_AUTHORIZATION=f'Bearer {self.token}',
+        )
+
+    def test_replay_returns_first_response(self):
+        """Test a repeated key returns the stored response without a second insert."""
+        first = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        second = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second[REPLAY_HEADER], 'true')
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_replay_makes_no_queries(self):
+        """Test a replayed request does not touch the database."""
+        self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        with self.assertNumQueries(0):
+            self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+    def test_key_reused_with_different_body(self):
+        """Test reusing a key with another payload returns 422."""
+        self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        response = self.client.post(
+            self.url,
+            {'name': 'Other', 'description': 'Other', 'sku': 'OTHER-001'},
+            format='json',
+            HTTP_IDEMPOTENCY_KEY='key-1'
+        )
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_replay_keeps_response_headers(self):
+        """Test a replay returns the headers of the first response."""
+        def get_response(request):
+            response = HttpResponse(b'{}', status=201, content_type='application/json')
+            response['Location'] = '/products/1/'
+            return response
+
+        middleware = IdempotencyMiddleware(get_response)
+        middleware(self.make_request())
+
+        replay = middleware(self.make_request())
+
+        self.assertEqual(replay[REPLAY_HEADER], 'true')
+        self.assertEqual(replay['Location'], '/products/1/')
+
+    def test_key_is_scoped_to_the_user(self):
+        """Test the same key from another user is not replayed."""
+        self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        other = User.objects.create_user(email="other@example.com", first_name="Jane", last_name="Doe")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(other)}')
+
+        response = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertNotIn(REPLAY_HEADER, response)
+
+    def test_replay_survives_token_refresh(self):
+        """Test a retry sent with a new access token for the same user is replayed."""
+        first = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        second = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(second[REPLAY_HEADER], 'true')
+        self.assertEqual(second.content, first.content)
+
+    def test_anonymous_requests_are_not_deduplicated(self):
+        """Test requests without a valid token are passed through untouched."""
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+
+        self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertIsNone(cache.get(get_idempotency_cache_key(self.make_request(), 'key-1', f"user:{self.user.id}")))
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=10)
+    def test_multipart_body_is_not_read(self):
+        """Test multipart uploads larger than the in-memory limit reach the view and replay."""
+        def make_upload():
+            return RequestFactory().post(
+                self.url, {'file': SimpleUploadedFile('logo.png', b'x' * 100, content_type='image/png')},
+                HTTP_IDEMPOTENCY_KEY='key-1', HTTP_AUTHORIZATION=f'Bearer {self.token}',
+            )
+
+        middleware = IdempotencyMiddleware(lambda request: HttpResponse(status=201))
+        first = middleware(make_upload())
+        second = middleware(make_upload())
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second[REPLAY_HEADER], 'true')
+
+    def test_multipart_upload_of_the_same_size_is_not_a_retry(self):
+        """Test a different upload with the same key and size is rejected, and the view still parses uploads."""
+        def make_upload(content):
+            return RequestFactory().post(
+                self.url, {'file': SimpleUploadedFile('logo.png', content, content_type='image/png')},
+                HTTP_IDEMPOTENCY_KEY='key-1', HTTP_AUTHORIZATION=f'Bearer {self.token}',
+            )
+
+        middleware = IdempotencyMiddleware(lambda request: HttpResponse(request.FILES['file'].read(), status=201))
+        first = middleware(make_upload(b'a' * 100))
+        second = middleware(make_upload(b'b' * 100))
+
+        self.assertEqual(first.content, b'a' * 100)
+        self.assertEqual(second.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_diagnostic_headers_are_not_replayed(self):
+        """Test Server-Timing and X-Profile-Id of the first request are left out of replays."""
+        def get_response(request):
+            response = HttpResponse(status=201)
+            response['Server-Timing'] = 'db;dur=12.0'
+            response['X-Profile-Id'] = 'abc'
+            response['Location'] = '/products/1/'
+            return response
+
+        middleware = IdempotencyMiddleware(get_response)
+        middleware(self.make_request())
+        replay = IdempotencyMiddleware(lambda request: HttpResponse(status=500))(self.make_request())
+
+        self.assertEqual(replay[REPLAY_HEADER], 'true')
+        self.assertEqual(replay['Location'], '/products/1/')
+        self.assertNotIn('Server-Timing', replay)
+        self.assertNotIn('X-Profile-Id', replay)
+
+    @override_settings(IDEMPOTENCY_LOCK_WAIT_SECONDS=0)
+    def test_concurrent_duplicate_returns_conflict(self):
+        """Test a duplicate arriving while the first is in flight returns 409."""
+        cache.add(f"{get_idempotency_cache_key(self.make_request(), 'key-1', f'user:{self.user.id}')}:lock", 'in-flight')
+
+        response = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Product.objects.count(), 0)
+
+    def test_lock_taken_by_another_request_is_kept(self):
+        """Test a request whose lock was taken over does not release the new holder's lock."""
+        lock_key = f"{get_idempotency_cache_key(self.make_request(), 'key-1', f'user:{self.user.id}')}:lock"
+
+        def get_response(request):
+            cache.set(lock_key, 'next-request')
+            return HttpResponse(status=201)
+
+        IdempotencyMiddleware(get_response)(self.make_request())
+
+        self.assertEqual(cache.get(lock_key), 'next-request')
+
+    def test_overlong_key_is_rejected(self):
+        """Test keys over 255 characters return 400."""
+        response = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='k' * 256)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
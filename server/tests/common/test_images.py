@@ -0,0 +1,184 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from apps.common import images
+from apps.common.images import (
+    ImageError,
+    build_responsive_image,
+    encode_blurhash,
+    fetch_image,
+    generate_variants,
+    get_variant_widths,
+    open_image,
+    process_image,
+)
+
+
+def make_image(width: int, height: int, color=(200, 40, 40), image_format: str = 'PNG') -> bytes:
+    output = BytesIO()
+    Image.new('RGB', (width, height), color).save(output, format=image_format)
+    return output.getvalue()
+
+
+class TestBlurhash:
+    """Test BlurHash encoding."""
+
+    def test_black_image(self):
+        """Test a black image encodes to the reference hash."""
+        image = Image.new('RGB', (64, 48), (0, 0, 0))
+
+        assert encode_blurhash(image) == 'L00000fQfQfQfQfQfQfQfQfQfQfQ'
+
+    def test_length_follows_components(self):
+        """Test the hash has 4 + 2 characters per component after the first."""
+        image = open_image(make_image(50, 50))
+
+        assert len(encode_blurhash(image, 4, 3)) == 6 + 2 * 11
+
+
+class TestVariants:
+    """Test responsive variant generation."""
+
+    def test_widths_never_upscale(self, settings):
+        """Test only widths below the original are rendered, plus the original."""
+        settings.IMAGE_VARIANT_WIDTHS = [320, 640, 1024]
+
+        assert get_variant_widths(700) == [320, 640, 700]
+        assert get_variant_widths(200) == [200]
+
+    def test_every_width_and_format(self, settings):
+        """Test each width is rendered in each configured format."""
+        settings.IMAGE_VARIANT_WIDTHS = [100]
+        settings.IMAGE_VARIANT_FORMATS = ['webp', 'jpeg']
+
+        variants = generate_variants(make_image(400, 200), 400, workers=0)
+
+        assert [(v['width'], v['height'], v['format']) for v in variants] == [
+            (100, 50, 'webp'), (100, 50, 'jpeg'), (400, 200, 'webp'), (400, 200, 'jpeg'),
+        ]
+        assert Image.open(BytesIO(variants[1]['content'])).format == 'JPEG'
+
+    def test_render_threads_match_inline(self, settings):
+        """Test rendering in the thread pool gives the same variants."""
+        settings.IMAGE_VARIANT_WIDTHS = [100]
+        data = make_image(300, 300)
+
+        pooled = generate_variants(data, 300, workers=2)
+        inline = generate_variants(data, 300, workers=0)
+
+        assert [(v['width'], v['format']) for v in pooled] == [(v['width'], v['format']) for v in inline]
+
+    def test_invalid_image(self):
+        """Test bytes that are not an image raise ImageError."""
+        with pytest.raises(ImageError):
+            open_image(b'not an image')
+
+    def test_fetch_rejects_non_http(self):
+        """Test only http(s) URLs are fetched."""
+        with pytest.raises(ImageError):
+            fetch_image('file:///etc/passwd')
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    routes = {
+        '/photo.png': (200, {'Content-Type': 'image/png'}, make_image(4, 4)),
+        '/page.html': (200, {'Content-Type': 'text/html'}, b'<html></html>'),
+        '/moved': (302, {'Location': '/photo.png'}, b''),
+    }
+
+    def do_GET(self):
+        status, headers, body = self.routes.get(self.path, (404, {}, b''))
+        if self.path == '/internal':
+            status, headers = 302, {'Location': f"http://127.0.0.1:{self.server.server_port}/photo.png"}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server(monkeypatch):
+    """
+    A local HTTP server reachable as images.example, which passes the public
+    address check; every other host goes through the real check.
+    """
+    server = HTTPServer(('127.0.0.1', 0), ImageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    resolve = images.resolve_public_address
+    monkeypatch.setattr(
+        images, 'resolve_public_address',
+        lambda host, port: '127.0.0.1' if host == 'images.example' else resolve(host, port),
+    )
+    yield f"http://images.example:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestFetchImage:
+    """Test image downloads from seller supplied URLs."""
+
+    @pytest.mark.parametrize('url', [
+        'http://127.0.0.1/photo.png',
+        'http://localhost/photo.png',
+        'http://169.254.169.254/latest/meta-data/',
+        'http://10.0.0.1/photo.png',
+        'http://[::1]/photo.png',
+    ])
+    def test_rejects_non_public_addresses(self, url):
+        """Test loopback, link-local and private hosts are never connected to."""
+        with pytest.raises(ImageError):
+            fetch_image(url)
+
+    def test_fetches_image(self, image_server):
+        """Test an image on a public host is downloaded, following same-host redirects."""
+        assert open_image(fetch_image(f"{image_server}/moved")).size == (4, 4)
+
+    def test_redirect_to_private_address_is_rejected(self, image_server):
+        """Test every redirect hop is checked again."""
+        with pytest.raises(ImageError):
+            fetch_image(f"{image_server}/internal")
+
+    def test_rejects_non_image_content_type(self, image_server):
+        """Test responses that are not images are refused."""
+        with pytest.raises(ImageError):
+            fetch_image(f"{image_server}/page.html")
+
+    def test_rejects_oversized_images(self, image_server, settings):
+        """Test images over IMAGE_MAX_BYTES are refused."""
+        settings.IMAGE_MAX_BYTES = 10
+        with pytest.raises(ImageError):
+            fetch_image(f"{image_server}/photo.png")
+
+    def test_http_errors_are_image_errors(self, image_server):
+        """Test http.client failures such as an invalid URL surface as ImageError."""
+        with pytest.raises(ImageError):
+            fetch_image(f"{image_server}/bad path")
+
+
+class TestResponsiveImage:
+    """Test srcset building from stored metadata."""
+
+    def test_process_and_build(self, settings):
+        """Test stored variants become a jpeg srcset with a webp source."""
+        settings.IMAGE_VARIANT_WIDTHS = [100]
+        settings.IMAGE_VARIANT_FORMATS = ['webp', 'jpeg']
+
+        metadata = process_image(make_image(200, 100), 'tests/responsive')
+        image = build_responsive_image(metadata)
+
+        assert (image['width'], image['height']) == (200, 100)
+        assert image['src'].endswith('tests/responsive/200w.jpeg')
+        assert image['srcset'].endswith('200w.jpeg 200w')
+        assert '100w.jpeg 100w' in image['srcset']
+        assert image['sources'][0]['type'] == 'image/webp'
+        assert image['sources'][0]['srcset'].count('w,') == 1
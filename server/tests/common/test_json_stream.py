@@ -0,0 +1,28 @@
+import io
+
+import pytest
+
+from apps.common.json_stream import iter_json_array
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+def test_iter_json_array_matches_json_load(chunk_size):
+    document = '[{"code": "a", "amount": 12345}, {"code": "b", "tags": ["x", "y"]}, 3.5, "s", null]'
+
+    items = list(iter_json_array(io.StringIO(document), chunk_size=chunk_size))
+
+    assert items == [{"code": "a", "amount": 12345}, {"code": "b", "tags": ["x", "y"]}, 3.5, "s", None]
+
+
+def test_iter_json_array_empty_array():
+    assert list(iter_json_array(io.StringIO("  [ ]  "))) == []
+
+
+@pytest.mark.parametrize(
+    "document",
+    ['{"code": "a"}', '[{"code": "a"}', '[{"code": "a"} {"code": "b"}]', '[{"code": }]', ''],
+    ids=["object", "unterminated", "missing_comma", "invalid_value", "empty"]
+)
+def test_iter_json_array_rejects_invalid_documents(document):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(document), chunk_size=4))
@@ -0,0 +1,153 @@
+import os
+
+import pytest
+import redis
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from apps.common.metrics import QueueDepthCollector, clear_multiprocess_dir, record_cache_lookup
+from apps.common.signals import mark_worker_process_dead, start_worker_metrics
+from apps.identity.models import User
+from apps.identity.tasks import send_magic_link_email_task
+from apps.sellers.models import Product, Seller
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    """Test the Prometheus scrape endpoint."""
+
+    def test_exposes_request_metrics(self, settings):
+        """Test requests are recorded under their route name and exposed."""
+        settings.DEBUG = True
+        labels = {'route': 'auth-verify', 'method': 'GET', 'status': '4xx'}
+        before = sample('http_request_duration_seconds_count', **labels)
+
+        APIClient().get(reverse('auth-verify'))
+        response = APIClient().get(reverse('metrics'))
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        assert b'http_request_duration_seconds_bucket{' in response.content
+        assert sample('http_request_duration_seconds_count', **labels) == before + 1
+
+    def test_token(self, settings):
+        """Test a configured METRICS_TOKEN is required."""
+        settings.METRICS_TOKEN = 'secret'
+
+        assert APIClient().get(reverse('metrics')).status_code == 401
+        response = APIClient().get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        assert response.status_code == 200
+
+    def test_closed_without_token_outside_debug(self, settings):
+        """Test /metrics is refused when no METRICS_TOKEN is set and DEBUG is off."""
+        settings.METRICS_TOKEN = ''
+        settings.DEBUG = False
+
+        assert APIClient().get(reverse('metrics')).status_code == 403
+
+
+@pytest.mark.django_db
+def test_cache_layers_count_hits_and_misses():
+    """Test a cached endpoint records a miss and then a hit."""
+    user = User.objects.create_user(email="seller@example.com", first_name="Sam", last_name="Seller")
+    seller = Seller.objects.create(user=user, name="Seller", slug="metrics-seller", support_email="s@example.com")
+    Product.objects.create(seller=seller, name="Shirt", sku="SHIRT", is_published=True)
+    url = reverse('product-facets', kwargs={'identifier': seller.slug})
+    hits = sample('cache_lookups_total', layer='facets', result='hit')
+    misses = sample('cache_lookups_total', layer='facets', result='miss')
+
+    APIClient().get(url)
+    APIClient().get(url)
+
+    assert sample('cache_lookups_total', layer='facets', result='miss') == misses + 1
+    assert sample('cache_lookups_total', layer='facets', result='hit') == hits + 1
+
+
+def test_record_cache_lookup():
+    """Test lookups are counted per layer and result."""
+    before = sample('cache_lookups_total', layer='test', result='miss')
+
+    record_cache_lookup('test', False)
+
+    assert sample('cache_lookups_total', layer='test', result='miss') == before + 1
+
+
+@pytest.mark.django_db
+def test_task_duration():
+    """Test Celery task runs are timed by task name and state."""
+    labels = {'task': send_magic_link_email_task.name, 'state': 'SUCCESS'}
+    before = sample('celery_task_duration_seconds_count', **labels)
+
+    send_magic_link_email_task.delay(0, 'jti')
+
+    assert sample('celery_task_duration_seconds_count', **labels) == before + 1
+
+
+def test_queue_depth(settings):
+    """Test queue depths are read from the broker at scrape time."""
+    settings.CELERY_BROKER_URL = os.getenv('TEST_REDIS_URL', 'redis://127.0.0.1:6379/15')
+    settings.METRICS_CELERY_QUEUES = ['metrics-test']
+    client = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+    try:
+        client.delete('metrics-test')
+    except redis.ConnectionError:
+        pytest.skip('Redis is not available')
+    client.rpush('metrics-test', 'a', 'b')
+
+    try:
+        [family] = QueueDepthCollector().collect()
+    finally:
+        client.delete('metrics-test')
+
+    assert [(s.labels, s.value) for s in family.samples] == [({'queue': 'metrics-test'}, 2)]
+
+
+class TestWorkerMetrics:
+    """Test Celery workers serve the metrics of their pool processes."""
+
+    def test_server_started_on_port(self, settings, monkeypatch, tmp_path):
+        """Test the main process clears the multiprocess directory and serves on METRICS_WORKER_PORT."""
+        settings.METRICS_WORKER_PORT = 9100
+        monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+        (tmp_path / 'histogram_123.db').write_bytes(b'stale')
+        ports = []
+        monkeypatch.setattr('apps.common.signals.start_metrics_server', ports.append)
+
+        start_worker_metrics()
+
+        assert ports == [9100]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_disabled_without_port(self, settings, monkeypatch):
+        """Test no server is started when METRICS_WORKER_PORT is 0."""
+        settings.METRICS_WORKER_PORT = 0
+        ports = []
+        monkeypatch.setattr('apps.common.signals.start_metrics_server', ports.append)
+
+        start_worker_metrics()
+
+        assert ports == []
+
+    def test_exited_pool_process_is_marked_dead(self, monkeypatch):
+        """Test a pool process that exited is marked dead in the multiprocess directory."""
+        pids = []
+        monkeypatch.setattr('apps.common.signals.mark_process_dead', pids.append)
+
+        mark_worker_process_dead(pid=123, exitcode=0)
+
+        assert pids == [123]
+
+
+def test_clear_multiprocess_dir_creates_it(monkeypatch, tmp_path):
+    """Test a missing multiprocess directory is created."""
+    path = tmp_path / 'prometheus'
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(path))
+
+    clear_multiprocess_dir()
+
+    assert path.is_dir()
@@ -0,0 +1,186 @@
+import os
+import time
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from celery import current_app
+from django.core import mail
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.common.metrics import get_queue_keys
+from apps.common.models import OutboxMessage
+from apps.common.outbox import dispatch_messages, enqueue_task, purge_outbox, relay_outbox
+from apps.identity.models import User
+from apps.identity.tasks import send_magic_link_email_task
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="buyer@example.com", first_name="John", last_name="Doe")
+
+
+@pytest.mark.django_db
+class TestOutbox:
+    """Test the transactional outbox."""
+
+    def test_dispatched_on_commit(self, user, django_capture_on_commit_callbacks):
+        """Test a message is published and marked once its transaction commits."""
+        with django_capture_on_commit_callbacks(execute=True):
+            message = enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+            assert len(mail.outbox) == 0
+
+        message.refresh_from_db()
+        assert message.dispatched_at is not None
+        assert len(mail.outbox) == 1
+
+    def test_rollback_drops_message(self, user, django_capture_on_commit_callbacks):
+        """Test a rolled back transaction neither stores nor publishes its message."""
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+                    raise RuntimeError
+
+        assert callbacks == []
+        assert not OutboxMessage.objects.exists()
+
+    def test_failed_publish_backs_off(self, user, django_capture_on_commit_callbacks):
+        """Test a failed publish is recorded and left for the relay."""
+        with mock.patch.object(send_magic_link_email_task, 'apply_async', side_effect=OSError('broker down')):
+            with django_capture_on_commit_callbacks(execute=True):
+                message = enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+
+        message.refresh_from_db()
+        assert message.dispatched_at is None
+        assert message.attempts == 1
+        assert message.last_error == 'broker down'
+        assert message.available_at > timezone.now()
+
+    def test_on_commit_publish_does_not_retry(self, user, django_capture_on_commit_callbacks):
+        """Test the on-commit publish skips Celery's publish retry policy and the result backend."""
+        with mock.patch.object(send_magic_link_email_task, 'apply_async') as apply_async:
+            with django_capture_on_commit_callbacks(execute=True):
+                enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+
+        assert apply_async.call_args.kwargs['retry'] is False
+        assert apply_async.call_args.kwargs['ignore_result'] is True
+
+    def test_unreachable_broker_fails_fast(self, user, settings, monkeypatch):
+        """Test a publish without retry gives up at once when the broker is down."""
+        monkeypatch.setitem(current_app.conf, 'CELERY_TASK_ALWAYS_EAGER', False)
+        monkeypatch.setitem(current_app.conf, 'broker_write_url', 'redis://127.0.0.1:1/0')
+        backend = mock.Mock()
+        monkeypatch.setattr(type(current_app._get_current_object()), 'backend', backend)
+        settings.OUTBOX_DISPATCH_ON_COMMIT = False
+        message = enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+
+        started = time.monotonic()
+        assert dispatch_messages([message], retry=False) == 0
+
+        assert time.monotonic() - started < 1
+        backend.on_task_call.assert_not_called()
+        message.refresh_from_db()
+        assert message.attempts == 1
+        assert 'Connection refused' in message.last_error
+
+    def test_publishes_to_broker(self, user, settings, monkeypatch, redis_client):
+        """Test a publish without retry reaches a live broker."""
+        monkeypatch.setitem(current_app.conf, 'CELERY_TASK_ALWAYS_EAGER', False)
+        monkeypatch.setitem(
+            current_app.conf, 'broker_write_url', os.getenv('TEST_REDIS_URL', 'redis://127.0.0.1:6379/15')
+        )
+        settings.OUTBOX_DISPATCH_ON_COMMIT = False
+        message = enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+
+        assert dispatch_messages([message], retry=False) == 1
+        queue_keys = get_queue_keys(settings.CELERY_QUEUE_AUTH_CRITICAL)
+        assert sum(redis_client.llen(key) for key in queue_keys) == 1
+
+    def test_gives_up_after_max_attempts(self, user, settings):
+        """Test a message failing OUTBOX_MAX_ATTEMPTS times is marked failed and no longer relayed."""
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        settings.OUTBOX_RELAY_GRACE_SECONDS = 0
+        settings.OUTBOX_DISPATCH_ON_COMMIT = False
+        message = enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+
+        with mock.patch.object(send_magic_link_email_task, 'apply_async', side_effect=OSError('broker down')):
+            for _ in range(2):
+                relay_outbox()
+                OutboxMessage.objects.update(available_at=timezone.now())
+
+        message.refresh_from_db()
+        assert message.attempts == 2
+        assert message.failed_at is not None
+        assert relay_outbox() == 0
+        assert len(mail.outbox) == 0
+
+    def test_relay_publishes_missed_messages(self, user, settings):
+        """Test the relay sends due messages past the grace period in batches."""
+        settings.OUTBOX_RELAY_GRACE_SECONDS = 0
+        for i in range(5):
+            enqueue_task(send_magic_link_email_task, [user.id, f"jti-{i}"])
+        OutboxMessage.objects.filter(id=OutboxMessage.objects.first().id).update(
+            available_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        assert relay_outbox(batch_size=2) == 4
+        assert len(mail.outbox) == 4
+        assert OutboxMessage.objects.filter(dispatched_at__isnull=True).count() == 1
+
+    def test_relay_leaves_fresh_messages_to_on_commit(self, user):
+        """Test messages inside the grace period are not relayed."""
+        enqueue_task(send_magic_link_email_task, [user.id, 'jti'])
+
+        assert relay_outbox() == 0
+
+    def test_purge(self, user):
+        """Test dispatched messages past retention are deleted, pending ones kept."""
+        old = enqueue_task(send_magic_link_email_task, [user.id, 'old'])
+        enqueue_task(send_magic_link_email_task, [user.id, 'pending'])
+        OutboxMessage.objects.filter(id=old.id).update(dispatched_at=timezone.now() - timedelta(days=30))
+
+        assert purge_outbox(days=7) == 1
+        assert OutboxMessage.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestMagicLinkViews:
+    """Test the auth views send their email through the outbox."""
+
+    def test_register(self, django_capture_on_commit_callbacks):
+        """Test registering stores the user and its email message together."""
+        with django_capture_on_commit_callbacks(execute=True):
+            response = APIClient().post(reverse('auth-register'), {
+                'email': 'new@example.com', 'first_name': 'New', 'last_name': 'User'
+            }, format='json')
+
+        assert response.status_code == 201
+        message = OutboxMessage.objects.get()
+        assert message.task_name == send_magic_link_email_task.name
+        assert message.args[0] == User.objects.get(email='new@example.com').id
+        assert message.dispatched_at is not None
+        assert mail.outbox[0].to == ['new@example.com']
+
+    def test_register_rollback_sends_nothing(self):
+        """Test a failed registration leaves neither a user nor an email behind."""
+        with mock.patch('apps.identity.auth_views.enqueue_task', side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                APIClient().post(reverse('auth-register'), {
+                    'email': 'new@example.com', 'first_name': 'New', 'last_name': 'User'
+                }, format='json')
+
+        assert not User.objects.filter(email='new@example.com').exists()
+        assert len(mail.outbox) == 0
+
+    def test_login(self, user, django_capture_on_commit_callbacks):
+        """Test a login request queues the magic link through the outbox."""
+        with django_capture_on_commit_callbacks(execute=True):
+            response = APIClient().post(reverse('auth-login'), {'email': user.email}, format='json')
+
+        assert response.status_code == 200
+        assert OutboxMessage.objects.get().dispatched_at is not None
+        assert len(mail.outbox) == 1
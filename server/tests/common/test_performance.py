@@ -0,0 +1,111 @@
+import logging
+import os
+
+import pytest
+import redis
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.common.performance import (
+    InstrumentedRedis,
+    RequestMetrics,
+    get_current_metrics,
+    record_request_metrics,
+    request_metrics_recorded,
+)
+from apps.common.renderers import TimedJSONRenderer
+from apps.identity.models import Plan
+
+
+class TestRequestMetrics:
+    """Test the metrics container."""
+
+    def test_server_timing(self):
+        """Test the header lists each phase with the remainder as app time."""
+        metrics = RequestMetrics(
+            total_ms=20, db_queries=3, db_ms=5, redis_calls=2, redis_ms=1.5, serialize_ms=2.5
+        )
+
+        assert metrics.server_timing() == (
+            'db;dur=5.0;desc="3 queries", redis;dur=1.5;desc="2 calls", '
+            'serialize;dur=2.5, app;dur=11.0, total;dur=20.0'
+        )
+
+    @pytest.mark.django_db
+    def test_records_queries(self):
+        """Test queries inside the block are counted and the metrics are current."""
+        with record_request_metrics() as metrics:
+            assert get_current_metrics() is metrics
+            Plan.objects.count()
+            Plan.objects.count()
+
+        assert metrics.db_queries == 2
+        assert metrics.total_ms >= metrics.db_ms > 0
+        assert get_current_metrics() is None
+
+    def test_renderer_adds_serialize_time(self):
+        """Test JSON rendering is attributed to serialization."""
+        with record_request_metrics() as metrics:
+            content = TimedJSONRenderer().render({'items': list(range(100))})
+
+        assert content.startswith(b'{"items":[0,1')
+        assert metrics.serialize_ms > 0
+
+    def test_redis_round_trips(self):
+        """Test commands and pipelines each count as one Redis call."""
+        client = InstrumentedRedis.from_url(os.getenv('TEST_REDIS_URL', 'redis://127.0.0.1:6379/15'))
+        try:
+            client.ping()
+        except redis.ConnectionError:
+            pytest.skip('Redis is not available')
+
+        with record_request_metrics() as metrics:
+            client.set('performance:test', 1)
+            pipe = client.pipeline()
+            pipe.incr('performance:test')
+            pipe.delete('performance:test')
+            pipe.execute()
+
+        assert metrics.redis_calls == 2
+        assert metrics.redis_ms > 0
+
+
+@pytest.mark.django_db
+class TestPerformanceMiddleware:
+    """Test the per-request instrumentation middleware."""
+
+    def test_server_timing_header(self, settings):
+        """Test the header is added when SERVER_TIMING is on."""
+        settings.SERVER_TIMING = True
+
+        response = APIClient().get(reverse('auth-verify'))
+
+        assert response['Server-Timing'].startswith('db;dur=')
+        assert 'total;dur=' in response['Server-Timing']
+
+    def test_no_header_by_default(self, settings):
+        """Test the header stays off without SERVER_TIMING."""
+        settings.SERVER_TIMING = False
+
+        response = APIClient().get(reverse('auth-verify'))
+
+        assert not response.has_header('Server-Timing')
+
+    def test_logs_and_signals(self, settings, caplog):
+        """Test each request is logged with structured metrics and signalled."""
+        received = []
+
+        def receiver(sender, request, response, metrics, **kwargs):
+            received.append(metrics)
+
+        request_metrics_recorded.connect(receiver)
+        try:
+            with caplog.at_level(logging.INFO, logger='apps.common.middleware'):
+                APIClient().get(reverse('auth-verify'))
+        finally:
+            request_metrics_recorded.disconnect(receiver)
+
+        record = next(r for r in caplog.records if r.getMessage().startswith('request '))
+        assert 'view=auth-verify' in record.getMessage()
+        assert record.request_metrics['view'] == 'auth-verify'
+        assert record.request_metrics['total_ms'] == received[0].total_ms
@@ -0,0 +1,152 @@
+import os
+import pstats
+import signal
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.common.profiling import (
+    COLLAPSED,
+    PSTATS,
+    get_profile,
+    get_profiling_user,
+    install_profiling_signal,
+    make_profile_token,
+    worker_profiler,
+)
+from apps.identity.models import User
+
+
+@pytest.fixture
+def staff(db):
+    return User.objects.create_user(email="staff@example.com", first_name="Sam", last_name="Staff", is_staff=True)
+
+
+@pytest.fixture
+def staff_client(staff):
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+class TestProfilingTokens:
+    """Test signed profiling tokens."""
+
+    def test_staff_token(self, staff):
+        """Test a token resolves to the staff user it was issued to."""
+        assert get_profiling_user(make_profile_token(staff)) == staff
+
+    def test_rejects_non_staff_and_tampered(self, staff):
+        """Test tokens of users who lost staff, or altered tokens, are refused."""
+        token = make_profile_token(staff)
+
+        assert get_profiling_user(token + 'x') is None
+        User.objects.filter(id=staff.id).update(is_staff=False)
+        assert get_profiling_user(token) is None
+
+    def test_token_endpoint(self, staff_client):
+        """Test staff can issue themselves a token over the API."""
+        response = staff_client.post(reverse('profile-token'))
+
+        assert response.status_code == 200
+        assert response.data['header'] == 'X-Profile'
+
+    def test_token_endpoint_requires_staff(self, db):
+        """Test regular users cannot issue tokens."""
+        user = User.objects.create_user(email="user@example.com", first_name="John", last_name="Doe")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        assert client.post(reverse('profile-token')).status_code == 403
+
+
+class TestRequestProfiling:
+    """Test per-request profiling through the X-Profile header."""
+
+    def test_cpu_profile(self, staff, staff_client, tmp_path):
+        """Test a profiled request returns the ID of a downloadable pstats dump."""
+        response = APIClient().get(reverse('auth-verify'), HTTP_X_PROFILE=make_profile_token(staff))
+        profile_id = response['X-Profile-Id']
+
+        download = staff_client.get(reverse('profile-detail', kwargs={'profile_id': profile_id}))
+        path = tmp_path / 'request.prof'
+        path.write_bytes(download.content)
+
+        assert download.status_code == 200
+        assert download['Content-Disposition'].endswith(f'{profile_id}.prof"')
+        functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+        assert 'get' in functions
+
+    def test_memory_profile(self, staff):
+        """Test memory mode stores live allocations as collapsed stacks."""
+        response = APIClient().get(
+            reverse('auth-verify'), HTTP_X_PROFILE=make_profile_token(staff), HTTP_X_PROFILE_MODE='memory'
+        )
+
+        profile = get_profile(response['X-Profile-Id'])
+        assert profile['format'] == COLLAPSED
+        stack, size = profile['content'].decode().splitlines()[0].rsplit(' ', 1)
+        assert ':' in stack and int(size) > 0
+
+    def test_invalid_token(self, db):
+        """Test a bad token is refused before the view runs."""
+        response = APIClient().get(reverse('auth-verify'), HTTP_X_PROFILE='nope')
+
+        assert response.status_code == 403
+
+    def test_invalid_mode(self, staff):
+        """Test an unknown profiling mode is refused."""
+        response = APIClient().get(
+            reverse('auth-verify'), HTTP_X_PROFILE=make_profile_token(staff), HTTP_X_PROFILE_MODE='gpu'
+        )
+
+        assert response.status_code == 400
+
+    def test_download_requires_staff(self, db):
+        """Test profiles are only downloadable by staff."""
+        response = APIClient().get(reverse('profile-detail', kwargs={'profile_id': 'abc'}))
+
+        assert response.status_code == 401
+
+
+@pytest.mark.django_db
+class TestWorkerProfiling:
+    """Test signal-driven worker profiling."""
+
+    def test_signal_toggles_window(self):
+        """Test the signal starts a window and a second one stores both profiles."""
+        install_profiling_signal()
+
+        os.kill(os.getpid(), signal.SIGUSR2)
+        assert worker_profiler.active
+        os.kill(os.getpid(), signal.SIGUSR2)
+
+        assert not worker_profiler.active
+
+    def test_window_expires_on_next_request(self, settings):
+        """Test a window past PROFILE_WINDOW_SECONDS ends after the next request."""
+        settings.PROFILE_WINDOW_SECONDS = 0
+        worker_profiler.start()
+
+        APIClient().get(reverse('auth-verify'))
+
+        assert not worker_profiler.active
+
+    def test_cpu_request_profile_refused_during_window(self, staff):
+        """Test a per-request CPU profile is refused instead of replacing the worker profile."""
+        worker_profiler.start()
+        try:
+            response = APIClient().get(reverse('auth-verify'), HTTP_X_PROFILE=make_profile_token(staff))
+            assert response.status_code == 409
+            assert worker_profiler.active
+        finally:
+            worker_profiler.stop()
+
+    def test_stop_stores_cpu_and_memory(self):
+        """Test stopping stores a pstats and a collapsed stacks profile."""
+        worker_profiler.start()
+
+        profile_ids = worker_profiler.stop()
+
+        assert [get_profile(profile_id)['format'] for profile_id in profile_ids] == [PSTATS, COLLAPSED]
@@ -0,0 +1,485 @@
+import logging
+from contextlib import nullcontext
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import get_resolver, resolve, reverse
+from rest_framework.test import APIClient
+
+from apps.common.middleware import QueryBudgetMiddleware
+from apps.common.queries import (
+    QueryBudgetExceeded,
+    QueryCounter,
+    assert_query_budget,
+    fingerprint_sql,
+    get_query_budget,
+)
+from apps.common.redis import store_magic_link_jti
+from apps.identity.models import Plan, User
+from apps.orders.domain.cart import add_item, get_cart_key, get_line_id
+from apps.orders.models import Order, OrderItem
+from apps.sellers.models import Collection, CollectionProduct, Price, Product, ProductVariant, Seller
+from tests.benchmarks.test_endpoint_benchmarks import CASES, BenchmarkCase
+
+BUDGETED_PREFIXES = ('api/identity/', 'api/sellers/', 'api/orders/')
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+
+def get_routed_methods(callback) -> set[str]:
+    actions = getattr(callback, 'actions', None)
+    if actions is None:
+        actions = {method: method for method in HTTP_METHODS if hasattr(callback.cls, method)}
+    return {method.upper() for method in actions if method in HTTP_METHODS}
+
+
+def get_api_routes() -> dict[str, set[str]]:
+    """
+    Maps the name of every budgeted API URL to the HTTP methods it routes.
+    """
+    routes = {}
+
+    def walk(patterns, prefix=''):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if hasattr(pattern, 'url_patterns'):
+                walk(pattern.url_patterns, route)
+            elif pattern.name and route.startswith(BUDGETED_PREFIXES):
+                routes.setdefault(pattern.name, set()).update(get_routed_methods(pattern.callback))
+
+    walk(get_resolver().url_patterns)
+    return routes
+
+
+def get_api_url_names() -> set[str]:
+    return set(get_api_routes())
+
+
+class TestFingerprint:
+    """Test SQL fingerprinting."""
+
+    def test_parameters_are_normalized(self):
+        """Test queries differing only in literals share a fingerprint."""
+        first = fingerprint_sql("SELECT * FROM product WHERE id = 1 AND sku = 'A'")
+        second = fingerprint_sql("SELECT  *  FROM product WHERE id = 42 AND sku = 'B''s'")
+
+        assert first == second == 'SELECT * FROM product WHERE id = ? AND sku = ?'
+
+    def test_in_lists_collapse(self):
+        """Test IN lists of any length share a fingerprint."""
+        assert fingerprint_sql('WHERE id IN (%s, %s)') == fingerprint_sql('WHERE id IN (%s, %s, %s)')
+
+
+class TestBudgets:
+    """Test budget lookup and assertion."""
+
+    def test_per_method_budget(self, settings):
+        """Test a budget can be declared per HTTP method."""
+        settings.QUERY_BUDGETS = {'thing': {'GET': 1, 'POST': 4}, 'other': 2}
+
+        assert get_query_budget('thing', 'get') == 1
+        assert get_query_budget('thing') == 4
+        assert get_query_budget('other', 'DELETE') == 2
+        assert get_query_budget('missing') is None
+
+    def test_undeclared_budget(self):
+        """Test asserting against an undeclared URL name fails loudly."""
+        with pytest.raises(KeyError):
+            assert_query_budget('no-such-endpoint')
+
+    @pytest.mark.django_db
+    def test_exceeded_lists_repeated_queries(self):
+        """Test exceeding a budget reports the repeated query."""
+        with pytest.raises(QueryBudgetExceeded, match=r'3x SELECT') as excinfo:
+            with assert_query_budget(2):
+                for i in range(3):
+                    list(Product.objects.filter(id=i))
+
+        assert '3 queries' in str(excinfo.value)
+
+    @pytest.mark.django_db
+    def test_decorator(self):
+        """Test the assertion works as a decorator."""
+        @assert_query_budget(1)
+        def lookup():
+            return list(Product.objects.all())
+
+        assert lookup() == []
+
+    @pytest.mark.django_db
+    def test_counter_duplicates(self):
+        """Test the counter groups queries by fingerprint."""
+        with QueryCounter() as counter:
+            Product.objects.filter(id=1).exists()
+            Product.objects.filter(id=2).exists()
+            Seller.objects.count()
+
+        assert counter.count == 3
+        assert list(counter.duplicates().values()) == [2]
+
+
+class TestMiddleware:
+    """Test the QUERY_BUDGET_DEBUG middleware."""
+
+    def test_unused_without_debug(self, settings):
+        """Test the middleware drops out of the stack unless enabled."""
+        from django.core.exceptions import MiddlewareNotUsed
+        settings.QUERY_BUDGET_DEBUG = False
+
+        with pytest.raises(MiddlewareNotUsed):
+            QueryBudgetMiddleware(lambda request: HttpResponse())
+
+    @pytest.mark.django_db
+    def test_logs_requests_over_budget(self, settings, caplog):
+        """Test a request over its budget is logged with its repeated SQL."""
+        settings.QUERY_BUDGET_DEBUG = True
+        settings.QUERY_BUDGETS = {'plan-list': 1}
+
+        def view(request):
+            for i in range(3):
+                Product.objects.filter(id=i).exists()
+            return HttpResponse()
+
+        request = RequestFactory().get(reverse('plan-list'))
+        request.resolver_match = get_resolver().resolve(request.path)
+        with caplog.at_level(logging.WARNING, logger='apps.common.middleware'):
+            QueryBudgetMiddleware(view)(request)
+
+        assert 'plan-list' in caplog.text
+        assert '3x SELECT' in caplog.text
+
+
+def test_every_endpoint_has_a_budget(settings):
+    """Test every API URL declares a budget and no budget names a missing URL."""
+    names = get_api_url_names()
+
+    assert names - set(settings.QUERY_BUDGETS) == set()
+    assert set(settings.QUERY_BUDGETS) - names == set()
+
+
+@pytest.mark.django_db
+class TestEndpointBudgets:
+    """Test hot endpoints stay within budget with several related rows, catching N+1s."""
+
+    @pytest.fixture
+    def catalog(self):
+        owner = User.objects.create_user(email="owner@example.com", first_name="Sam", last_name="Seller")
+        buyer = User.objects.create_user(email="buyer@example.com", first_name="John", last_name="Doe")
+        seller = Seller.objects.create(user=owner, name="Seller", slug="seller", support_email="s@example.com")
+        products = [
+            Product.objects.create(seller=seller, name=f"Product {i}", sku=f"SKU-{i}", stock=5, is_published=True)
+            for i in range(5)
+        ]
+        prices = [
+            Price.objects.create(product=product, amount=1000 + i, currency='usd', is_default=True)
+            for i, product in enumerate(products)
+        ]
+        collection = Collection.objects.create(seller=seller, name="Featured", slug="featured", is_published=True)
+        CollectionProduct.objects.bulk_create([
+            CollectionProduct(collection=collection, product=product, position=i)
+            for i, product in enumerate(products)
+        ])
+        for _ in range(3):
+            order = Order.objects.create(seller=seller, user=buyer, total_amount=Decimal('20.00'))
+            for product, price in zip(products[:2], prices[:2]):
+                OrderItem.objects.create(
+                    order=order, product=product, price=price, quantity=1, unit_amount=Decimal('10.00')
+                )
+        return {'owner': owner, 'buyer': buyer, 'seller': seller, 'products': products, 'collection': collection}
+
+    def get(self, query_budget, name, path, user=None):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with query_budget(name, 'GET'):
+            response = client.get(path)
+        assert response.status_code == 200, response.data
+        return response
+
+    def test_product_list(self, catalog, query_budget):
+        """Test the product list does not query per product."""
+        path = reverse('product-list', kwargs={'identifier': 'seller'}) + '?currency=usd'
+        response = self.get(query_budget, 'product-list', path)
+
+        assert len(response.data) == 5
+
+    def test_product_facets(self, catalog, query_budget):
+        """Test facets are computed in a fixed number of queries."""
+        path = reverse('product-facets', kwargs={'identifier': 'seller'}) + '?currency=usd'
+        self.get(query_budget, 'product-facets', path)
+
+    def test_bulk_effective_prices(self, catalog, query_budget):
+        """Test bulk effective prices do not query per product."""
+        product_ids = ','.join(str(product.id) for product in catalog['products'])
+        path = reverse('price-bulk-effective', kwargs={'identifier': 'seller'}) + f"?product_ids={product_ids}"
+        response = self.get(query_budget, 'price-bulk-effective', path)
+
+        assert len(response.data) == 5
+
+    def test_collection_detail(self, catalog, query_budget):
+        """Test a collection renders its members without querying per member."""
+        path = reverse('collection-detail', kwargs={
+            'identifier': 'seller', 'collection_id': catalog['collection'].id
+        })
+        self.get(query_budget, 'collection-detail', path)
+
+    def test_buyer_orders(self, catalog, query_budget):
+        """Test the buyer order history does not query per order or item."""
+        response = self.get(query_budget, 'order-list', reverse('order-list'), catalog['buyer'])
+
+        assert len(response.data['results']) == 3
+
+    def test_seller_orders(self, catalog, query_budget):
+        """Test the seller order history does not query per order or item."""
+        path = reverse('seller-order-list', kwargs={'identifier': 'seller'})
+        response = self.get(query_budget, 'seller-order-list', path, catalog['owner'])
+
+        assert len(response.data['results']) == 3
+
+
+# Endpoints the benchmark cases do not reach, in the same build(data, i) form.
+# A spec's optional 'setup' runs before the request, outside the budget.
+
+def cart_line_setup(data):
+    add_item(get_cart_key(user_id=data['buyer'].id), data['product'].id, 1, 'usd')
+
+
+def cart_line_path(data):
+    return reverse('cart-item-detail', kwargs={'line_id': get_line_id(data['product'].id, 'usd')})
+
+
+def new_pending_order(data):
+    return Order.objects.create(seller=data['seller'], user=data['buyer'], total_amount=Decimal('10.00'))
+
+
+def auth_verify_post(data, i):
+    jti = f"budget-jti-{i}"
+    store_magic_link_jti(jti, str(data['buyer'].id), 60)
+    return {'method': 'post', 'path': reverse('auth-verify'), 'data': {'jti': jti}}
+
+
+def plan_create(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('plan-list'),
+        'data': {'code': f"new-{i}", 'name': "New", 'unit_amount': 900, 'currency': 'usd', 'interval': 'month'},
+        'user': data['buyer'],
+        'status': 201,
+    }
+
+
+def plan_update(data, i):
+    plan = data['plan']
+    return {
+        'method': 'put',
+        'path': reverse('plan-detail', kwargs={'pk': plan.id}),
+        'data': {'code': plan.code, 'name': f"Pro {i}", 'unit_amount': 2900, 'currency': 'usd', 'interval': 'month'},
+        'user': data['buyer'],
+    }
+
+
+def plan_partial_update(data, i):
+    return {
+        'method': 'patch',
+        'path': reverse('plan-detail', kwargs={'pk': data['plan'].id}),
+        'data': {'name': f"Pro {i}"},
+        'user': data['buyer'],
+    }
+
+
+def plan_destroy(data, i):
+    plan = Plan.objects.create(code=f"doomed-{i}", name="Doomed", unit_amount=100, interval="month")
+    return {
+        'method': 'delete',
+        'path': reverse('plan-detail', kwargs={'pk': plan.id}),
+        'user': data['buyer'],
+        'status': 204,
+    }
+
+
+def api_root(data, i):
+    return {'path': reverse('api-root'), 'user': data['buyer']}
+
+
+def order_list(data, i):
+    return {'path': reverse('order-list'), 'user': data['buyer']}
+
+
+def seller_order_list(data, i):
+    return {'path': reverse('seller-order-list', kwargs={'identifier': data['seller'].slug}), 'user': data['owner']}
+
+
+def seller_sales(data, i):
+    path = reverse('seller-sales', kwargs={'identifier': data['seller'].slug})
+    return {'path': path + '?start=2024-01-01T00:00:00Z&end=2024-02-01T00:00:00Z', 'user': data['owner']}
+
+
+def seller_order_transition(data, i):
+    order = new_pending_order(data)
+    return {
+        'method': 'patch',
+        'path': reverse('seller-order-transition', kwargs={'identifier': data['seller'].slug, 'order_id': order.id}),
+        'data': {'status': Order.Status.PROCESSING},
+        'user': data['owner'],
+    }
+
+
+def seller_order_bulk_transition(data, i):
+    orders = [new_pending_order(data) for _ in range(5)]
+    return {
+        'method': 'post',
+        'path': reverse('seller-order-bulk-transition', kwargs={'identifier': data['seller'].slug}),
+        'data': {
+            'order_ids': [order.id for order in orders],
+            'from_status': Order.Status.PENDING,
+            'status': Order.Status.PROCESSING,
+        },
+        'user': data['owner'],
+    }
+
+
+def cart_retrieve(data, i):
+    return {'path': reverse('cart-detail'), 'user': data['buyer'], 'setup': cart_line_setup}
+
+
+def cart_destroy(data, i):
+    return {'method': 'delete', 'path': reverse('cart-detail'), 'user': data['buyer'], 'status': 204}
+
+
+def cart_add(data, i):
+    return {
+        'method': 'post',
+        'path': reverse('cart-items'),
+        'data': {'product_id': data['product'].id, 'quantity': 1, 'currency': 'usd'},
+        'user': data['buyer'],
+        'status': 201,
+    }
+
+
+def cart_update_line(data, i):
+    return {
+        'method': 'patch',
+        'path': cart_line_path(data),
+        'data': {'quantity': 2},
+        'user': data['buyer'],
+        'setup': cart_line_setup,
+    }
+
+
+def cart_remove_line(data, i):
+    return {
+        'method': 'delete',
+        'path': cart_line_path(data),
+        'user': data['buyer'],
+        'status': 204,
+        'setup': cart_line_setup,
+    }
+
+
+def cart_validate(data, i):
+    return {'method': 'post', 'path': reverse('cart-validate'), 'user': data['buyer'], 'setup': cart_line_setup}
+
+
+BUDGET_CASES = CASES + [
+    BenchmarkCase(build.__name__.replace('_', '-'), build)
+    for build in [
+        auth_verify_post, plan_create, plan_update, plan_partial_update, plan_destroy,
+        api_root, order_list, seller_order_list, seller_sales, seller_order_transition, seller_order_bulk_transition,
+        cart_retrieve, cart_destroy, cart_add, cart_update_line, cart_remove_line, cart_validate,
+    ]
+]
+
+
+def get_budget_key(spec: dict) -> tuple[str, str]:
+    return resolve(spec['path'].split('?')[0]).url_name, spec.get('method', 'get').upper()
+
+
+def get_budget_keys(budgets: dict) -> set[tuple[str, str]]:
+    """
+    Lists the (URL name, method) pairs QUERY_BUDGETS covers. A plain count
+    covers every method its URL routes.
+    """
+    routes = get_api_routes()
+    keys = set()
+    for name, budget in budgets.items():
+        methods = budget if isinstance(budget, dict) else routes[name]
+        keys |= {(name, method) for method in methods}
+    return keys
+
+
+@pytest.fixture
+def endpoint_data(db):
+    """
+    A small version of the benchmark dataset, enough for every case to succeed.
+    """
+    plan = Plan.objects.create(code="pro", name="Pro", unit_amount=2900, interval="month")
+    owner = User.objects.create_user(email="owner@example.com", first_name="Sam", last_name="Seller")
+    buyer = User.objects.create_user(email="buyer@example.com", first_name="John", last_name="Doe")
+    seller = Seller.objects.create(user=owner, name="Seller", slug="seller", support_email="s@example.com")
+    products = [
+        Product.objects.create(
+            seller=seller, name=f"Product {i}", description="Product", sku=f"SKU-{i}", stock=5,
+            attributes={'color': 'red' if i % 2 else 'blue', 'size': 'm'}, is_published=True,
+        )
+        for i in range(5)
+    ]
+    prices = [
+        Price.objects.create(product=product, amount=1000 + i, currency='usd', is_default=True)
+        for i, product in enumerate(products)
+    ]
+    variants = [
+        ProductVariant.objects.create(product=products[0], sku=f"SKU-0-{size}", options={'size': size}, stock=5)
+        for size in ['s', 'm', 'l']
+    ]
+    collection = Collection.objects.create(
+        seller=seller, name="Featured", slug="featured", is_featured=True, is_published=True
+    )
+    CollectionProduct.objects.bulk_create([
+        CollectionProduct(collection=collection, product=product, position=i)
+        for i, product in enumerate(products)
+    ])
+    for _ in range(3):
+        order = Order.objects.create(seller=seller, user=buyer, total_amount=Decimal('20.00'))
+        for product, price in zip(products[:2], prices[:2]):
+            OrderItem.objects.create(order=order, product=product, price=price, quantity=1, unit_amount=Decimal('10.00'))
+    return {
+        'plan': plan,
+        'owner': owner,
+        'buyer': buyer,
+        'seller': seller,
+        'products': products,
+        'product': products[0],
+        'price': prices[0],
+        'variants': variants,
+        'collection': collection,
+    }
+
+
+def test_every_budget_is_exercised(settings, endpoint_data):
+    """Test every declared route and method has a case checking its budget."""
+    exercised = {get_budget_key(case.build(endpoint_data, 0)) for case in BUDGET_CASES}
+
+    assert get_budget_keys(settings.QUERY_BUDGETS) - exercised == set()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('case', BUDGET_CASES, ids=[case.name for case in BUDGET_CASES])
+def test_endpoint_within_budget(case, endpoint_data, query_budget, request):
+    """Test every endpoint stays within its QUERY_BUDGETS entry, reads and writes alike."""
+    if case.name.startswith('cart-'):
+        request.getfixturevalue('redis_client')
+    cache.clear()
+    client = APIClient()
+
+    # The first request warms caches a steady-state request would find filled
+    for i in range(2):
+        spec = case.build(endpoint_data, i)
+        if 'setup' in spec:
+            spec['setup'](endpoint_data)
+        client.force_authenticate(user=spec.get('user'))
+        call = getattr(client, spec.get('method', 'get'))
+        with query_budget(*get_budget_key(spec)) if i else nullcontext():
+            response = call(spec['path'], spec.get('data'), format=spec.get('format', 'json'), **spec.get('headers', {}))
+
+        assert response.status_code == spec.get('status', 200), getattr(response, 'data', '')
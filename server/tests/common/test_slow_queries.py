@@ -0,0 +1,157 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.common.models import SlowQuery
+from apps.common.slow_queries import make_sample, record_slow_query, to_json_param
+from apps.common.tasks import purge_slow_queries_task
+from apps.identity.models import User
+from apps.sellers.models import Product, Seller
+
+
+def test_params_survive_json():
+    """Test query parameters are converted to JSON values the database accepts."""
+    when = datetime(2026, 3, 14, 12, 0, tzinfo=dt_timezone.utc)
+
+    assert to_json_param(when) == '2026-03-14T12:00:00+00:00'
+    assert to_json_param(Decimal('9.99')) == '9.99'
+    assert to_json_param((1, 'a', None)) == [1, 'a', None]
+
+
+SAMPLE = {
+    'fingerprint': 'SELECT * FROM sellers_price WHERE product_id = ?',
+    'sql': 'SELECT * FROM sellers_price WHERE product_id = %s',
+    'params': ['int'],
+    'duration_ms': 512.5,
+    'view': 'price-list',
+    'frame': 'apps/sellers/views/price_views.py:40 in list',
+}
+
+
+class TestParamRedaction:
+    """Test parameter values only travel and persist where needed."""
+
+    SQL = 'SELECT * FROM identity_user WHERE email = %s AND id IN (%s, %s)'
+
+    def test_values_dropped_when_not_explained(self):
+        """Test a query that will not be explained only carries parameter types."""
+        sample = make_sample(self.SQL, ('buyer@example.com', 1, 2), 300)
+
+        assert sample['params'] == ['str', 'int', 'int']
+        assert 'explain_params' not in sample
+
+    def test_values_kept_for_explain(self, monkeypatch):
+        """Test values are sent along, apart from the redacted params, when the task explains the query."""
+        monkeypatch.setattr('apps.common.slow_queries.can_explain', lambda sql: True)
+
+        sample = make_sample(self.SQL, ('buyer@example.com', 1, 2), 300)
+
+        assert sample['params'] == ['str', 'int', 'int']
+        assert sample['explain_params'] == ['buyer@example.com', 1, 2]
+
+    @pytest.mark.django_db
+    def test_values_stored_only_when_enabled(self, settings, monkeypatch):
+        """Test stored samples keep redacted params unless SLOW_QUERY_STORE_PARAMS is set."""
+        monkeypatch.setattr('apps.common.slow_queries.can_explain', lambda sql: True)
+        monkeypatch.setattr('apps.common.slow_queries.explain_query', lambda sql, params: None)
+        sample = {
+            **make_sample(self.SQL, ('buyer@example.com', 1, 2), 300),
+            'fingerprint': 'SELECT * FROM identity_user WHERE email = ? AND id IN (...)',
+            'view': 'user-list',
+        }
+
+        assert record_slow_query(sample).params == ['str', 'int', 'int']
+        settings.SLOW_QUERY_STORE_PARAMS = True
+        assert record_slow_query(sample).params == ['buyer@example.com', 1, 2]
+
+
+@pytest.mark.django_db
+class TestSlowQuerySampler:
+    """Test slow queries are sampled from requests and stored."""
+
+    @pytest.fixture
+    def seller(self):
+        cache.clear()
+        user = User.objects.create_user(email="seller@example.com", first_name="Sam", last_name="Seller")
+        seller = Seller.objects.create(user=user, name="Seller", slug="slow", support_email="s@example.com")
+        Product.objects.create(seller=seller, name="Shirt", sku="SHIRT", is_published=True)
+        return seller
+
+    def test_samples_slow_queries_once_per_fingerprint(self, settings, seller):
+        """Test queries over the threshold are stored with their view and origin, throttled."""
+        settings.SLOW_QUERY_THRESHOLD_MS = 0.000001
+        url = reverse('product-list', kwargs={'identifier': seller.slug})
+
+        APIClient().get(url)
+        stored = SlowQuery.objects.count()
+        APIClient().get(url)
+
+        sample = SlowQuery.objects.filter(sql__contains='sellers_product').first()
+        assert sample.view == 'product-list'
+        assert sample.frame.startswith('apps/')
+        assert sample.plan is None
+        assert SlowQuery.objects.count() == stored
+        assert SlowQuery.objects.values('fingerprint_hash').distinct().count() == stored
+
+    def test_disabled_by_default_in_tests(self, seller):
+        """Test a zero threshold turns the sampler off."""
+        APIClient().get(reverse('product-list', kwargs={'identifier': seller.slug}))
+
+        assert not SlowQuery.objects.exists()
+
+
+@pytest.mark.django_db
+class TestSlowQueriesCommand:
+    """Test the slow_queries management command."""
+
+    @pytest.fixture
+    def sample(self):
+        return record_slow_query(SAMPLE)
+
+    def test_lists_fingerprints(self, sample):
+        """Test the listing shows each fingerprint with its worst duration and origin."""
+        out = StringIO()
+
+        call_command('slow_queries', stdout=out)
+
+        assert sample.fingerprint_hash in out.getvalue()
+        assert '512.5' in out.getvalue()
+        assert 'price_views.py:40' in out.getvalue()
+
+    def test_shows_one_sample(self, sample):
+        """Test a fingerprint shows its latest SQL and why there is no plan."""
+        out = StringIO()
+
+        call_command('slow_queries', sample.fingerprint_hash, stdout=out)
+
+        assert 'product_id = %s' in out.getvalue()
+        assert 'only captured on PostgreSQL' in out.getvalue()
+
+    def test_unknown_fingerprint(self):
+        """Test an unknown fingerprint is an error."""
+        with pytest.raises(CommandError):
+            call_command('slow_queries', 'missing')
+
+    def test_purge(self, sample):
+        """Test old samples are purged."""
+        SlowQuery.objects.update(created_at=datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+
+        call_command('slow_queries', purge_days=7, stdout=StringIO())
+
+        assert not SlowQuery.objects.exists()
+
+    def test_purge_task_uses_retention(self, sample, settings):
+        """Test the beat task deletes samples older than SLOW_QUERY_RETENTION_DAYS."""
+        settings.SLOW_QUERY_RETENTION_DAYS = 7
+        recent = record_slow_query(SAMPLE)
+        SlowQuery.objects.exclude(id=recent.id).update(created_at=datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+
+        assert purge_slow_queries_task() == 1
+        assert list(SlowQuery.objects.all()) == [recent]
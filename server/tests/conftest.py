@@ -30,3 +30,89 @@
 #         }
 #     }
 
+
+
+import os
+
+import pytest
+import redis
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption(
+        '--benchmark', action='store_true', default=False,
+        help='Run the endpoint benchmarks in tests/benchmarks.',
+    )
+    group.addoption(
+        '--benchmark-scale', type=float, default=1.0,
+        help='Fraction of the full benchmark dataset to seed (1.0 = 100k products).',
+    )
+    group.addoption(
+        '--benchmark-iterations', type=int, default=20,
+        help='Timed requests per endpoint.',
+    )
+    group.addoption(
+        '--benchmark-threshold', type=float, default=0.25,
+        help='Allowed latency and memory regression over the baseline, as a fraction.',
+    )
+    group.addoption(
+        '--benchmark-update', action='store_true', default=False,
+        help='Record the measured results as the new baselines instead of comparing.',
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+
+    skip = pytest.mark.skip(reason='Benchmarks only run with --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def fresh_plan_registry():
+    """
+    Drops the process-wide plan registry around each test.
+
+    Plan writes only invalidate it on commit, which never happens inside a test
+    transaction, so plans loaded by one test would otherwise leak into the next.
+    """
+    from apps.identity.domain.plan_registry import plan_registry
+    plan_registry.invalidate()
+    yield
+    plan_registry.invalidate()
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """
+    A real Redis connection for code that needs commands the test cache lacks.
+
+    Points get_raw_redis_client at TEST_REDIS_URL (database 15 by default, it
+    is flushed around each test) and skips the test when no server is reachable.
+    """
+    client = redis.Redis.from_url(os.getenv('TEST_REDIS_URL', 'redis://127.0.0.1:6379/15'))
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip('Redis is not available')
+
+    client.flushdb()
+    monkeypatch.setattr('apps.common.redis.get_redis_connection', lambda alias='default': client)
+    yield client
+    client.flushdb()
+
+
+@pytest.fixture
+def query_budget(db):
+    """
+    Asserts a block stays within a QUERY_BUDGETS entry or an explicit count.
+
+        with query_budget('product-list', 'GET'):
+            client.get(url)
+    """
+    from apps.common.queries import assert_query_budget
+    return assert_query_budget
@@ -0,0 +1,165 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from apps.common.redis import bump_cache_version, get_cache_version
+from apps.identity.domain.plan_registry import PLAN_VERSION_NAME, PlanRegistry, plan_registry
+from apps.identity.models import User, Plan
+
+
+@pytest.mark.django_db
+class TestPlanRegistry:
+    """Test suite for the in-process plan registry."""
+
+    def test_lookups_hit_memory_after_first_load(self):
+        """Test lookups after the first load run no queries."""
+        plan = Plan.objects.create(code="basic", name="Basic", unit_amount=100, interval="month")
+        registry = PlanRegistry()
+        registry.get(plan.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert registry.get(plan.id).code == "basic"
+            assert [p.code for p in registry.all()] == ["basic"]
+
+        assert len(queries) == 0
+
+    def test_active_excludes_inactive_plans(self):
+        """Test active() only returns active plans."""
+        Plan.objects.create(code="on", name="On", unit_amount=100, interval="month")
+        Plan.objects.create(code="off", name="Off", unit_amount=100, interval="month", is_active=False)
+
+        assert [plan.code for plan in PlanRegistry().active()] == ["on"]
+
+    def test_reloads_when_version_changes(self, settings):
+        """Test a bumped version makes the registry reload on the next check."""
+        settings.PLAN_REGISTRY_CHECK_SECONDS = 0
+        plan = Plan.objects.create(code="basic", name="Basic", unit_amount=100, interval="month")
+        registry = PlanRegistry()
+        registry.get(plan.id)
+
+        Plan.objects.filter(id=plan.id).update(name="Renamed")
+        assert registry.get(plan.id).name == "Basic"
+
+        bump_cache_version(PLAN_VERSION_NAME)
+        assert registry.get(plan.id).name == "Renamed"
+
+    def test_rolled_back_write_is_not_loaded(self):
+        """Test a plan write that rolls back never reaches the registry."""
+        plan_registry.all()
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Plan.objects.create(code="ghost", name="Ghost", unit_amount=100, interval="month")
+                assert plan_registry.all() == []
+                raise RuntimeError
+
+        assert plan_registry.all() == []
+
+    def test_missing_plan_returns_none(self):
+        """Test unknown plan IDs return None."""
+        assert PlanRegistry().get(99999) is None
+
+    def test_unknown_plans_force_one_check_per_interval(self, settings):
+        """Test lookups for unknown IDs re-check the version at most once per interval."""
+        settings.PLAN_REGISTRY_CHECK_SECONDS = 60
+        plan = Plan.objects.create(code="basic", name="Basic", unit_amount=100, interval="month")
+        registry = PlanRegistry()
+        registry.get(plan.id)
+        new_plan = Plan.objects.create(code="new", name="New", unit_amount=100, interval="month")
+        bump_cache_version(PLAN_VERSION_NAME)
+
+        assert registry.get(new_plan.id).code == "new"
+
+        with CaptureQueriesContext(connection) as queries:
+            bump_cache_version(PLAN_VERSION_NAME)
+            for pk in range(99990, 100000):
+                assert registry.get(pk) is None
+
+        assert len(queries) == 0
+
+    def test_sync_plans_bumps_version_on_commit(self, tmp_path, django_capture_on_commit_callbacks):
+        """Test sync_plans bumps the shared plan version after writing."""
+        path = tmp_path / "plans.json"
+        path.write_text(json.dumps([
+            {"code": "basic", "name": "Basic", "unit_amount": 100, "currency": "usd", "interval": "month"},
+        ]))
+        version = get_cache_version(PLAN_VERSION_NAME)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("sync_plans", path=str(path), stdout=StringIO())
+
+        assert get_cache_version(PLAN_VERSION_NAME) == version + 1
+        assert [plan.code for plan in plan_registry.all()] == ["basic"]
+
+
+class PlanViewSetTests(APITestCase):
+    """Test suite for PlanViewSet read endpoints."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.plan = Plan.objects.create(
+            code="plan_month",
+            name="Monthly Plan",
+            unit_amount=1000,
+            currency="usd",
+            interval="month",
+        )
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_returns_plans(self):
+        """Test list endpoint returns plans from the registry."""
+        url = reverse('plan-list')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([plan['code'] for plan in response.data['results']], ["plan_month"])
+
+    def test_retrieve_returns_plan(self):
+        """Test retrieve endpoint returns a single plan."""
+        url = reverse('plan-detail', kwargs={'pk': self.plan.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['code'], "plan_month")
+
+    def test_retrieve_unknown_plan_returns_404(self):
+        """Test retrieve endpoint returns 404 for unknown plans."""
+        url = reverse('plan-detail', kwargs={'pk': 99999})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_created_plan_is_visible_immediately(self):
+        """Test plans written through the API invalidate the registry."""
+        self.client.get(reverse('plan-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Plan.objects.create(code="plan_new", name="New", unit_amount=10, interval="month")
+
+        response = self.client.get(reverse('plan-list'))
+
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_user_retrieve_serializes_plan_without_query(self):
+        """Test the nested plan on user retrieve is read from the registry."""
+        self.user.plan = self.plan
+        self.user.save()
+        plan_registry.all()
+        url = reverse('user-detail', kwargs={'pk': self.user.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.data['plan']['code'], "plan_month")
+        self.assertFalse(any('identity_plan' in query['sql'] for query in queries))
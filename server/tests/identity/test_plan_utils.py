@@ -51,4 +51,41 @@ def test_compute_plan_changes(existing_plans, desired_plans, no_delete, expected
 
     assert [plan_attrs(p) for p in to_create] == [plan_attrs(p) for p in expected_create], "Create plans don't match"
     assert [plan_attrs(p) for p in to_update] == [plan_attrs(p) for p in expected_update], "Update plans don't match"
-    assert [plan_attrs(p) for p in to_delete] == [plan_attrs(p) for p in expected_delete], "Delete plans don't match"
\ No newline at end of file
+    assert [plan_attrs(p) for p in to_delete] == [plan_attrs(p) for p in expected_delete], "Delete plans don't match"
+
+def test_compute_plan_hash_ignores_key_order():
+    reordered = dict(reversed(list(PLAN_A_1.items())))
+    assert compute_plan_hash(reordered) == compute_plan_hash(PLAN_A_1)
+    assert compute_plan_hash(PLAN_A_2) != compute_plan_hash(PLAN_A_1)
+
+
+def test_compute_plan_hash_ignores_stored_hash():
+    assert compute_plan_hash({**PLAN_A_1, "content_hash": "stale"}) == compute_plan_hash(PLAN_A_1)
+
+
+@pytest.mark.parametrize(
+    "stored, payloads, no_delete, expected_changed, expected_removed",
+    [
+        ({"plan_a": PLAN_A_1}, [PLAN_A_1], False, [], set()),
+        ({"plan_a": PLAN_A_1}, [PLAN_A_2], False, ["plan_a"], set()),
+        ({"plan_a": PLAN_A_1}, [PLAN_A_1, PLAN_B_1], False, ["plan_b"], set()),
+        ({"plan_a": PLAN_A_1}, [PLAN_B_1], False, ["plan_b"], {"plan_a"}),
+        ({"plan_a": PLAN_A_1}, [PLAN_B_1], True, ["plan_b"], set()),
+    ],
+    ids=["unchanged", "changed", "added", "added_and_removed", "no_delete"]
+)
+def test_diff_plan_payloads(stored, payloads, no_delete, expected_changed, expected_removed):
+    stored_hashes = {code: compute_plan_hash(plan) for code, plan in stored.items()}
+
+    changed, removed = diff_plan_payloads(stored_hashes, iter(payloads), no_delete)
+
+    assert sorted(changed) == expected_changed
+    assert removed == expected_removed
+    for code, payload in changed.items():
+        assert payload["content_hash"] == compute_plan_hash(payload)
+
+
+def test_diff_plan_payloads_backfills_missing_hash():
+    changed, _ = diff_plan_payloads({"plan_a": ""}, [PLAN_A_1])
+
+    assert list(changed) == ["plan_a"]
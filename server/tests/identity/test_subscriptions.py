@@ -0,0 +1,187 @@
+import pytest
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.identity.models import User, Plan
+from apps.identity.domain.subscriptions import (
+    iter_subscription_batches,
+    notify_expiring_subscriptions,
+    process_expired_subscriptions,
+)
+from apps.identity.signals import (
+    subscription_expired,
+    subscription_expiring,
+    subscription_renewed,
+)
+
+
+@pytest.fixture
+def plans():
+    return {
+        'free': Plan.objects.create(
+            code="free_usd", name="Free", unit_amount=0, currency="usd", interval="year"
+        ),
+        'pro': Plan.objects.create(
+            code="pro_usd", name="Pro", unit_amount=500, currency="usd", interval="month"
+        ),
+        'pro_cad': Plan.objects.create(
+            code="pro_cad", name="Pro", unit_amount=500, currency="cad", interval="month"
+        ),
+    }
+
+
+def create_subscriber(email, plan, end_date):
+    user = User.objects.create_user(email=email, first_name="John", last_name="Doe")
+    user.plan = plan
+    user.plan_start_date = end_date - timedelta(days=30)
+    user.plan_end_date = end_date
+    user.save()
+    return user
+
+
+@pytest.fixture
+def captured_signals():
+    received = {}
+
+    def make_receiver(name):
+        def receiver(sender, user_ids, **kwargs):
+            received.setdefault(name, []).extend(user_ids)
+        return receiver
+
+    receivers = {
+        'renewed': (subscription_renewed, make_receiver('renewed')),
+        'expired': (subscription_expired, make_receiver('expired')),
+        'expiring': (subscription_expiring, make_receiver('expiring')),
+    }
+    for signal, receiver in receivers.values():
+        signal.connect(receiver)
+
+    yield received
+
+    for signal, receiver in receivers.values():
+        signal.disconnect(receiver)
+
+
+@pytest.mark.django_db
+class TestProcessExpiredSubscriptions:
+    """Test suite for the subscription expiry sweep."""
+
+    def test_free_plan_is_renewed(self, plans, captured_signals, django_capture_on_commit_callbacks):
+        """Test expired free plans renew for another period."""
+        now = timezone.now()
+        user = create_subscriber("free@example.com", plans['free'], now - timedelta(hours=1))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            totals = process_expired_subscriptions(now=now)
+
+        user.refresh_from_db()
+        assert totals == {'renewed': 1, 'expired': 0}
+        assert user.plan_id == plans['free'].id
+        assert user.plan_start_date == now
+        assert user.plan_end_date == now + timedelta(days=365)
+        assert captured_signals == {'renewed': [user.id]}
+
+    def test_paid_plan_falls_back_to_free_plan(self, plans, captured_signals, django_capture_on_commit_callbacks):
+        """Test expired paid plans are downgraded to the free plan in the same currency."""
+        now = timezone.now()
+        user = create_subscriber("pro@example.com", plans['pro'], now - timedelta(days=1))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            totals = process_expired_subscriptions(now=now)
+
+        user.refresh_from_db()
+        assert totals == {'renewed': 0, 'expired': 1}
+        assert user.plan_id == plans['free'].id
+        assert user.plan_end_date == now + timedelta(days=365)
+        assert captured_signals == {'expired': [user.id]}
+
+    def test_paid_plan_without_free_plan_is_cleared(self, plans):
+        """Test expired paid plans without a free fallback are cleared."""
+        now = timezone.now()
+        user = create_subscriber("cad@example.com", plans['pro_cad'], now - timedelta(days=1))
+
+        process_expired_subscriptions(now=now)
+
+        user.refresh_from_db()
+        assert user.plan is None
+        assert user.plan_start_date is None
+        assert user.plan_end_date is None
+
+    def test_active_subscriptions_are_untouched(self, plans):
+        """Test subscriptions that have not ended are left alone."""
+        now = timezone.now()
+        end_date = now + timedelta(days=3)
+        user = create_subscriber("active@example.com", plans['pro'], end_date)
+
+        totals = process_expired_subscriptions(now=now)
+
+        user.refresh_from_db()
+        assert totals == {'renewed': 0, 'expired': 0}
+        assert user.plan_id == plans['pro'].id
+        assert user.plan_end_date == end_date
+
+    def test_processes_every_batch(self, plans):
+        """Test the sweep walks all batches when there are more users than the batch size."""
+        now = timezone.now()
+        for i in range(5):
+            create_subscriber(f"user{i}@example.com", plans['pro'], now - timedelta(minutes=i))
+
+        totals = process_expired_subscriptions(now=now, batch_size=2)
+
+        assert totals == {'renewed': 0, 'expired': 5}
+        assert not User.objects.filter(plan=plans['pro']).exists()
+
+    def test_renewal_during_sweep_is_kept(self, plans, monkeypatch):
+        """Test a subscription renewed between the scan and the write is not downgraded."""
+        now = timezone.now()
+        user = create_subscriber("renew@example.com", plans['pro'], now - timedelta(days=1))
+
+        def scan_then_renew(queryset, batch_size=500):
+            for batch in iter_subscription_batches(queryset, batch_size):
+                User.objects.update_subscription(user.id, plans['pro'])
+                yield batch
+
+        monkeypatch.setattr('apps.identity.domain.subscriptions.iter_subscription_batches', scan_then_renew)
+        totals = process_expired_subscriptions(now=now)
+
+        user.refresh_from_db()
+        assert totals == {'renewed': 0, 'expired': 0}
+        assert user.plan_id == plans['pro'].id
+        assert user.plan_end_date > now
+
+
+@pytest.mark.django_db
+class TestIterSubscriptionBatches:
+    """Test suite for keyset batching over plan_end_date."""
+
+    def test_batches_cover_ties_on_end_date(self, plans):
+        """Test users sharing the same plan_end_date are neither skipped nor repeated."""
+        end_date = timezone.now()
+        users = [
+            create_subscriber(f"tie{i}@example.com", plans['pro'], end_date) for i in range(5)
+        ]
+
+        batches = list(iter_subscription_batches(User.objects.filter(plan__isnull=False), 2))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [user.id for batch in batches for user in batch] == [user.id for user in users]
+
+
+@pytest.mark.django_db
+class TestNotifyExpiringSubscriptions:
+    """Test suite for expiry notices."""
+
+    def test_only_paid_plans_in_window_are_notified(self, plans, captured_signals):
+        """Test notices cover paid plans ending inside the notice window only."""
+        now = timezone.now()
+        notice = timedelta(days=7)
+        window = timedelta(hours=1)
+        in_window = create_subscriber("soon@example.com", plans['pro'], now + notice)
+        create_subscriber("later@example.com", plans['pro'], now + notice + window)
+        create_subscriber("free@example.com", plans['free'], now + notice)
+
+        total = notify_expiring_subscriptions(notice, window, now=now)
+
+        assert total == 1
+        assert captured_signals == {'expiring': [in_window.id]}
@@ -0,0 +1,110 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.identity.models import Plan
+from apps.identity.domain.plans import compute_plan_hash
+
+
+PLANS = [
+    {"code": "free_usd", "name": "Free", "description": "Free plan", "unit_amount": 0, "currency": "usd", "interval": "year"},
+    {"code": "pro_usd", "name": "Pro", "description": "Pro plan", "unit_amount": 500, "currency": "usd", "interval": "month"},
+]
+
+
+def run_sync(path, **options):
+    out = StringIO()
+    call_command("sync_plans", path=str(path), stdout=out, **options)
+    return out.getvalue()
+
+
+@pytest.fixture
+def plans_file(tmp_path):
+    path = tmp_path / "plans.json"
+    path.write_text(json.dumps(PLANS))
+    return path
+
+
+@pytest.mark.django_db
+class TestSyncPlans:
+    """Test suite for the sync_plans management command."""
+
+    def test_creates_plans_with_content_hash(self, plans_file):
+        """Test new plans are created with their content hash stored."""
+        output = run_sync(plans_file)
+
+        assert "Created 2, Updated 0, Deleted 0" in output
+        for payload in PLANS:
+            assert Plan.objects.get(code=payload["code"]).content_hash == compute_plan_hash(payload)
+
+    def test_second_run_skips_unchanged_plans(self, plans_file, django_assert_max_num_queries):
+        """Test an unchanged file only reads stored hashes."""
+        run_sync(plans_file)
+
+        with django_assert_max_num_queries(1):
+            output = run_sync(plans_file)
+
+        assert "Plans already up to date" in output
+
+    def test_updates_only_changed_plans(self, plans_file):
+        """Test only plans whose payload changed are updated."""
+        run_sync(plans_file)
+        changed = [PLANS[0], {**PLANS[1], "unit_amount": 700}]
+        plans_file.write_text(json.dumps(changed))
+
+        output = run_sync(plans_file)
+
+        assert "Created 0, Updated 1, Deleted 0" in output
+        assert Plan.objects.get(code="pro_usd").unit_amount == 700
+
+    def test_backfills_hash_for_existing_rows(self, plans_file):
+        """Test rows created before hashing existed get their hash stored."""
+        Plan.objects.create(**PLANS[0])
+
+        run_sync(plans_file)
+
+        assert Plan.objects.get(code="free_usd").content_hash == compute_plan_hash(PLANS[0])
+
+    def test_repairs_plans_edited_outside_sync(self, plans_file):
+        """Test a plan saved through the ORM loses its hash and is restored from the file."""
+        run_sync(plans_file)
+        plan = Plan.objects.get(code="pro_usd")
+        plan.unit_amount = 999
+        plan.save(update_fields=["unit_amount"])
+        assert Plan.objects.get(code="pro_usd").content_hash == ""
+
+        output = run_sync(plans_file)
+
+        assert "Created 0, Updated 1, Deleted 0" in output
+        plan = Plan.objects.get(code="pro_usd")
+        assert plan.unit_amount == 500
+        assert plan.content_hash == compute_plan_hash(PLANS[1])
+
+    def test_deletes_removed_plans(self, plans_file):
+        """Test plans missing from the file are deleted unless --no-delete is set."""
+        run_sync(plans_file)
+        plans_file.write_text(json.dumps(PLANS[:1]))
+
+        run_sync(plans_file, no_delete=True)
+        assert Plan.objects.filter(code="pro_usd").exists()
+
+        output = run_sync(plans_file)
+        assert "Deleted 1" in output
+        assert not Plan.objects.filter(code="pro_usd").exists()
+
+    def test_stream_mode_matches_full_load(self, plans_file):
+        """Test --stream produces the same result as loading the file."""
+        run_sync(plans_file, stream=True)
+
+        assert set(Plan.objects.values_list("code", flat=True)) == {"free_usd", "pro_usd"}
+
+    def test_stream_mode_rejects_invalid_json(self, tmp_path):
+        """Test --stream reports malformed files as command errors."""
+        path = tmp_path / "plans.json"
+        path.write_text('{"code": "free_usd"}')
+
+        with pytest.raises(CommandError):
+            run_sync(path, stream=True)
@@ -0,0 +1,206 @@
+import pytest
+import redis
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.orders.domain.cart import (
+    CartError,
+    add_item,
+    get_cart,
+    get_cart_key,
+    is_valid_cart_id,
+    merge_carts,
+    remove_item,
+    set_quantity,
+    validate_cart,
+)
+from apps.sellers.models import Seller, Product, Price
+
+
+@pytest.fixture
+def seller(db):
+    user = User.objects.create_user(email="seller@example.com", first_name="John", last_name="Doe")
+    return Seller.objects.create(user=user, name="My Seller", slug="my-seller", support_email="s@example.com")
+
+
+@pytest.fixture
+def product(seller):
+    product = Product.objects.create(seller=seller, name="Mug", description="Mug", sku="MUG", stock=10)
+    Price.objects.create(product=product, amount=1500, currency=Currency.USD, is_default=True)
+    return product
+
+
+@pytest.fixture
+def shopper(db):
+    return User.objects.create_user(email="shopper@example.com", first_name="Jane", last_name="Smith")
+
+
+def test_cart_ids_are_validated():
+    """Test only generated cart IDs are accepted as anonymous cart keys."""
+    assert is_valid_cart_id("0" * 32)
+    assert not is_valid_cart_id("cart:user:1")
+    assert not is_valid_cart_id(None)
+
+
+@pytest.mark.django_db
+class TestCartDomain:
+    """Test suite for the Redis cart operations."""
+
+    def test_add_caches_the_price_and_increments(self, redis_client, product):
+        """Test repeated adds increment one line priced at add time."""
+        key = get_cart_key(cart_id="a" * 32)
+
+        add_item(key, product.id, 2, Currency.USD)
+        line = add_item(key, product.id, 3, Currency.USD)
+
+        assert line['quantity'] == 5
+        cart = get_cart(key)
+        assert [(line['product_id'], line['quantity'], line['unit_amount']) for line in cart['lines']] == [
+            (product.id, 5, 1500)
+        ]
+        assert cart['totals'] == {'usd': 7500}
+        assert 0 < redis_client.ttl(key) <= 7 * 24 * 60 * 60
+
+    def test_reads_do_not_query_the_database(self, redis_client, product, django_assert_num_queries):
+        """Test the cached line prices make reading a cart free of queries."""
+        key = get_cart_key(cart_id="a" * 32)
+        add_item(key, product.id, 1, Currency.USD)
+
+        with django_assert_num_queries(0):
+            get_cart(key)
+
+    def test_add_without_price_in_currency(self, redis_client, product):
+        """Test products cannot be added in a currency they are not sold in."""
+        with pytest.raises(CartError):
+            add_item(get_cart_key(cart_id="a" * 32), product.id, 1, Currency.CAD)
+
+    def test_quantity_limit(self, redis_client, product, settings):
+        """Test an add over the line limit is rolled back."""
+        settings.CART_MAX_QUANTITY = 5
+        key = get_cart_key(cart_id="a" * 32)
+        add_item(key, product.id, 4, Currency.USD)
+
+        with pytest.raises(CartError):
+            add_item(key, product.id, 2, Currency.USD)
+
+        assert get_cart(key)['lines'][0]['quantity'] == 4
+
+    def test_set_quantity_zero_removes(self, redis_client, product):
+        """Test setting a line to zero drops it."""
+        key = get_cart_key(cart_id="a" * 32)
+        line = add_item(key, product.id, 1, Currency.USD)
+
+        set_quantity(key, line['id'], 0)
+
+        assert get_cart(key)['lines'] == []
+
+    def test_set_quantity_does_not_revive_a_removed_line(self, redis_client, product, monkeypatch):
+        """Test a line removed between the existence check and the write stays removed."""
+        key = get_cart_key(cart_id="a" * 32)
+        line = add_item(key, product.id, 1, Currency.USD)
+        hexists = redis.client.Pipeline.hexists
+
+        def check_then_remove(pipe, *args):
+            exists = hexists(pipe, *args)
+            remove_item(key, line['id'])
+            return exists
+
+        monkeypatch.setattr(redis.client.Pipeline, 'hexists', check_then_remove)
+        with pytest.raises(CartError):
+            set_quantity(key, line['id'], 5)
+
+        assert get_cart(key)['lines'] == []
+        assert redis_client.hlen(key) == 0
+
+    def test_validate_does_not_revive_a_removed_line(self, redis_client, product, monkeypatch):
+        """Test refreshing prices skips a line removed while the cart was being validated."""
+        key = get_cart_key(cart_id="a" * 32)
+        line = add_item(key, product.id, 1, Currency.USD)
+        Price.objects.filter(product=product).update(amount=1800)
+        hmget = redis.client.Pipeline.hmget
+
+        def read_then_remove(pipe, *args):
+            snapshots = hmget(pipe, *args)
+            remove_item(key, line['id'])
+            return snapshots
+
+        monkeypatch.setattr(redis.client.Pipeline, 'hmget', read_then_remove)
+        validate_cart(key)
+
+        assert redis_client.hlen(key) == 0
+
+    def test_merge_adds_quantities_once(self, redis_client, product, shopper):
+        """Test merging moves the anonymous cart into the user cart exactly once."""
+        anonymous = get_cart_key(cart_id="a" * 32)
+        user = get_cart_key(user_id=shopper.id)
+        add_item(anonymous, product.id, 2, Currency.USD)
+        add_item(user, product.id, 1, Currency.USD)
+
+        assert merge_carts(anonymous, user) == 1
+        assert merge_carts(anonymous, user) == 0
+
+        assert get_cart(user)['lines'][0]['quantity'] == 3
+        assert not redis_client.exists(anonymous)
+
+    def test_validate_reports_and_refreshes(self, redis_client, product):
+        """Test validation flags price changes and stock, and refreshes the cached price."""
+        key = get_cart_key(cart_id="a" * 32)
+        add_item(key, product.id, 12, Currency.USD)
+        Price.objects.filter(product=product).update(amount=1800)
+        product.prices.get().save()
+
+        cart = validate_cart(key)
+
+        assert cart['lines'][0]['issues'] == ['price_changed', 'insufficient_stock']
+        assert cart['lines'][0]['unit_amount'] == 1800
+        assert not cart['is_valid']
+        assert get_cart(key)['lines'][0]['unit_amount'] == 1800
+
+
+@pytest.mark.django_db
+class TestCartViews:
+    """Test suite for the cart endpoints."""
+
+    def test_anonymous_cart_gets_an_id(self, redis_client, product):
+        """Test the first add creates an anonymous cart and returns its ID."""
+        client = APIClient()
+
+        response = client.post(reverse('cart-items'), {'product_id': product.id, 'quantity': 2}, format='json')
+
+        assert response.status_code == 201
+        cart_id = response['X-Cart-Id']
+        response = client.get(reverse('cart-detail'), HTTP_X_CART_ID=cart_id)
+        assert response.data['totals'] == {'usd': 3000}
+
+    def test_login_merges_the_anonymous_cart(self, redis_client, product, shopper):
+        """Test an authenticated request carrying the anonymous ID merges it."""
+        client = APIClient()
+        response = client.post(reverse('cart-items'), {'product_id': product.id}, format='json')
+        cart_id = response['X-Cart-Id']
+
+        client.force_authenticate(user=shopper)
+        response = client.get(reverse('cart-detail'), HTTP_X_CART_ID=cart_id)
+
+        assert response.data['lines'][0]['quantity'] == 1
+        assert 'X-Cart-Id' not in response
+
+    def test_update_and_remove_line(self, redis_client, product, shopper):
+        """Test lines can be updated and removed by their ID."""
+        client = APIClient()
+        client.force_authenticate(user=shopper)
+        client.post(reverse('cart-items'), {'product_id': product.id}, format='json')
+        line_url = reverse('cart-item-detail', kwargs={'line_id': f"{product.id}:usd"})
+
+        response = client.patch(line_url, {'quantity': 4}, format='json')
+        assert response.data['lines'][0]['quantity'] == 4
+
+        assert client.delete(line_url).status_code == 204
+        assert client.delete(line_url).status_code == 404
+
+    def test_unknown_product(self, redis_client, db):
+        """Test adding an unknown product is a validation error."""
+        response = APIClient().post(reverse('cart-items'), {'product_id': 999}, format='json')
+
+        assert response.status_code == 400
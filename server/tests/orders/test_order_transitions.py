@@ -0,0 +1,222 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.identity.models import User
+from apps.orders.domain.transitions import TransitionError, bulk_transition_orders, transition_order
+from apps.orders.models import Order, OrderItem, OrderTransition, SellerSalesRollup
+from apps.sellers.models import Seller, Product, Price
+
+
+@pytest.fixture
+def seller_user():
+    return User.objects.create_user(email="seller@example.com", first_name="Sam", last_name="Seller")
+
+
+@pytest.fixture
+def seller(seller_user):
+    return Seller.objects.create(
+        user=seller_user, name="Seller", slug="seller", support_email="s@example.com"
+    )
+
+
+@pytest.fixture
+def make_order(seller):
+    buyer = User.objects.create_user(email="buyer@example.com", first_name="John", last_name="Doe")
+    product = Product.objects.create(seller=seller, name="Shirt", sku="SHIRT")
+    price = Price.objects.create(product=product, amount=1000, currency="usd")
+
+    def make(order_status=Order.Status.PENDING):
+        order = Order.objects.create(
+            seller=seller, user=buyer, status=order_status, total_amount=Decimal("10.00")
+        )
+        OrderItem.objects.create(
+            order=order, product=product, price=price, quantity=1, unit_amount=Decimal("10.00")
+        )
+        return order
+
+    return make
+
+
+@pytest.fixture
+def client(seller_user):
+    client = APIClient()
+    client.force_authenticate(user=seller_user)
+    return client
+
+
+@pytest.mark.django_db
+class TestTransitionOrder:
+    """Test suite for single order transitions."""
+
+    def test_valid_transition_updates_status_and_logs(self, make_order):
+        """Test an allowed transition updates the order and writes a log row."""
+        order = make_order()
+
+        transition = transition_order(order, Order.Status.PROCESSING)
+
+        order.refresh_from_db()
+        assert order.status == Order.Status.PROCESSING
+        assert (transition.from_status, transition.to_status) == ("pending", "processing")
+
+    def test_invalid_transition_is_rejected(self, make_order):
+        """Test transitions outside the state machine raise TransitionError."""
+        order = make_order()
+
+        with pytest.raises(TransitionError):
+            transition_order(order, Order.Status.DELIVERED)
+
+    def test_stale_status_is_rejected(self, make_order):
+        """Test the conditional update fails when the status changed underneath."""
+        order = make_order()
+        Order.objects.filter(id=order.id).update(status=Order.Status.CANCELLED)
+
+        with pytest.raises(TransitionError):
+            transition_order(order, Order.Status.PROCESSING)
+
+        assert not OrderTransition.objects.exists()
+
+    def test_idempotency_key_replays_first_result(self, make_order):
+        """Test a retried request with the same key returns the first transition."""
+        order = make_order()
+        first = transition_order(order, Order.Status.PROCESSING, idempotency_key="retry-1")
+
+        second = transition_order(order, Order.Status.PROCESSING, idempotency_key="retry-1")
+
+        assert second.id == first.id
+        assert OrderTransition.objects.count() == 1
+
+    def test_idempotency_key_is_scoped_to_the_order(self, make_order):
+        """Test the same key on another order, e.g. another seller's, is a new transition."""
+        first = transition_order(make_order(), Order.Status.PROCESSING, idempotency_key="retry-1")
+
+        second = transition_order(make_order(), Order.Status.PROCESSING, idempotency_key="retry-1")
+
+        assert second.id != first.id
+        assert OrderTransition.objects.count() == 2
+
+    def test_idempotency_key_replay_with_other_status_is_rejected(self, make_order):
+        """Test reusing a key for a different target status raises instead of replaying."""
+        order = make_order()
+        transition_order(order, Order.Status.PROCESSING, idempotency_key="retry-1")
+
+        with pytest.raises(TransitionError):
+            transition_order(order, Order.Status.CANCELLED, idempotency_key="retry-1")
+
+        assert OrderTransition.objects.count() == 1
+
+    def test_transition_updates_sales_rollups(self, make_order, django_capture_on_commit_callbacks):
+        """Test entering a counted status adds the order to the rollups."""
+        order = make_order()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            transition_order(order, Order.Status.PROCESSING)
+
+        assert SellerSalesRollup.objects.get(granularity="day").order_count == 1
+
+
+@pytest.mark.django_db
+class TestBulkTransitionOrders:
+    """Test suite for bulk order transitions."""
+
+    def test_only_orders_in_source_status_change(self, make_order, django_assert_max_num_queries):
+        """Test orders already moved are skipped and the rest change in one statement."""
+        orders = [make_order(Order.Status.PROCESSING) for _ in range(3)]
+        Order.objects.filter(id=orders[0].id).update(status=Order.Status.CANCELLED)
+
+        # savepoint, UPDATE ... RETURNING, log INSERT, release
+        with django_assert_max_num_queries(4):
+            changed = bulk_transition_orders(
+                Order.objects.all(), [order.id for order in orders], "processing", "shipped"
+            )
+
+        assert sorted(changed) == [orders[1].id, orders[2].id]
+        assert OrderTransition.objects.filter(to_status="shipped").count() == 2
+        assert Order.objects.get(id=orders[0].id).status == Order.Status.CANCELLED
+
+    def test_changed_rows_are_not_locked_first(self, make_order):
+        """Test the bulk transition reads the changed rows back from the UPDATE, not a locking SELECT."""
+        orders = [make_order(Order.Status.PROCESSING) for _ in range(2)]
+
+        with CaptureQueriesContext(connection) as queries:
+            bulk_transition_orders(Order.objects.all(), [order.id for order in orders], "processing", "shipped")
+
+        statements = [query['sql'].upper() for query in queries]
+        assert any(sql.startswith('UPDATE') and 'RETURNING' in sql for sql in statements)
+        assert not any(sql.startswith('SELECT') for sql in statements)
+
+    def test_backends_without_returning_lock_the_candidates(self, make_order, monkeypatch):
+        """Test backends without UPDATE ... RETURNING fall back to locking the candidate rows."""
+        monkeypatch.setattr('apps.orders.domain.transitions._can_update_returning', lambda using: False)
+        orders = [make_order(Order.Status.PROCESSING) for _ in range(2)]
+        Order.objects.filter(id=orders[0].id).update(status=Order.Status.CANCELLED)
+
+        changed = bulk_transition_orders(Order.objects.all(), [order.id for order in orders], "processing", "shipped")
+
+        assert changed == [orders[1].id]
+        assert Order.objects.get(id=orders[1].id).status == Order.Status.SHIPPED
+
+    def test_retry_is_a_no_op(self, make_order):
+        """Test repeating a bulk transition changes nothing the second time."""
+        orders = [make_order(Order.Status.PROCESSING) for _ in range(2)]
+        ids = [order.id for order in orders]
+        bulk_transition_orders(Order.objects.all(), ids, "processing", "shipped")
+
+        assert bulk_transition_orders(Order.objects.all(), ids, "processing", "shipped") == []
+        assert OrderTransition.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestTransitionEndpoints:
+    """Test suite for the order transition endpoints."""
+
+    def test_transition_endpoint(self, client, seller, make_order):
+        """Test the single order endpoint applies a transition."""
+        order = make_order()
+        url = reverse('seller-order-transition', kwargs={'identifier': seller.slug, 'order_id': order.id})
+
+        response = client.patch(url, {'status': 'processing'}, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+        retry = client.patch(url, {'status': 'processing'}, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+
+        assert response.status_code == 200
+        assert response.data['to_status'] == "processing"
+        assert retry.status_code == 200
+        assert retry.json()['id'] == response.data['id']
+
+    def test_transition_endpoint_conflict(self, client, seller, make_order):
+        """Test an invalid transition returns 409."""
+        order = make_order()
+        url = reverse('seller-order-transition', kwargs={'identifier': seller.slug, 'order_id': order.id})
+
+        response = client.patch(url, {'status': 'delivered'}, format='json')
+
+        assert response.status_code == 409
+
+    def test_transition_endpoint_forbidden_for_non_owner(self, seller, make_order):
+        """Test only the seller's owner can transition orders."""
+        order = make_order()
+        client = APIClient()
+        client.force_authenticate(user=order.user)
+        url = reverse('seller-order-transition', kwargs={'identifier': seller.slug, 'order_id': order.id})
+
+        response = client.patch(url, {'status': 'processing'}, format='json')
+
+        assert response.status_code == 403
+
+    def test_bulk_transition_endpoint(self, client, seller, make_order):
+        """Test the bulk endpoint reports updated and skipped orders."""
+        orders = [make_order(Order.Status.PROCESSING), make_order(Order.Status.PENDING)]
+        url = reverse('seller-order-bulk-transition', kwargs={'identifier': seller.slug})
+
+        response = client.post(url, {
+            'order_ids': [order.id for order in orders],
+            'from_status': 'processing',
+            'status': 'shipped',
+        }, format='json')
+
+        assert response.status_code == 200
+        assert response.data == {'updated': [orders[0].id], 'skipped': [orders[1].id]}
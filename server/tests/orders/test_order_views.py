@@ -0,0 +1,179 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from apps.identity.models import User
+from apps.orders.models import Order, OrderItem
+from apps.sellers.models import Seller, Product, Price
+from apps.common.model_utils import Currency
+
+
+class OrderViewSetTests(APITestCase):
+    """Test suite for order history endpoints."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.seller_user = User.objects.create_user(
+            email="seller@example.com",
+            first_name="Sam",
+            last_name="Seller"
+        )
+        self.buyer = User.objects.create_user(
+            email="buyer@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.other_buyer = User.objects.create_user(
+            email="other@example.com",
+            first_name="Jane",
+            last_name="Smith"
+        )
+
+        self.seller = Seller.objects.create(
+            user=self.seller_user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.product = Product.objects.create(
+            seller=self.seller,
+            name="Test Product",
+            sku="TEST-001",
+            stock=10
+        )
+        self.price = Price.objects.create(
+            product=self.product,
+            amount=1000,
+            currency=Currency.USD,
+            is_default=True
+        )
+
+        self.now = timezone.now()
+        self.orders = [
+            self.create_order(self.buyer, Order.Status.PENDING, self.now - timedelta(days=3)),
+            self.create_order(self.buyer, Order.Status.SHIPPED, self.now - timedelta(days=2)),
+            self.create_order(self.buyer, Order.Status.SHIPPED, self.now - timedelta(days=1)),
+            self.create_order(self.other_buyer, Order.Status.DELIVERED, self.now),
+        ]
+
+    def create_order(self, user, order_status, created_at, items=2):
+        order = Order.objects.create(
+            seller=self.seller,
+            user=user,
+            status=order_status,
+            total_amount=Decimal('20.00')
+        )
+        for _ in range(items):
+            OrderItem.objects.create(
+                order=order,
+                product=self.product,
+                price=self.price,
+                quantity=1,
+                unit_amount=Decimal('10.00'),
+                currency=Currency.USD
+            )
+        Order.objects.filter(id=order.id).update(created_at=created_at)
+        return order
+
+    # Buyer history
+    def test_buyer_list_requires_authentication(self):
+        """Test buyer history requires authentication."""
+        response = self.client.get(reverse('order-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_buyer_list_returns_own_orders_newest_first(self):
+        """Test buyer history only includes the buyer's orders, newest first."""
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.get(reverse('order-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [order['id'] for order in response.data['results']]
+        self.assertEqual(ids, [self.orders[2].id, self.orders[1].id, self.orders[0].id])
+        self.assertEqual(len(response.data['results'][0]['items']), 2)
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_buyer_list_uses_two_queries(self):
+        """Test a page of orders and their items costs two queries."""
+        self.client.force_authenticate(user=self.buyer)
+
+        with self.assertNumQueries(2):
+            self.client.get(reverse('order-list'))
+
+    def test_buyer_list_filters_by_status(self):
+        """Test buyer history filters on status."""
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.get(reverse('order-list'), {'status': 'shipped'})
+
+        ids = [order['id'] for order in response.data['results']]
+        self.assertEqual(ids, [self.orders[2].id, self.orders[1].id])
+
+    def test_buyer_list_filters_by_date_range(self):
+        """Test buyer history filters on a created_at range."""
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.get(reverse('order-list'), {
+            'created_after': (self.now - timedelta(days=2, hours=1)).isoformat(),
+            'created_before': (self.now - timedelta(hours=12)).isoformat(),
+        })
+
+        ids = [order['id'] for order in response.data['results']]
+        self.assertEqual(ids, [self.orders[2].id, self.orders[1].id])
+
+    def test_buyer_list_with_invalid_status(self):
+        """Test an unknown status returns 400."""
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.get(reverse('order-list'), {'status': 'lost'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data['errors'])
+
+    def test_buyer_list_paginates_with_cursor(self):
+        """Test the cursor walks every order exactly once, including created_at ties."""
+        Order.objects.filter(user=self.buyer).update(created_at=self.now)
+        self.client.force_authenticate(user=self.buyer)
+
+        first = self.client.get(reverse('order-list'), {'limit': 2})
+        second = self.client.get(reverse('order-list'), {'limit': 2, 'cursor': first.data['next_cursor']})
+
+        ids = [order['id'] for order in first.data['results'] + second.data['results']]
+        self.assertEqual(sorted(ids), sorted(order.id for order in self.orders[:3]))
+        self.assertEqual(len(first.data['results']), 2)
+        self.assertIsNone(second.data['next_cursor'])
+
+    def test_buyer_list_with_invalid_cursor(self):
+        """Test a malformed cursor returns 400."""
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.get(reverse('order-list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Seller history
+    def test_seller_list_returns_all_seller_orders(self):
+        """Test seller history includes orders from every buyer."""
+        self.client.force_authenticate(user=self.seller_user)
+        url = reverse('seller-order-list', kwargs={'identifier': self.seller.slug})
+        response = self.client.get(url, {'status': 'delivered'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [order['id'] for order in response.data['results']]
+        self.assertEqual(ids, [self.orders[3].id])
+
+    def test_seller_list_forbidden_for_non_owner(self):
+        """Test seller history is only visible to the seller's owner."""
+        self.client.force_authenticate(user=self.buyer)
+        url = reverse('seller-order-list', kwargs={'identifier': self.seller.slug})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_seller_list_with_unknown_seller(self):
+        """Test seller history for an unknown seller returns 404."""
+        self.client.force_authenticate(user=self.seller_user)
+        url = reverse('seller-order-list', kwargs={'identifier': 'missing'})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
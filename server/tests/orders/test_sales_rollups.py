@@ -0,0 +1,200 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.identity.models import User
+from apps.orders.domain.rollups import get_rollup_sign, refresh_sales_rollups
+from apps.orders.models import Order, OrderItem, ProductSalesRollup, SellerSalesRollup
+from apps.orders.signals import order_status_changed
+from apps.sellers.models import Seller, Product, Price
+
+
+CREATED_AT = datetime(2026, 3, 14, 15, 30, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def catalog():
+    user = User.objects.create_user(email="seller@example.com", first_name="Sam", last_name="Seller")
+    buyer = User.objects.create_user(email="buyer@example.com", first_name="John", last_name="Doe")
+    seller = Seller.objects.create(user=user, name="Seller", slug="seller", support_email="s@example.com")
+    shirt = Product.objects.create(seller=seller, name="Shirt", sku="SHIRT")
+    hat = Product.objects.create(seller=seller, name="Hat", sku="HAT")
+    return {
+        'user': user,
+        'buyer': buyer,
+        'seller': seller,
+        'shirt': (shirt, Price.objects.create(product=shirt, amount=1500, currency="usd")),
+        'hat': (hat, Price.objects.create(product=hat, amount=1000, currency="usd")),
+    }
+
+
+def create_order(catalog, lines, order_status=Order.Status.PROCESSING, created_at=CREATED_AT):
+    total = sum(Decimal(price.amount) / 100 * quantity for (_, price), quantity in lines)
+    order = Order.objects.create(
+        seller=catalog['seller'], user=catalog['buyer'], status=order_status, total_amount=total
+    )
+    for (product, price), quantity in lines:
+        OrderItem.objects.create(
+            order=order,
+            product=product,
+            price=price,
+            quantity=quantity,
+            unit_amount=Decimal(price.amount) / 100,
+            currency=price.currency,
+        )
+    Order.objects.filter(id=order.id).update(created_at=created_at)
+    return Order.objects.prefetch_related('items').get(id=order.id)
+
+
+def seller_rollup(catalog, granularity):
+    return SellerSalesRollup.objects.get(seller=catalog['seller'], granularity=granularity)
+
+
+@pytest.mark.parametrize(
+    "from_status, to_status, expected",
+    [
+        (None, "pending", 0),
+        ("pending", "processing", 1),
+        (None, "processing", 1),
+        ("processing", "shipped", 0),
+        ("shipped", "cancelled", -1),
+        ("pending", "cancelled", 0),
+    ],
+)
+def test_get_rollup_sign(from_status, to_status, expected):
+    assert get_rollup_sign(from_status, to_status) == expected
+
+
+@pytest.mark.django_db
+class TestSalesRollups:
+    """Test suite for incremental sales rollups."""
+
+    def test_refresh_builds_hourly_and_daily_buckets(self, catalog):
+        """Test an order lands in its hour and day buckets for seller and products."""
+        order = create_order(catalog, [(catalog['shirt'], 2), (catalog['hat'], 1)])
+
+        refresh_sales_rollups([order.id])
+
+        hourly = seller_rollup(catalog, "hour")
+        daily = seller_rollup(catalog, "day")
+        assert hourly.bucket_start == datetime(2026, 3, 14, 15, tzinfo=dt_timezone.utc)
+        assert daily.bucket_start == datetime(2026, 3, 14, tzinfo=dt_timezone.utc)
+        assert (daily.order_count, daily.gross_amount, daily.units_sold) == (1, Decimal("40.00"), 3)
+
+        shirt = ProductSalesRollup.objects.get(product=catalog['shirt'][0], granularity="day")
+        assert (shirt.order_count, shirt.gross_amount, shirt.units_sold) == (1, Decimal("30.00"), 2)
+
+    def test_refresh_adds_and_removes_orders(self, catalog):
+        """Test refreshing after a status change adds or drops the order from its buckets."""
+        first = create_order(catalog, [(catalog['shirt'], 1)])
+        second = create_order(catalog, [(catalog['shirt'], 3)])
+
+        refresh_sales_rollups([first.id])
+        refresh_sales_rollups([second.id])
+        Order.objects.filter(id=first.id).update(status=Order.Status.CANCELLED)
+        refresh_sales_rollups([first.id])
+
+        daily = seller_rollup(catalog, "day")
+        assert (daily.order_count, daily.gross_amount, daily.units_sold) == (1, Decimal("45.00"), 3)
+        shirt = ProductSalesRollup.objects.get(product=catalog['shirt'][0], granularity="day")
+        assert (shirt.order_count, shirt.units_sold) == (1, 3)
+
+    def test_refresh_is_idempotent(self, catalog):
+        """Test refreshing the same orders twice, as a redelivered task would, counts them once."""
+        order = create_order(catalog, [(catalog['hat'], 2)])
+
+        refresh_sales_rollups([order.id])
+        refresh_sales_rollups([order.id])
+
+        daily = seller_rollup(catalog, "day")
+        assert (daily.order_count, daily.gross_amount, daily.units_sold) == (1, Decimal("20.00"), 2)
+
+    def test_items_are_rolled_up_in_their_own_currency(self, catalog):
+        """Test an order mixing currencies counts in each currency's bucket."""
+        shirt = catalog['shirt'][0]
+        cad_price = Price.objects.create(product=shirt, amount=2000, currency="cad")
+        order = create_order(catalog, [(catalog['hat'], 1), ((shirt, cad_price), 1)])
+
+        refresh_sales_rollups([order.id])
+
+        daily = {
+            rollup.currency: (rollup.order_count, rollup.gross_amount)
+            for rollup in SellerSalesRollup.objects.filter(granularity="day")
+        }
+        assert daily == {"usd": (1, Decimal("10.00")), "cad": (1, Decimal("20.00"))}
+
+    def test_status_change_signal_updates_rollups(self, catalog, django_capture_on_commit_callbacks):
+        """Test order_status_changed queues a rollup update on commit."""
+        order = create_order(catalog, [(catalog['hat'], 1)])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            order_status_changed.send(
+                sender=Order, order_ids=[order.id], from_status="pending", to_status="processing"
+            )
+
+        assert seller_rollup(catalog, "day").order_count == 1
+
+    def test_backfill_rebuilds_rollups_from_history(self, catalog):
+        """Test the backfill command recomputes rollups in chunks, skipping uncounted orders."""
+        create_order(catalog, [(catalog['shirt'], 1)])
+        create_order(catalog, [(catalog['hat'], 2)], order_status=Order.Status.DELIVERED)
+        create_order(catalog, [(catalog['hat'], 5)], order_status=Order.Status.CANCELLED)
+        SellerSalesRollup.objects.create(
+            seller=catalog['seller'], granularity="day", bucket_start=CREATED_AT, order_count=99
+        )
+
+        call_command("backfill_sales_rollups", chunk_size=1, stdout=StringIO())
+
+        daily = seller_rollup(catalog, "day")
+        assert (daily.order_count, daily.gross_amount, daily.units_sold) == (2, Decimal("35.00"), 3)
+        assert SellerSalesRollup.objects.filter(order_count=99).count() == 0
+
+    def test_backfill_locks_and_rebuilds_each_seller(self, catalog, monkeypatch):
+        """Test the backfill rebuilds sellers one at a time under the refresh lock."""
+        create_order(catalog, [(catalog['shirt'], 1)])
+        other_user = User.objects.create_user(email="other@example.com", first_name="Oli", last_name="Other")
+        other = Seller.objects.create(user=other_user, name="Other", slug="other", support_email="o@example.com")
+        SellerSalesRollup.objects.create(seller=other, granularity="day", bucket_start=CREATED_AT, order_count=7)
+        locked = []
+        monkeypatch.setattr(
+            'apps.orders.management.commands.backfill_sales_rollups.lock_seller_rollups', locked.append
+        )
+
+        call_command("backfill_sales_rollups", chunk_size=1, stdout=StringIO())
+
+        assert locked == [catalog['seller'].id, other.id]
+        assert seller_rollup(catalog, "day").order_count == 1
+        assert not SellerSalesRollup.objects.filter(seller=other).exists()
+
+    def test_sales_endpoint_returns_rollups(self, catalog):
+        """Test the seller sales endpoint reads rollups in the requested range."""
+        refresh_sales_rollups([create_order(catalog, [(catalog['shirt'], 2)]).id])
+        client = APIClient()
+        client.force_authenticate(user=catalog['user'])
+        url = reverse('seller-sales', kwargs={'identifier': catalog['seller'].slug})
+
+        response = client.get(url, {
+            'granularity': 'hour',
+            'start': '2026-03-14T00:00:00Z',
+            'end': '2026-03-15T00:00:00Z',
+        })
+
+        assert response.status_code == 200
+        assert len(response.data) == 1
+        assert response.data[0]['units_sold'] == 2
+        assert response.data[0]['gross_amount'] == "30.00"
+
+    def test_sales_endpoint_forbidden_for_non_owner(self, catalog):
+        """Test the sales endpoint is only visible to the seller's owner."""
+        client = APIClient()
+        client.force_authenticate(user=catalog['buyer'])
+        url = reverse('seller-sales', kwargs={'identifier': catalog['seller'].slug})
+
+        response = client.get(url, {'start': '2026-03-14T00:00:00Z', 'end': '2026-03-15T00:00:00Z'})
+
+        assert response.status_code == 403
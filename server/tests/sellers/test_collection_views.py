@@ -0,0 +1,208 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.sellers.models import Collection, CollectionProduct, Seller, Product, Price
+
+
+class CollectionViewSetTests(APITestCase):
+    """Test suite for CollectionViewSet endpoints."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.other_user = User.objects.create_user(
+            email="other@example.com",
+            first_name="Jane",
+            last_name="Smith"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(
+                seller=self.seller, name=f"Product {i}", description="Product", sku=f"SKU-{i}"
+            )
+            Price.objects.create(product=product, amount=1000 + i, currency=Currency.USD)
+            self.products.append(product)
+
+        self.collection = Collection.objects.create(
+            seller=self.seller, name="Summer", slug="summer", is_published=True, is_featured=True
+        )
+        self.detail_url = reverse('collection-detail', kwargs={
+            'identifier': self.seller.slug, 'collection_id': self.collection.id
+        })
+        self.products_url = reverse('collection-products', kwargs={
+            'identifier': self.seller.slug, 'collection_id': self.collection.id
+        })
+
+    def _add(self, products):
+        CollectionProduct.objects.bulk_create([
+            CollectionProduct(collection=self.collection, product=product, position=position)
+            for position, product in enumerate(products)
+        ])
+
+    def test_create_collection(self):
+        """Test the owner can create a collection."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('collection-list', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.post(url, {'name': 'Winter', 'slug': 'winter'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['slug'], 'winter')
+
+    def test_create_duplicate_slug(self):
+        """Test collection slugs are unique per seller."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('collection-list', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.post(url, {'name': 'Summer', 'slug': 'summer'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_featured_hides_unpublished(self):
+        """Test the public list only shows published collections."""
+        Collection.objects.create(seller=self.seller, name="Draft", slug="draft", is_featured=True)
+        url = reverse('collection-list', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.get(url, {'is_featured': 'true'})
+
+        self.assertEqual([collection['slug'] for collection in response.data], ['summer'])
+
+    def test_add_products_appends_in_order(self):
+        """Test added products go to the end and current members are skipped."""
+        self._add(self.products[:1])
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.products_url, {
+            'product_ids': [self.products[2].id, self.products[0].id, self.products[1].id]
+        }, format='json')
+
+        self.assertEqual(response.data, {'added': 2})
+        self.assertEqual(
+            list(self.collection.memberships.order_by('position').values_list('product_id', flat=True)),
+            [self.products[0].id, self.products[2].id, self.products[1].id]
+        )
+
+    def test_add_foreign_product(self):
+        """Test products of other sellers cannot be added."""
+        other_seller = Seller.objects.create(
+            user=self.other_user, name="Other", slug="other", support_email="s@other.com"
+        )
+        foreign = Product.objects.create(seller=other_seller, name="F", description="F", sku="F")
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.products_url, {'product_ids': [foreign.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reorder_is_a_single_update(self):
+        """Test reordering rewrites every position in one statement."""
+        self._add(self.products)
+        self.client.force_authenticate(user=self.user)
+        order = [self.products[2].id, self.products[0].id, self.products[1].id]
+
+        # seller, collection, member lock, UPDATE, plus savepoint and release
+        with self.assertNumQueries(6):
+            response = self.client.put(self.products_url, {'product_ids': order}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(self.collection.memberships.order_by('position').values_list('product_id', flat=True)),
+            order
+        )
+
+    def test_partial_reorder_keeps_unlisted_positions(self):
+        """Test listed members swap among their own positions and the others stay put."""
+        self._add(self.products)
+        self.client.force_authenticate(user=self.user)
+        first, second, third = self.products
+
+        response = self.client.put(self.products_url, {'product_ids': [third.id, first.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(self.collection.memberships.order_by('position').values_list('product_id', flat=True)),
+            [third.id, second.id, first.id]
+        )
+
+    def test_reorder_rejects_non_members_and_repeats(self):
+        """Test products outside the collection or listed twice are rejected."""
+        self._add(self.products[:2])
+        self.client.force_authenticate(user=self.user)
+
+        for product_ids in ([self.products[0].id, self.products[2].id], [self.products[0].id] * 2):
+            with self.subTest(product_ids=product_ids):
+                response = self.client.put(self.products_url, {'product_ids': product_ids}, format='json')
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_remove_products(self):
+        """Test members can be removed."""
+        self._add(self.products)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.delete(self.products_url, {'product_ids': [self.products[0].id]}, format='json')
+
+        self.assertEqual(response.data, {'removed': 1})
+        self.assertEqual(self.collection.memberships.count(), 2)
+
+    def test_retrieve_returns_members_with_prices(self):
+        """Test members come back in position order with their current prices."""
+        self._add(list(reversed(self.products)))
+
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [product['id'] for product in response.data['products']],
+            [product.id for product in reversed(self.products)]
+        )
+        self.assertEqual(response.data['products'][0]['prices'][0]['amount'], 1002)
+
+    def test_retrieve_is_constant_queries_and_cached(self):
+        """Test rendering does not query per member and a repeat hits the cache."""
+        self._add(self.products)
+
+        # seller, collection, members with products, prices
+        with self.assertNumQueries(4):
+            self.client.get(self.detail_url)
+
+        # seller, collection
+        with self.assertNumQueries(2):
+            self.client.get(self.detail_url)
+
+    def test_membership_change_invalidates_cache(self):
+        """Test reordering drops the cached rendering."""
+        self._add(self.products)
+        self.client.get(self.detail_url)
+        self.client.force_authenticate(user=self.user)
+        order = [product.id for product in reversed(self.products)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.products_url, {'product_ids': order}, format='json')
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual([product['id'] for product in response.data['products']], order)
+
+    def test_unpublished_collection_hidden_from_public(self):
+        """Test unpublished collections return 404 to non-owners."""
+        self.collection.is_published = False
+        self.collection.save()
+
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.sellers.domain.prices import resolve_price, resolve_prices
+from apps.sellers.models import Seller, Product, Price
+
+
+class PriceResolutionTests(APITestCase):
+    """Test suite for effective price resolution."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.now = timezone.now()
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.product = Product.objects.create(
+            seller=self.seller,
+            name="Test Product",
+            description="A test product",
+            sku="TEST-001",
+        )
+        self.base = Price.objects.create(
+            product=self.product, amount=1000, currency=Currency.USD, is_default=True
+        )
+        self.cad = Price.objects.create(product=self.product, amount=1300, currency=Currency.CAD)
+
+    def test_default_price_wins_without_windows(self):
+        """Test the default price is picked over other open-ended prices."""
+        Price.objects.create(product=self.product, amount=900, currency=Currency.USD)
+
+        self.assertEqual(resolve_price(self.product.id, Currency.USD), self.base)
+
+    def test_scheduled_sale_overrides_base_price(self):
+        """Test a price whose window contains the instant beats the base price."""
+        sale = Price.objects.create(
+            product=self.product,
+            amount=800,
+            currency=Currency.USD,
+            valid_from=self.now - timedelta(days=1),
+            valid_to=self.now + timedelta(days=1),
+        )
+
+        self.assertEqual(resolve_price(self.product.id, Currency.USD, self.now), sale)
+        self.assertEqual(
+            resolve_price(self.product.id, Currency.USD, self.now + timedelta(days=2)), self.base
+        )
+
+    def test_inactive_and_expired_prices_are_ignored(self):
+        """Test inactive prices and closed windows never resolve."""
+        Price.objects.create(
+            product=self.product, amount=1, currency=Currency.USD, is_active=False,
+            valid_from=self.now - timedelta(hours=1),
+        )
+        Price.objects.create(
+            product=self.product, amount=2, currency=Currency.USD,
+            valid_from=self.now - timedelta(days=2), valid_to=self.now,
+        )
+
+        self.assertEqual(resolve_price(self.product.id, Currency.USD, self.now), self.base)
+
+    def test_resolves_many_products_in_one_query(self):
+        """Test batched resolution returns one price per product and currency."""
+        other = Product.objects.create(
+            seller=self.seller, name="Other", description="Other", sku="TEST-002"
+        )
+        other_price = Price.objects.create(product=other, amount=500, currency=Currency.USD)
+
+        with self.assertNumQueries(1):
+            resolved = resolve_prices([self.product.id, other.id])
+
+        self.assertEqual(resolved, {
+            (self.product.id, Currency.USD): self.base,
+            (self.product.id, Currency.CAD): self.cad,
+            (other.id, Currency.USD): other_price,
+        })
+
+    def test_effective_endpoint(self):
+        """Test the product endpoint returns the effective price per currency."""
+        url = reverse('price-effective', kwargs={
+            'identifier': self.seller.slug, 'product_id': self.product.id
+        })
+
+        response = self.client.get(url, {'currency': Currency.USD})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([price['id'] for price in response.data], [self.base.id])
+
+    def test_bulk_effective_endpoint_ignores_other_sellers(self):
+        """Test the bulk endpoint only resolves the seller's own products."""
+        other_user = User.objects.create_user(
+            email="other@example.com", first_name="Jane", last_name="Smith"
+        )
+        other_seller = Seller.objects.create(
+            user=other_user, name="Other", slug="other", support_email="s@other.com"
+        )
+        foreign = Product.objects.create(
+            seller=other_seller, name="Foreign", description="Foreign", sku="FOREIGN-001"
+        )
+        Price.objects.create(product=foreign, amount=100, currency=Currency.USD)
+        url = reverse('price-bulk-effective', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.get(url, {
+            'product_ids': f"{self.product.id},{foreign.id}", 'currency': Currency.USD
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([price['id'] for price in response.data], [self.base.id])
+
+    def test_bulk_effective_endpoint_invalid_ids(self):
+        """Test non-integer product IDs return a validation error."""
+        url = reverse('price-bulk-effective', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.get(url, {'product_ids': 'a,b'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('errors', response.data)
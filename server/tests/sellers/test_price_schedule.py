@@ -0,0 +1,191 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.sellers.domain.price_schedule import (
+    PRICE_SCHEDULE_KEY,
+    get_next_price_boundaries,
+    reconcile_price_schedule,
+    refresh_price_summaries,
+)
+from apps.sellers.models import Seller, Product, Price, ProductPriceSummary
+
+
+class PriceScheduleTests(TestCase):
+    """Test suite for price summaries and price boundaries."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.now = timezone.now()
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.product = Product.objects.create(
+            seller=self.seller,
+            name="Test Product",
+            description="A test product",
+            sku="TEST-001",
+        )
+        self.base = Price.objects.create(
+            product=self.product, amount=1000, currency=Currency.USD, is_default=True
+        )
+
+    def test_saving_a_price_refreshes_the_summary(self):
+        """Test a price write keeps the product's summary current."""
+        summary = ProductPriceSummary.objects.get(product=self.product, currency=Currency.USD)
+
+        self.assertEqual(summary.current_price, self.base)
+        self.assertEqual(summary.current_amount, 1000)
+
+    def test_deleting_the_only_price_removes_the_summary(self):
+        """Test a currency without an effective price has no summary."""
+        self.base.delete()
+
+        self.assertFalse(ProductPriceSummary.objects.exists())
+
+    def test_future_sale_is_applied_at_its_boundary(self):
+        """Test a scheduled sale only reaches the summary once it is due."""
+        starts = self.now + timedelta(hours=1)
+        sale = Price.objects.create(
+            product=self.product, amount=800, currency=Currency.USD, valid_from=starts
+        )
+        self.assertEqual(ProductPriceSummary.objects.get().current_price, self.base)
+
+        seller_ids = refresh_price_summaries([self.product.id], starts)
+
+        self.assertEqual(seller_ids, {self.seller.id})
+        self.assertEqual(ProductPriceSummary.objects.get().current_price, sale)
+
+    def test_unchanged_summaries_report_no_sellers(self):
+        """Test refreshing without a price change invalidates nothing."""
+        self.assertEqual(refresh_price_summaries([self.product.id]), set())
+
+    def test_next_boundary_is_the_earliest_window_edge(self):
+        """Test the next boundary considers both window starts and ends."""
+        Price.objects.create(
+            product=self.product,
+            amount=800,
+            currency=Currency.USD,
+            valid_from=self.now - timedelta(days=1),
+            valid_to=self.now + timedelta(hours=2),
+        )
+        Price.objects.create(
+            product=self.product,
+            amount=700,
+            currency=Currency.USD,
+            valid_from=self.now + timedelta(hours=5),
+        )
+
+        boundaries = get_next_price_boundaries([self.product.id], self.now)
+
+        self.assertEqual(boundaries, {self.product.id: self.now + timedelta(hours=2)})
+
+    def test_no_boundary_without_windows(self):
+        """Test products with open-ended prices are not scheduled."""
+        self.assertEqual(get_next_price_boundaries([self.product.id], self.now), {self.product.id: None})
+
+
+class CurrentPriceEndpointTests(APITestCase):
+    """Test suite for reading current prices from the summaries."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.product = Product.objects.create(
+            seller=self.seller,
+            name="Test Product",
+            description="A test product",
+            sku="TEST-001",
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_created_price_is_current(self):
+        """Test a price created through the API is served as the current price."""
+        create_url = reverse('price-list', kwargs={
+            'identifier': self.seller.slug, 'product_id': self.product.id
+        })
+        created = self.client.post(create_url, {'amount': 1200, 'currency': 'usd'}, format='json')
+        url = reverse('price-bulk-effective', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.get(url, {'product_ids': str(self.product.id)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([price['id'] for price in response.data], [created.data['id']])
+
+
+@pytest.fixture
+def product(db):
+    user = User.objects.create_user(email="test@example.com", first_name="John", last_name="Doe")
+    seller = Seller.objects.create(user=user, name="My Seller", slug="my-seller", support_email="s@example.com")
+    return Product.objects.create(seller=seller, name="Mug", description="Mug", sku="MUG")
+
+
+@pytest.mark.django_db
+class TestReconcilePriceSchedule:
+    """Test suite for rebuilding summaries and the schedule from the Price table."""
+
+    def test_rebuild_command_restores_missing_summaries(self, redis_client, product):
+        """Test prices written before summaries existed get a summary and their boundary scheduled."""
+        ends = timezone.now() + timedelta(hours=1)
+        Price.objects.create(product=product, amount=1000, currency=Currency.USD, is_default=True)
+        Price.objects.create(product=product, amount=800, currency=Currency.USD, valid_to=ends)
+        ProductPriceSummary.objects.all().delete()
+        redis_client.delete(PRICE_SCHEDULE_KEY)
+
+        out = StringIO()
+        call_command("rebuild_price_summaries", stdout=out)
+
+        assert "Rebuilt price summaries of 1 products" in out.getvalue()
+        assert ProductPriceSummary.objects.filter(product=product, currency=Currency.USD).exists()
+        assert redis_client.zscore(PRICE_SCHEDULE_KEY, product.id) == ends.timestamp()
+
+    def test_reconcile_applies_boundary_lost_after_claim(self, redis_client, product):
+        """Test a boundary whose claim was dropped before the refresh is applied and re-armed."""
+        now = timezone.now()
+        Price.objects.create(product=product, amount=1000, currency=Currency.USD, is_default=True)
+        sale = Price.objects.create(
+            product=product, amount=800, currency=Currency.USD,
+            valid_from=now - timedelta(minutes=1), valid_to=now + timedelta(days=1),
+        )
+        # The summary still shows the price from before the sale started
+        refresh_price_summaries([product.id], now - timedelta(minutes=2))
+        redis_client.delete(PRICE_SCHEDULE_KEY)
+
+        assert reconcile_price_schedule(now=now) == 1
+
+        assert ProductPriceSummary.objects.get(product=product).current_price == sale
+        assert redis_client.zscore(PRICE_SCHEDULE_KEY, product.id) == (now + timedelta(days=1)).timestamp()
+
+    def test_reconcile_skips_products_without_windows(self, redis_client, product):
+        """Test the periodic reconcile only visits products with time limited prices."""
+        Price.objects.create(product=product, amount=1000, currency=Currency.USD, is_default=True)
+
+        assert reconcile_price_schedule() == 0
+        assert reconcile_price_schedule(windowed_only=False) == 1
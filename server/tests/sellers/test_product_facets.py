@@ -0,0 +1,152 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.sellers.models import Seller, Product, Price
+
+
+class ProductFacetTests(APITestCase):
+    """Test suite for product facets and attribute filters."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.red = self._product("RED-S", {'color': 'red', 'size': 's'}, stock=3, amount=500)
+        self.red_large = self._product("RED-L", {'color': 'red', 'size': 'l'}, stock=0, amount=1500)
+        self.blue = self._product("BLUE-S", {'color': 'blue', 'size': 's'}, stock=1, amount=3000,
+                                  is_published=True)
+        self.url = reverse('product-facets', kwargs={'identifier': self.seller.slug})
+
+    def _product(self, sku: str, attributes: dict, stock: int, amount: int, is_published: bool = False):
+        product = Product.objects.create(
+            seller=self.seller,
+            name=sku,
+            description=sku,
+            sku=sku,
+            stock=stock,
+            attributes=attributes,
+            is_published=is_published,
+        )
+        Price.objects.create(product=product, amount=amount, currency=Currency.USD, is_default=True)
+        return product
+
+    def test_facet_counts(self):
+        """Test facet counts over the whole catalog."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 3)
+        facets = response.data['facets']
+        self.assertEqual(facets['in_stock'], {'true': 2, 'false': 1})
+        self.assertEqual(facets['is_published'], {'true': 1, 'false': 2})
+        self.assertEqual(facets['attributes'], {
+            'color': {'red': 2, 'blue': 1},
+            'size': {'s': 2, 'l': 1},
+        })
+        self.assertNotIn('price', facets)
+
+    def test_price_bands_with_currency(self):
+        """Test price band counts are added when a currency is given."""
+        response = self.client.get(self.url, {'currency': 'usd'})
+
+        bands = {band['min']: band['count'] for band in response.data['facets']['price']}
+        self.assertEqual(bands, {0: 1, 1000: 1, 2500: 1, 5000: 0, 10000: 0})
+
+    def test_facets_respect_filters(self):
+        """Test facet counts are computed over the filtered listing."""
+        response = self.client.get(self.url, {'attr_color': 'red'})
+
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['facets']['attributes']['size'], {'s': 1, 'l': 1})
+
+    def test_facets_are_aggregated_then_cached(self):
+        """Test a cold request is two aggregate queries and a warm one is none."""
+        # seller lookup, grouped aggregate, attribute counts
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'currency': 'usd'})
+
+        # seller lookup only
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'currency': 'usd', 'sort': 'price'})
+
+    def test_product_write_invalidates_facets(self):
+        """Test saving a product bumps the catalog version used by the facet cache."""
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.red.attributes = {'color': 'green'}
+            self.red.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['facets']['attributes']['color'], {'green': 1, 'red': 1, 'blue': 1})
+
+    def test_typed_attribute_facets_filter_the_list(self):
+        """Test number and boolean attribute values listed by the facets match their products."""
+        shoe = self._product("SHOE", {'size_eu': 42, 'waterproof': True}, stock=1, amount=5000)
+        self._product("BOOT", {'size_eu': 43, 'waterproof': False}, stock=1, amount=5000)
+        url = reverse('product-list', kwargs={'identifier': self.seller.slug})
+
+        facets = self.client.get(self.url).data['facets']['attributes']
+        by_size = self.client.get(url, {'attr_size_eu': '42'})
+        by_flag = self.client.get(url, {'attr_waterproof': 'true'})
+
+        self.assertEqual(facets['size_eu'], {'42': 1, '43': 1})
+        self.assertEqual(facets['waterproof'], {'true': 1, 'false': 1})
+        self.assertEqual([product['id'] for product in by_size.data], [shoe.id])
+        self.assertEqual([product['id'] for product in by_flag.data], [shoe.id])
+
+    def test_lookup_like_attribute_keys_are_attribute_names(self):
+        """Test attr_ keys spelling ORM lookups match an attribute of that name instead of running the lookup."""
+        list_url = reverse('product-list', kwargs={'identifier': self.seller.slug})
+
+        for param in ('attr_color__contains', 'attr_contains', 'attr_isnull', 'attr_color__regex', 'attr_color__gt'):
+            with self.subTest(param=param):
+                listed = self.client.get(list_url, {param: 're'})
+                facets = self.client.get(self.url, {param: 're'})
+
+                self.assertEqual(listed.status_code, status.HTTP_200_OK)
+                self.assertEqual(listed.data, [])
+                self.assertEqual(facets.status_code, status.HTTP_200_OK)
+                self.assertEqual(facets.data['total'], 0)
+
+    def test_unknown_params_share_the_facet_cache(self):
+        """Test parameters that are not listing filters do not create new facet cache entries."""
+        self.client.get(self.url, {'attr_color': 'red'})
+
+        # seller lookup only
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'attr_color': 'red', 'junk': 'x', 'attr_bad-key': 'y', 'page': '2'})
+
+    def test_list_filters_by_attribute_and_stock(self):
+        """Test the product list accepts attribute and in_stock filters."""
+        url = reverse('product-list', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.get(url, {'attr_color': 'red', 'in_stock': 'true'})
+
+        self.assertEqual([product['id'] for product in response.data], [self.red.id])
+
+    def test_invalid_attributes_rejected(self):
+        """Test nested attribute values fail validation on create."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('product-list', kwargs={'identifier': self.seller.slug})
+
+        response = self.client.post(url, {
+            'name': 'Bad', 'description': 'Bad', 'sku': 'BAD', 'attributes': {'color': ['red']}
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,180 @@
+import multiprocessing
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.identity.models import User
+from apps.sellers.domain.images import process_product_image, store_original
+from apps.sellers.models import Seller, Product, ProductImage
+
+
+def make_upload(name="photo.png", size=(400, 300)) -> SimpleUploadedFile:
+    output = BytesIO()
+    Image.new('RGB', size, (10, 120, 200)).save(output, format='PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[100], IMAGE_VARIANT_FORMATS=['webp', 'jpeg'])
+class ProductImageViewSetTests(APITestCase):
+    """Test suite for ProductImageViewSet endpoints."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.other_user = User.objects.create_user(
+            email="other@example.com",
+            first_name="Jane",
+            last_name="Smith"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.product = Product.objects.create(
+            seller=self.seller, name="Product", description="Product", sku="SKU-1"
+        )
+        self.list_url = reverse('product-image-list', kwargs={
+            'identifier': self.seller.slug, 'product_id': self.product.id
+        })
+
+    def _upload(self, upload=None, **data):
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.list_url, {'file': upload or make_upload(), **data}, format='multipart')
+
+    def test_upload_renders_variants(self):
+        """Test an upload is processed into ready variants after commit."""
+        response = self._upload(alt_text="Front")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ProductImage.Status.PENDING)
+
+        image = ProductImage.objects.get(id=response.data['id'])
+        self.assertEqual(image.status, ProductImage.Status.READY)
+        self.assertEqual(
+            [(v['width'], v['format']) for v in image.metadata['variants']],
+            [(100, 'webp'), (100, 'jpeg'), (400, 'webp'), (400, 'jpeg')]
+        )
+        self.assertTrue(all(default_storage.exists(v['path']) for v in image.metadata['variants']))
+
+    def test_product_response_includes_responsive_images(self):
+        """Test product responses carry srcset data without querying images."""
+        self._upload(alt_text="Front")
+        url = reverse('product-detail', kwargs={
+            'identifier': self.seller.slug, 'product_id': self.product.id
+        })
+
+        response = self.client.get(url)
+
+        [image] = response.data['responsive_images']
+        self.assertEqual(image['alt'], "Front")
+        self.assertEqual((image['width'], image['height']), (400, 300))
+        self.assertTrue(image['blurhash'])
+        self.assertIn('400w.jpeg 400w', image['srcset'])
+        self.assertEqual(image['sources'][0]['type'], 'image/webp')
+
+    def test_uploads_append_positions(self):
+        """Test images without a position go after existing ones."""
+        self._upload()
+        self._upload()
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual([image['position'] for image in response.data], [0, 1])
+
+    def test_invalid_image_fails(self):
+        """Test an undecodable upload ends up failed with an error."""
+        image = ProductImage.objects.create(product=self.product)
+        store_original(image, "broken.png", b"not an image")
+
+        process_product_image(image.id)
+
+        image.refresh_from_db()
+        self.assertEqual(image.status, ProductImage.Status.FAILED)
+        self.assertTrue(image.error)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.image_metadata, [])
+
+    @override_settings(IMAGE_RENDER_THREADS=2)
+    def test_processes_inside_a_daemonic_worker(self):
+        """Test an image renders inside a daemonic process, as in a Celery prefork child."""
+        image = ProductImage.objects.create(product=self.product)
+        store_original(image, "photo.png", make_upload().read())
+        results = multiprocessing.get_context('fork').Queue()
+
+        def run():
+            process_product_image(image.id)
+            image.refresh_from_db()
+            results.put((image.status, image.error))
+
+        worker = multiprocessing.get_context('fork').Process(target=run, daemon=True)
+        worker.start()
+        worker.join(timeout=30)
+
+        self.assertEqual(results.get(timeout=1), (ProductImage.Status.READY, ''))
+
+    def test_unexpected_errors_fail_the_image(self):
+        """Test an error outside the expected image errors still moves the image out of pending."""
+        image = ProductImage.objects.create(product=self.product)
+        store_original(image, "photo.png", make_upload().read())
+
+        with mock.patch('apps.sellers.domain.images.process_image', side_effect=AssertionError('boom')):
+            process_product_image(image.id)
+
+        image.refresh_from_db()
+        self.assertEqual(image.status, ProductImage.Status.FAILED)
+        self.assertEqual(image.error, 'The image could not be processed.')
+
+    @override_settings(IMAGE_MAX_BYTES=100)
+    def test_oversized_upload_is_rejected(self):
+        """Test uploads over IMAGE_MAX_BYTES are refused before anything is stored."""
+        response = self._upload()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ProductImage.objects.exists())
+
+    def test_requires_file_or_url(self):
+        """Test a request with neither a file nor a url is rejected."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.list_url, {'alt_text': 'x'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_owner_cannot_upload(self):
+        """Test only the seller's owner can add images."""
+        self.client.force_authenticate(user=self.other_user)
+
+        response = self.client.post(self.list_url, {'file': make_upload()}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_delete_removes_files_and_metadata(self):
+        """Test deleting an image removes its files and its product metadata."""
+        image_id = self._upload().data['id']
+        paths = [v['path'] for v in ProductImage.objects.get(id=image_id).metadata['variants']]
+        url = reverse('product-image-detail', kwargs={
+            'identifier': self.seller.slug, 'product_id': self.product.id, 'image_id': image_id
+        })
+
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(any(default_storage.exists(path) for path in paths))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.image_metadata, [])
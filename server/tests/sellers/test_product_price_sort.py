@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.sellers.models import Seller, Product, Price, ProductPriceSummary
+
+
+class ProductPriceSortTests(APITestCase):
+    """Test suite for price sorting and filtering on the product list."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.cheap = self._product("CHEAP", 500)
+        self.pricey = self._product("PRICEY", 3000)
+        self.mid = self._product("MID", 1500)
+        self.unpriced = Product.objects.create(
+            seller=self.seller, name="Unpriced", description="No price", sku="NONE"
+        )
+        self.url = reverse('product-list', kwargs={'identifier': self.seller.slug})
+
+    def _product(self, sku: str, amount: int) -> Product:
+        product = Product.objects.create(
+            seller=self.seller, name=sku.title(), description=sku, sku=sku
+        )
+        Price.objects.create(product=product, amount=amount, currency=Currency.USD, is_default=True)
+        return product
+
+    def test_summary_tracks_price_range(self):
+        """Test the summary carries min, max and default over valid prices."""
+        now = timezone.now()
+        Price.objects.create(
+            product=self.cheap, amount=400, currency=Currency.USD,
+            valid_from=now - timedelta(hours=1),
+        )
+        Price.objects.create(product=self.cheap, amount=700, currency=Currency.USD)
+
+        summary = ProductPriceSummary.objects.get(product=self.cheap, currency=Currency.USD)
+
+        self.assertEqual(
+            (summary.current_amount, summary.min_amount, summary.max_amount, summary.default_amount),
+            (400, 400, 700, 500)
+        )
+
+    def test_sort_by_price_ascending(self):
+        """Test sorting by price puts unpriced products last."""
+        response = self.client.get(self.url, {'sort': 'price', 'order': 'asc', 'currency': 'usd'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [product['id'] for product in response.data],
+            [self.cheap.id, self.mid.id, self.pricey.id, self.unpriced.id]
+        )
+        self.assertEqual(response.data[0]['min_price'], 500)
+
+    def test_sort_by_price_descending(self):
+        """Test sorting by price descending."""
+        response = self.client.get(self.url, {'sort': 'price', 'currency': 'usd'})
+
+        self.assertEqual(
+            [product['id'] for product in response.data],
+            [self.pricey.id, self.mid.id, self.cheap.id, self.unpriced.id]
+        )
+
+    def test_filter_by_price_range(self):
+        """Test min_price and max_price filter on the from price."""
+        response = self.client.get(self.url, {'currency': 'usd', 'min_price': 1000, 'max_price': 2000})
+
+        self.assertEqual([product['id'] for product in response.data], [self.mid.id])
+
+    def test_price_sort_without_currency(self):
+        """Test sorting by price requires a currency."""
+        response = self.client.get(self.url, {'sort': 'price'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('errors', response.data)
+
+    def test_price_sort_does_not_touch_prices(self):
+        """Test the price sort reads products and summaries in one query."""
+        with self.assertNumQueries(2):
+            # seller lookup, product list
+            self.client.get(self.url, {'sort': 'price', 'currency': 'usd'})
@@ -0,0 +1,139 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.common.model_utils import Currency
+from apps.identity.models import User
+from apps.sellers.models import Seller, Product, Price, ProductVariant
+
+
+class VariantViewSetTests(APITestCase):
+    """Test suite for VariantViewSet endpoints."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            first_name="John",
+            last_name="Doe"
+        )
+        self.other_user = User.objects.create_user(
+            email="other@example.com",
+            first_name="Jane",
+            last_name="Smith"
+        )
+        self.seller = Seller.objects.create(
+            user=self.user,
+            name="My Seller",
+            slug="my-seller",
+            support_email="support@myseller.com"
+        )
+        self.product = Product.objects.create(
+            seller=self.seller,
+            name="Shirt",
+            description="A shirt",
+            sku="SHIRT",
+        )
+        other_product = Product.objects.create(
+            seller=self.seller,
+            name="Hat",
+            description="A hat",
+            sku="HAT",
+        )
+        self.price = Price.objects.create(product=self.product, amount=2000, currency=Currency.USD)
+        self.foreign_price = Price.objects.create(product=other_product, amount=900, currency=Currency.USD)
+        self.url = reverse('variant-list', kwargs={
+            'identifier': self.seller.slug, 'product_id': self.product.id
+        })
+
+    def _matrix(self, sizes, colors):
+        return [
+            {
+                'sku': f"SHIRT-{size}-{color}",
+                'options': {'size': size, 'color': color},
+                'stock': 5,
+                'price_id': self.price.id,
+            }
+            for size in sizes
+            for color in colors
+        ]
+
+    def test_bulk_create_variants(self):
+        """Test a size by colour matrix is created in one request."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.url, {'variants': self._matrix(['s', 'm'], ['red', 'blue'])}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['variants']), 4)
+        self.assertEqual(response.data['options'], {'size': ['s', 'm'], 'color': ['red', 'blue']})
+        self.assertEqual(response.data['variants'][0]['price']['amount'], 2000)
+
+    def test_bulk_create_requires_ownership(self):
+        """Test only the seller's owner can create variants."""
+        self.client.force_authenticate(user=self.other_user)
+
+        response = self.client.post(self.url, {'variants': self._matrix(['s'], ['red'])}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_rejects_foreign_price(self):
+        """Test variants cannot point at another product's price."""
+        self.client.force_authenticate(user=self.user)
+        variants = self._matrix(['s'], ['red'])
+        variants[0]['price_id'] = self.foreign_price.id
+
+        response = self.client.post(self.url, {'variants': variants}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ProductVariant.objects.exists())
+
+    def test_bulk_create_duplicate_sku(self):
+        """Test duplicate SKUs within a product are rejected."""
+        self.client.force_authenticate(user=self.user)
+        variants = self._matrix(['s'], ['red']) * 2
+
+        response = self.client.post(self.url, {'variants': variants}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('sku', response.data['errors'])
+
+    def test_bulk_update_variants(self):
+        """Test stock and options of many variants change in one request."""
+        variants = ProductVariant.objects.bulk_create([
+            ProductVariant(product=self.product, sku="A", options={'size': 's'}, stock=1),
+            ProductVariant(product=self.product, sku="B", options={'size': 'm'}, stock=1),
+        ])
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.patch(self.url, {'variants': [
+            {'id': variants[0].id, 'stock': 10},
+            {'id': variants[1].id, 'price_id': self.price.id},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        variants[0].refresh_from_db()
+        variants[1].refresh_from_db()
+        self.assertEqual(variants[0].stock, 10)
+        self.assertEqual(variants[1].price, self.price)
+
+    def test_bulk_update_unknown_variant(self):
+        """Test updating a variant of another product returns 400."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.patch(self.url, {'variants': [{'id': 9999, 'stock': 1}]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_matrix_is_constant_queries(self):
+        """Test the matrix loads every variant and its price in one query."""
+        ProductVariant.objects.bulk_create([
+            ProductVariant(product=self.product, sku=f"V{i}", options={'size': str(i)}, price=self.price)
+            for i in range(20)
+        ])
+
+        # seller, product, variants with prices
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data['variants']), 20)